@@ -1,15 +1,61 @@
 from __future__ import annotations
 
+import asyncio
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
-from app.routers import chat
+from app.routers import chat, health, metrics
+from app.warmup import warm_up
+from clients.crm import close_crm_client
+from clients.llm import close_llm_http_client
+from core.config import get_settings
+from core.constants import COLORS
+from core.logging import get_logger
+from core.memory import sweep_idle_sessions
+from crm.outbox import run_crm_outbox_worker
 
 
 load_dotenv()
 
+logger = get_logger("chatbot.app", COLORS["BRIGHT_GREEN"])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    settings = get_settings()
+    # Warm up in the background so the server starts listening at once; /healthz/ready gates traffic.
+    warmup = asyncio.create_task(warm_up())
+    warmup.add_done_callback(_log_warmup_failure)
+    sweeper = asyncio.create_task(sweep_idle_sessions(settings.session_sweep_interval_seconds))
+    # Delivers CRM writes queued by workflow steps, including ones left over from a previous run.
+    crm_worker = asyncio.create_task(run_crm_outbox_worker(settings.crm_poll_interval_seconds))
+    crm_worker.add_done_callback(_log_crm_worker_exit)
+    try:
+        yield
+    finally:
+        for task in (warmup, sweeper, crm_worker):
+            task.cancel()
+            # Warm-up failures were already logged by _log_warmup_failure.
+            with suppress(asyncio.CancelledError, Exception):
+                await task
+        await close_llm_http_client()
+        await close_crm_client()
+
+
+def _log_warmup_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Warm-up failed; the app will stay not ready", exc_info=task.exception())
+
+
+def _log_crm_worker_exit(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("CRM outbox worker stopped; queued CRM writes are not delivered", exc_info=task.exception())
+
 
 def create_app() -> FastAPI:
     config: FastAPIConfig = {
@@ -18,7 +64,7 @@ def create_app() -> FastAPI:
         "version": "1.0.0",
     }
 
-    app = FastAPI(**config)
+    app = FastAPI(**config, lifespan=lifespan)
 
     app.add_middleware(
         CORSMiddleware,
@@ -30,6 +76,8 @@ def create_app() -> FastAPI:
     )
 
     app.include_router(chat.router,     prefix="/api/chat",    tags=["chat"])
+    app.include_router(metrics.router,  prefix="/metrics",     tags=["metrics"])
+    app.include_router(health.router,   prefix="/healthz",     tags=["health"])
 
     return app
 
@@ -1,38 +1,70 @@
 from __future__ import annotations
 
-from typing import List
+import json
+from collections.abc import AsyncIterator
+from typing import Any, List
 
-from fastapi import APIRouter, Form, HTTPException
+from fastapi import APIRouter, Depends, Form, HTTPException
+from fastapi.responses import StreamingResponse
 
 from schemas.chat import ChatRequest, ChatResponse
-from services.chat import handle_chat
+from services.chat import handle_chat, stream_chat
 from core.logging import get_logger
 
 router = APIRouter()
 
 logger = get_logger("chatbot.app.routers")
 
+_ERROR_DETAIL = "An error occurred while processing your request. Please try again later."
 
-@router.post("", response_model=ChatResponse)
-async def chat_invoke(
+
+def _chat_request_form(
     query: str = Form(...),
     session_id: str = Form(...),
     timezone: str = Form(...),
     user_mail: str = Form(None),
     message_files: List[str] = Form(None),
-) -> ChatResponse:
-    chat_request = ChatRequest(
+    language: str = Form("en"),
+) -> ChatRequest:
+    return ChatRequest(
         query=query,
         session_id=session_id,
         timezone=timezone,
         user_mail=user_mail or "",
         message_files=",".join(message_files) if message_files else "",
+        language=language,
     )
+
+
+@router.post("", response_model=ChatResponse)
+async def chat_invoke(chat_request: ChatRequest = Depends(_chat_request_form)) -> ChatResponse:
     try:
         return await handle_chat(chat_request)
     except Exception as exc:
         logger.error("Error handling chat request: %s", exc, exc_info=True)    
         raise HTTPException(
             status_code=500,
-            detail="An error occurred while processing your request. Please try again later.",
+            detail=_ERROR_DETAIL,
         ) from exc
+
+
+@router.post("/stream")
+async def chat_stream(chat_request: ChatRequest = Depends(_chat_request_form)) -> StreamingResponse:
+    return StreamingResponse(
+        _sse_events(chat_request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _sse_events(chat_request: ChatRequest) -> AsyncIterator[str]:
+    try:
+        async for event, data in stream_chat(chat_request):
+            yield _format_sse(event, data)
+    except Exception as exc:
+        logger.error("Error streaming chat request: %s", exc, exc_info=True)
+        yield _format_sse("error", {"detail": _ERROR_DETAIL})
+
+
+def _format_sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.warmup import get_warmup_status
+
+router = APIRouter()
+
+
+@router.get("/live")
+async def live() -> dict:
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready() -> JSONResponse:
+    status = get_warmup_status()
+    return JSONResponse(status.as_dict(), status_code=200 if status.ready else 503)
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from typing import Dict
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from clients.llm import get_llm_usage_stats
+from core.history import get_history_policy
+from core.logging import get_logging_stats
+from core.memory import get_conversation_store
+from core.metrics import register_gauges, render_metrics
+from core.response_cache import get_response_cache
+from crm.outbox import get_crm_outbox
+
+router = APIRouter()
+
+_PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _runtime_gauges() -> Dict[str, float]:
+    gauges = {f"chat_{name}": value for name, value in get_conversation_store().stats().items()}
+    gauges.update(get_history_policy().stats())
+    gauges.update(get_logging_stats())
+    cache = get_response_cache()
+    if cache is not None:
+        gauges.update(cache.stats())
+    # Token totals are exported as counters; only the transport figures are added here.
+    gauges.update({name: value for name, value in get_llm_usage_stats().items() if name.startswith("llm_")})
+    gauges.update(get_crm_outbox().stats())
+    return gauges
+
+
+register_gauges(_runtime_gauges)
+
+
+@router.get("", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(render_metrics(), media_type=_PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+from clients.llm import get_chat_llm, get_route_llm, resolve_llm_route
+from core.config import LLM_PURPOSES, get_settings
+from core.constants import COLORS
+from core.history import get_history_policy
+from core.logging import get_logger
+from core.memory import get_conversation_store
+from core.response_cache import get_response_cache
+from utils.business_days import get_calendar_or_default
+from workflows import WORKFLOWS, get_chat_graph, precompile_system_prompts
+
+logger = get_logger("WARMUP", COLORS["BRIGHT_GREEN"])
+
+# Modules kept out of the import path of app.http and loaded here, off the event loop.
+_DEFERRED_IMPORTS = ("langchain_openai",)
+
+
+@dataclass(slots=True)
+class WarmupStatus:
+    ready: bool = False
+    phases: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else "warming",
+            "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()},
+            "errors": dict(self.errors),
+        }
+
+
+_status = WarmupStatus()
+
+
+def get_warmup_status() -> WarmupStatus:
+    return _status
+
+
+async def _phase(name: str, run: Callable[[], Awaitable[Any] | Any], required: bool = True) -> None:
+    started = time.perf_counter()
+    try:
+        result = run()
+        if asyncio.iscoroutine(result):
+            await result
+    except Exception as exc:
+        _status.errors[name] = str(exc) or type(exc).__name__
+        if required:
+            raise
+        logger.warning("Warm-up phase %s failed: %s", name, exc)
+    finally:
+        _status.phases[name] = time.perf_counter() - started
+
+
+def _build_graphs() -> None:
+    settings = get_settings()
+    for purpose in LLM_PURPOSES:
+        if purpose == "summary":
+            # The summarizer calls the model directly, without a graph.
+            get_chat_llm(purpose)
+            continue
+        get_chat_graph(purpose=purpose)
+    if settings.single_pass_turns:
+        get_chat_graph(single_pass=True)
+
+
+def _open_stores() -> None:
+    get_conversation_store()
+    get_history_policy()
+    get_response_cache()
+
+
+async def _ping_models() -> None:
+    """Open pooled connections (TLS included) with one tiny request per distinct model route."""
+    settings = get_settings()
+    routes = {resolve_llm_route(purpose) for purpose in LLM_PURPOSES}
+    await asyncio.gather(
+        *(
+            asyncio.wait_for(
+                get_route_llm(route).ainvoke("ping", max_tokens=1),
+                timeout=settings.llm_warmup_timeout_seconds,
+            )
+            for route in routes
+        )
+    )
+
+
+async def warm_up() -> WarmupStatus:
+    """Do the one-off work the first request would otherwise pay for, then mark the app ready."""
+    started = time.perf_counter()
+    for module in _DEFERRED_IMPORTS:
+        await _phase(f"import:{module}", lambda module=module: asyncio.to_thread(importlib.import_module, module))
+    await _phase("system_prompts", precompile_system_prompts)
+    # Loads BUSINESS_CALENDAR once, so a misconfigured name is reported at startup.
+    await _phase("business_calendar", lambda: get_calendar_or_default(get_settings().business_calendar))
+    # Creating the OpenAI clients is slow and synchronous, so it runs off the event loop too.
+    await _phase("graphs", lambda: asyncio.to_thread(_build_graphs))
+    await _phase("stores", _open_stores)
+    if get_settings().llm_warmup:
+        # A cold upstream should not keep the pod out of rotation; the first request just pays for it.
+        await _phase("llm_connections", _ping_models, required=False)
+
+    _status.ready = True
+    logger.info(
+        "Warm-up finished in %.0f ms (%d workflows)",
+        (time.perf_counter() - started) * 1000,
+        len(WORKFLOWS),
+    )
+    return _status
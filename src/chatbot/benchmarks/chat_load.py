@@ -0,0 +1,200 @@
+"""Offline load benchmark for the chat service.
+
+Runs many concurrent sessions through the `project` and `brief` workflows against
+a deterministic fake chat model, so the numbers reflect this service's own
+overhead plus the configured artificial LLM latency. Results are printed as JSON.
+
+    python -m benchmarks.chat_load --sessions 200 --concurrency 50 --mode direct
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Awaitable, Callable, Dict, List
+
+from benchmarks.fake_llm import FakeChatModel, install_fake_llm
+from core.config import get_settings
+from crm.outbox import CRMOutbox, set_crm_outbox
+from schemas.chat import ChatRequest
+
+SCRIPTS: Dict[str, List[str]] = {
+    "project": [
+        "Hi, please create a project",
+        "5000",
+        "500",
+        "Too short",
+        "A complete redesign of our corporate website and brand assets",
+        "yes",
+    ],
+    "brief": [
+        "Create a brief for me",
+        "Flyers",
+        "We need 200 A5 flyers printed on recycled paper with the new brand colours",
+        "X is the product launch event in the main office lobby",
+    ],
+}
+
+_PACKAGES = ("langchain", "langchain-core", "langchain-openai", "langgraph", "fastapi", "pydantic")
+
+TurnFn = Callable[[ChatRequest], Awaitable[Any]]
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _package_versions() -> Dict[str, str | None]:
+    versions = {}
+    for package in _PACKAGES:
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def _run_sessions(turn: TurnFn, sessions: int, concurrency: int) -> tuple[List[float], int]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+    workflows = list(SCRIPTS)
+
+    async def run_session(index: int) -> None:
+        nonlocal errors
+        script = SCRIPTS[workflows[index % len(workflows)]]
+        async with semaphore:
+            for query in script:
+                request = ChatRequest(
+                    query=query,
+                    session_id=f"bench-{index}",
+                    timezone="UTC",
+                    user_mail="",
+                    message_files="",
+                )
+                started = time.perf_counter()
+                try:
+                    await turn(request)
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(run_session(index) for index in range(sessions)))
+    return latencies, errors
+
+
+def _direct_turn() -> TurnFn:
+    from services.chat import handle_chat
+
+    return handle_chat
+
+
+def _http_turn(client, path: str) -> TurnFn:
+    async def turn(request: ChatRequest) -> Any:
+        response = await client.post(path, data=request.model_dump())
+        response.raise_for_status()
+        # Drain streamed bodies so the whole turn is measured.
+        return response.text
+
+    return turn
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    model = FakeChatModel(latency=args.llm_latency_ms / 1000, jitter=args.llm_jitter_ms / 1000, seed=args.seed)
+    install_fake_llm(model)
+
+    started = time.perf_counter()
+    if args.mode == "direct":
+        latencies, errors = await _run_sessions(_direct_turn(), args.sessions, args.concurrency)
+    else:
+        import httpx
+
+        from app.http import app, lifespan
+
+        path = "/api/chat/stream" if args.mode == "stream" else "/api/chat"
+        async with lifespan(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                latencies, errors = await _run_sessions(_http_turn(client, path), args.sessions, args.concurrency)
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    turns = len(latencies)
+    return {
+        "mode": args.mode,
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "llm_latency_ms": args.llm_latency_ms,
+        "llm_jitter_ms": args.llm_jitter_ms,
+        "turns": turns,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(turns / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "p50": round(_percentile(ordered, 0.50) * 1000, 2),
+            "p95": round(_percentile(ordered, 0.95) * 1000, 2),
+            "p99": round(_percentile(ordered, 0.99) * 1000, 2),
+            "max": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        },
+        "llm_calls": model.calls,
+        "llm_calls_per_turn": round(model.calls / turns, 3) if turns else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "python": platform.python_version(),
+        "packages": _package_versions(),
+    }
+
+
+def _parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=("direct", "http", "stream"), default="direct")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> None:
+    args = _parse_args(argv)
+    # Confirmed projects queue CRM writes: send them to a throwaway outbox and never deliver them.
+    os.environ["CRM_BASE_URL"] = ""
+    get_settings.cache_clear()
+    # Keep stdout clean for the JSON report; framework debug output goes to stderr.
+    with tempfile.TemporaryDirectory() as outbox_dir, redirect_stdout(sys.stderr):
+        outbox = CRMOutbox(os.path.join(outbox_dir, "crm_outbox.sqlite3"))
+        set_crm_outbox(outbox)
+        try:
+            report = asyncio.run(run_benchmark(args))
+        finally:
+            set_crm_outbox(None)
+            outbox.close()
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(payload + "\n")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import re
+from typing import Any, Dict, List
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+_CREATE_WORKFLOW_PATTERN = re.compile(r"\bcreate (?:a |an |new )?(project|brief)\b", re.IGNORECASE)
+# Binding options the fake model can honour; it answers in plain JSON text, so e.g. native structured
+# output (response_format) or strict tool schemas would silently be benchmarked as something else.
+_SUPPORTED_BIND_OPTIONS = {"tool_choice": (None, "auto")}
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic stand-in for the chat model, driven by the shape of the prompt.
+
+    - "create a project/brief" -> a `set_active_workflow` tool call
+    - after a tool result, a follow-up or a validation error -> a canned answer
+    - anything else -> an answer that hands the raw query back as `validator_value`
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    seed: int = 0
+    calls: int = 0
+    # What the graph bound, for tests and benchmark reports.
+    bound_tools: List[str] = []
+    bind_options: Dict[str, Any] = {}
+
+    def model_post_init(self, __context: Any) -> None:
+        self._random = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeChatModel":
+        unsupported = sorted(
+            name
+            for name, value in kwargs.items()
+            if name not in _SUPPORTED_BIND_OPTIONS or value not in _SUPPORTED_BIND_OPTIONS[name]
+        )
+        if unsupported:
+            raise ValueError(f"FakeChatModel does not support these bind_tools options: {', '.join(unsupported)}.")
+        self.bound_tools = [convert_to_openai_tool(tool)["function"]["name"] for tool in tools]
+        self.bind_options = dict(kwargs)
+        return self
+
+    def respond(self, messages: List[BaseMessage]) -> AIMessage:
+        self.calls += 1
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            return _answer("Let's get started. Please provide the first value.")
+
+        query = last.text if isinstance(last, HumanMessage) else ""
+        if query.startswith("Proceed to the next workflow step"):
+            return _answer("Thanks, that is noted. Please provide the next value.")
+        if query.startswith("The provided input failed validation"):
+            return _answer("That value does not work for this step. Please try again.")
+
+        match = _CREATE_WORKFLOW_PATTERN.search(query)
+        if match:
+            return AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": "set_active_workflow",
+                        "args": {"workflow": match.group(1).lower()},
+                        "id": f"call_{self.calls}",
+                    }
+                ],
+            )
+        return _answer("Thanks.", validator_value=query)
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def _generate(self, messages: List[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self.respond(messages))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Any = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self._delay())
+        return ChatResult(generations=[ChatGeneration(message=self.respond(messages))])
+
+    async def _astream(self, messages: List[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any):
+        await asyncio.sleep(self._delay())
+        message = self.respond(messages)
+        if message.tool_calls:
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": index}
+                        for index, call in enumerate(message.tool_calls)
+                    ],
+                )
+            )
+            return
+        text = message.text
+        for start in range(0, len(text), 8):
+            piece = text[start:start + 8]
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+
+def _answer(answer: str, validator_value: Any = None) -> AIMessage:
+    return AIMessage(content=json.dumps({"answer": answer, "validator_value": validator_value}))
+
+
+def install_fake_llm(model: FakeChatModel) -> None:
+    """Serve every LLM purpose from `model` and drop graphs compiled against real clients."""
+    import clients.llm as llm_module
+    import workflows
+    from core.config import LLM_PURPOSES
+
+    for purpose in LLM_PURPOSES:
+        llm_module._llms[llm_module.resolve_llm_route(purpose)] = model
+    workflows._get_route_graph.cache_clear()
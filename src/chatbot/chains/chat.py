@@ -1,9 +1,20 @@
 from __future__ import annotations
 
+import re
+from collections.abc import Sequence
+
+from langchain_core.messages import BaseMessage
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from pydantic import BaseModel, Field
 
+from utils.date_expressions import ResolvedDate
+
+
+class FieldValue(BaseModel):
+    key: str = Field(description="Name of a later workflow field.")
+    value: str | float | bool
+
 
 class ChatLLMResult(BaseModel):
     answer: str
@@ -11,33 +22,162 @@ class ChatLLMResult(BaseModel):
         None,
         description="Value extracted from the user's message that should be validated for the current workflow step.",
     )
+    # A list of items rather than a mapping: strict structured output only accepts objects with fixed properties.
+    field_values: list[FieldValue] | None = Field(
+        None,
+        description="Values for later workflow fields that the user's message also provides.",
+    )
+
+    def field_value_map(self) -> dict[str, str | float | bool]:
+        return {item.key: item.value for item in self.field_values or ()}
 
 
 CHAT_PARSER = PydanticOutputParser(pydantic_object=ChatLLMResult)
-CHAT_PROMPT = ChatPromptTemplate.from_messages(
-    [
-        (
-            "system",
-            (
-                """
+# Rendered once; the schema text is identical for every request.
+CHAT_FORMAT_INSTRUCTIONS = CHAT_PARSER.get_format_instructions()
+# With native structured output the provider enforces the schema, so only the field meaning is needed.
+CHAT_NATIVE_FORMAT_INSTRUCTIONS = (
+    "Your reply is returned as structured output: put the message for the user in `answer` "
+    "and the extracted workflow field value (or null) in `validator_value`. "
+    "Values for later workflow fields go in `field_values` (or null)."
+)
+
+# Static per (workflow, step): kept first so consecutive requests share a cacheable prompt prefix.
+CHAT_SYSTEM_TEMPLATE = """
 Provide helpful answers using the format below. 
 {format_instructions}
 
-CURRENT CONTEXT:
-- Current datetime: {current_datetime} ({timezone}).
+WORKFLOW CONTEXT:
 - Active workflow: {active_workflow}
 - Workflow field to capture: {workflow_step_field} (type: {workflow_step_field_type})
 - If a workflow field is present, extract its value into `validator_value` alongside your answer.
+- Later workflow fields: {workflow_later_fields}. If the user's message already gives values for any of them, put those into `field_values` as {{key, value}} items; leave out fields the user did not mention.
+- Relative dates listed under CURRENT CONTEXT are already resolved; use them as given. Call the `relative_date` tool only for relative dates that are not listed there.
 
 WORKFLOW INSTRUCTION:
 {workflow_instruction}
 
 WORKFLOW STEP INSTRUCTION:
 {workflow_step_instruction}
+"""
+
+CHAT_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", "{system_prompt}"),
+        MessagesPlaceholder(variable_name="history"),
+        # Per-request values go after the history so they never break the shared prefix.
+        (
+            "system",
+            (
+                """
+CURRENT CONTEXT:
+- Current datetime: {current_datetime} ({timezone}).{resolved_dates}
                 """
             ),
         ),
-        MessagesPlaceholder(variable_name="history"),
         ("human", "{query}"),
     ]
 )
+
+
+def render_chat_system_prompt(
+    active_workflow: str,
+    workflow_instruction: str,
+    workflow_step_instruction: str,
+    workflow_step_field: str | None,
+    workflow_step_field_type: str | None,
+    structured_output: bool = False,
+    workflow_later_fields: Sequence[tuple[str, str]] = (),
+) -> str:
+    return CHAT_SYSTEM_TEMPLATE.format(
+        format_instructions=CHAT_NATIVE_FORMAT_INSTRUCTIONS if structured_output else CHAT_FORMAT_INSTRUCTIONS,
+        active_workflow=active_workflow,
+        workflow_step_field=workflow_step_field or "none",
+        workflow_step_field_type=workflow_step_field_type or "unknown",
+        workflow_later_fields=", ".join(f"{key} ({field_type})" for key, field_type in workflow_later_fields) or "none",
+        workflow_instruction=workflow_instruction,
+        workflow_step_instruction=workflow_step_instruction,
+    ).strip()
+
+
+def render_resolved_dates(resolved: Sequence[ResolvedDate]) -> str:
+    """Context line for the CURRENT CONTEXT block; empty when nothing was resolved."""
+    if not resolved:
+        return ""
+    return "\n- Resolved dates in the user message: " + "; ".join(item.describe() for item in resolved) + "."
+
+
+def parse_chat_result(message: BaseMessage) -> ChatLLMResult:
+    """Parse the final agent message; raises `OutputParserException` when it is not valid JSON."""
+    parsed = message.additional_kwargs.get("parsed")
+    if isinstance(parsed, ChatLLMResult):
+        return parsed
+    return CHAT_PARSER.invoke(message)
+
+
+_ANSWER_KEY = re.compile(r'"answer"\s*:\s*"')
+_JSON_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class ChatAnswerStreamParser:
+    """Incrementally extract the `answer` string from streamed `ChatLLMResult` JSON."""
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._position: int | None = None
+        self._done = False
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def feed(self, text: str) -> str:
+        """Consume the next chunk of model output and return newly decoded answer text."""
+        if self._done or not text:
+            return ""
+        self._buffer += text
+
+        if self._position is None:
+            match = _ANSWER_KEY.search(self._buffer)
+            if match is None:
+                return ""
+            self._position = match.end()
+
+        buffer = self._buffer
+        index = self._position
+        decoded: list[str] = []
+        while index < len(buffer):
+            char = buffer[index]
+            if char == '"':
+                self._done = True
+                index += 1
+                break
+            if char != "\\":
+                decoded.append(char)
+                index += 1
+                continue
+
+            # Escape sequences may be split across chunks; wait for the rest.
+            if index + 1 >= len(buffer):
+                break
+            escape = buffer[index + 1]
+            if escape != "u":
+                decoded.append(_JSON_ESCAPES.get(escape, escape))
+                index += 2
+                continue
+
+            if index + 6 > len(buffer):
+                break
+            code = int(buffer[index + 2:index + 6], 16)
+            if 0xD800 <= code < 0xDC00:
+                if index + 12 > len(buffer):
+                    break
+                low = int(buffer[index + 8:index + 12], 16)
+                decoded.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                index += 12
+            else:
+                decoded.append(chr(code))
+                index += 6
+
+        self._position = index
+        return "".join(decoded)
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+from clients.llm import get_chat_llm
+
+SUMMARY_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            (
+                """
+Summarize the conversation below for an assistant that will continue it.
+Keep every fact the user provided (values, names, dates, decisions) and any open question.
+Answer with the summary only, in at most a few short sentences.
+
+PREVIOUS SUMMARY:
+{previous_summary}
+                """
+            ),
+        ),
+        MessagesPlaceholder(variable_name="messages"),
+    ]
+)
+
+
+async def summarize_history(previous_summary: str | None, messages: list[BaseMessage]) -> str:
+    prompt_messages = SUMMARY_PROMPT.format_messages(
+        previous_summary=previous_summary or "none",
+        messages=messages,
+    )
+    response = await get_chat_llm("summary").ainvoke(prompt_messages)
+    return response.text.strip()
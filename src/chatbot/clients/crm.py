@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import Any, Mapping, Optional
+
+import httpx
+
+from clients.transport import RETRY_STATUS_CODES, parse_retry_after
+from core.config import get_settings
+
+
+class CRMError(Exception):
+    """A CRM request failed; `retryable` tells the outbox worker whether to try again."""
+
+    def __init__(self, message: str, retryable: bool, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class CRMClient:
+    """Async CRM API client sharing one pooled HTTP session."""
+
+    def __init__(self, http_client: httpx.AsyncClient) -> None:
+        self._http = http_client
+
+    async def create_record(self, kind: str, payload: Mapping[str, Any], idempotency_key: str) -> str | None:
+        """Create a `kind` record ("project", "brief", ...) and return its CRM id when the API reports one.
+
+        The idempotency key lets the CRM drop duplicates when a request is retried after an
+        unknown outcome (timeouts, restarts while a request was in flight).
+        """
+        try:
+            response = await self._http.post(
+                f"/{kind}s",
+                json=dict(payload),
+                headers={"Idempotency-Key": idempotency_key},
+            )
+        except httpx.TransportError as exc:
+            raise CRMError(f"CRM request failed: {exc!r}", retryable=True) from exc
+
+        if response.is_success:
+            try:
+                body = response.json() if response.content else {}
+            except ValueError:
+                body = {}
+            record_id = (body.get("record_id") or body.get("id")) if isinstance(body, dict) else None
+            return str(record_id) if record_id is not None else None
+
+        # Same statuses as the LLM transport: timeouts, conflicts, throttling and transient server errors.
+        raise CRMError(
+            f"CRM returned {response.status_code} for {kind}: {response.text[:200]}",
+            retryable=response.status_code in RETRY_STATUS_CODES,
+            retry_after=parse_retry_after(response.headers.get("retry-after")),
+        )
+
+
+_http_client: Optional[httpx.AsyncClient] = None
+_client: Optional[CRMClient] = None
+
+
+def get_crm_client() -> CRMClient | None:
+    """Shared CRM client, or None when no CRM_BASE_URL is configured."""
+    global _http_client, _client
+    if _client is None:
+        settings = get_settings()
+        if not settings.crm_base_url:
+            return None
+        headers = {"Authorization": f"Bearer {settings.crm_api_key}"} if settings.crm_api_key else None
+        _http_client = httpx.AsyncClient(
+            base_url=settings.crm_base_url,
+            headers=headers,
+            timeout=settings.crm_timeout_seconds,
+            limits=httpx.Limits(max_connections=settings.crm_max_connections),
+        )
+        _client = CRMClient(_http_client)
+    return _client
+
+
+async def close_crm_client() -> None:
+    global _http_client, _client
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+    _client = None
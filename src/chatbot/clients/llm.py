@@ -1,17 +1,134 @@
 from __future__ import annotations
 
-from typing import Optional
+import threading
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Dict, Literal, Optional
 
-from langchain_openai import ChatOpenAI
+import httpx
+from langchain_core.messages import AIMessage, BaseMessage
 
-from core.config import get_settings
+from clients.transport import ResilientTransport
+from core.config import LLMRoute, get_settings
+from core.constants import COLORS
+from core.logging import get_logger
+from core.metrics import LLM_TOKENS
 
-_llm: Optional[ChatOpenAI] = None
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
+LLMPurpose = Literal["chat", "step_prompt", "validation_error", "summary"]
 
-def get_chat_llm() -> ChatOpenAI:
-    global _llm
-    if _llm is None:
+_llms: Dict[LLMRoute, ChatOpenAI] = {}
+_http_client: Optional[httpx.AsyncClient] = None
+# Warm-up builds the clients on a worker thread while requests may already call in from the loop.
+# Reentrant: get_route_llm creates the HTTP client while holding it.
+_clients_lock = threading.RLock()
+_transport: Optional[ResilientTransport] = None
+
+
+@dataclass(slots=True)
+class LLMUsage:
+    calls: int = 0
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    output_tokens: int = 0
+
+
+_usage = LLMUsage()
+
+
+def get_llm_http_client() -> httpx.AsyncClient:
+    """Shared async HTTP pool for every LLM call in the process."""
+    global _http_client, _transport
+    if _http_client is not None:
+        return _http_client
+    with _clients_lock:
+        if _http_client is not None:
+            return _http_client
         settings = get_settings()
-        _llm = ChatOpenAI(model=settings.openai_model_name, temperature=settings.openai_temperature)
-    return _llm
+        _transport = ResilientTransport(
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_keepalive_connections,
+                keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+            ),
+            max_concurrency=settings.llm_max_concurrency,
+            max_concurrency_per_model=settings.llm_max_concurrency_per_model,
+            max_retries=settings.llm_max_retries,
+            retry_base_delay=settings.llm_retry_base_delay_seconds,
+            hedging=settings.llm_hedging,
+            hedge_delay=settings.llm_hedge_delay_seconds,
+        )
+        _http_client = httpx.AsyncClient(transport=_transport, timeout=settings.llm_timeout_seconds)
+    return _http_client
+
+
+async def close_llm_http_client() -> None:
+    if _http_client is not None:
+        await _http_client.aclose()
+
+
+def resolve_llm_route(purpose: LLMPurpose = "chat") -> LLMRoute:
+    """Model and temperature for a call purpose; purposes without a route use the default model."""
+    settings = get_settings()
+    route = settings.llm_routes.get(purpose)
+    if route is None:
+        route = LLMRoute(model=settings.openai_model_name, temperature=settings.openai_temperature)
+    return route
+
+
+def get_chat_llm(purpose: LLMPurpose = "chat") -> ChatOpenAI:
+    return get_route_llm(resolve_llm_route(purpose))
+
+
+def get_route_llm(route: LLMRoute) -> ChatOpenAI:
+    # Purposes routed to the same model and temperature share one client.
+    llm = _llms.get(route)
+    if llm is not None:
+        return llm
+    with _clients_lock:
+        llm = _llms.get(route)
+        if llm is None:
+            # Imported on first use: the OpenAI SDK dominates process import time (see app.warmup).
+            from langchain_openai import ChatOpenAI
+
+            # stream_usage keeps token (and cached-token) counts available when responses are streamed.
+            # Retries happen in the shared transport, so the SDK's own retry loop is disabled.
+            llm = _llms[route] = ChatOpenAI(
+                model=route.model,
+                temperature=route.temperature,
+                stream_usage=True,
+                http_async_client=get_llm_http_client(),
+                max_retries=0,
+            )
+    return llm
+
+
+def record_llm_usage(messages: Iterable[BaseMessage]) -> None:
+    """Accumulate usage metadata (including prompt-cache hits) from freshly generated messages."""
+    for message in messages:
+        usage = getattr(message, "usage_metadata", None) if isinstance(message, AIMessage) else None
+        if not usage:
+            continue
+        cached = (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+        _usage.calls += 1
+        _usage.input_tokens += usage.get("input_tokens", 0)
+        _usage.cached_input_tokens += cached
+        _usage.output_tokens += usage.get("output_tokens", 0)
+        LLM_TOKENS.inc(usage.get("input_tokens", 0), kind="input")
+        LLM_TOKENS.inc(cached, kind="cached_input")
+        LLM_TOKENS.inc(usage.get("output_tokens", 0), kind="output")
+        get_logger("LLM_USAGE", COLORS["MAGENTA"]).debug(
+            "input=%s cached=%s output=%s",
+            usage.get("input_tokens", 0),
+            cached,
+            usage.get("output_tokens", 0),
+        )
+
+
+def get_llm_usage_stats() -> Dict[str, int]:
+    stats = asdict(_usage)
+    if _transport is not None:
+        stats.update(_transport.stats())
+    return stats
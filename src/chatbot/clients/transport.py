@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from time import monotonic, time
+from typing import Dict
+
+import httpx
+
+from core.constants import COLORS
+from core.logging import get_logger
+
+RETRY_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+# Hedge delays are derived from this many recent time-to-headers samples.
+_LATENCY_WINDOW = 200
+_MIN_LATENCY_SAMPLES = 20
+
+
+class _NoHedgeCapacity(Exception):
+    """The limits filled up before a hedge could start; the primary request decides the outcome."""
+
+
+@dataclass(slots=True)
+class TransportStats:
+    requests: int = 0
+    retries: int = 0
+    hedges: int = 0
+    hedges_won: int = 0
+    in_flight: int = 0
+
+
+class _Permits:
+    """Concurrency permits held for the whole lifetime of a response, body included."""
+
+    def __init__(self, *semaphores: asyncio.Semaphore | None) -> None:
+        self._semaphores = [semaphore for semaphore in semaphores if semaphore is not None]
+        self._held: list[asyncio.Semaphore] = []
+
+    async def acquire(self) -> None:
+        try:
+            for semaphore in self._semaphores:
+                await semaphore.acquire()
+                self._held.append(semaphore)
+        except BaseException:
+            # Cancelled while waiting on a later semaphore: give back the ones already held.
+            self.release()
+            raise
+
+    def available(self) -> bool:
+        return not any(semaphore.locked() for semaphore in self._semaphores)
+
+    async def try_acquire(self) -> bool:
+        if not self.available():
+            return False
+        # Every semaphore has a free slot, so none of these acquires suspends.
+        await self.acquire()
+        return True
+
+    def release(self) -> None:
+        while self._held:
+            self._held.pop().release()
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, on_close) -> None:
+        self._stream = stream
+        self._on_close = on_close
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self._stream.aclose()
+        finally:
+            self._on_close()
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """Pooled transport for LLM calls: concurrency limits, retries with backoff and optional hedging.
+
+    Permits (global and per model) are held until the response body is closed, so
+    streamed completions count against the limits for their whole duration.
+    """
+
+    def __init__(
+        self,
+        limits: httpx.Limits,
+        max_concurrency: int | None = None,
+        max_concurrency_per_model: int | None = None,
+        max_retries: int = 3,
+        retry_base_delay: float = 0.5,
+        retry_max_delay: float = 8.0,
+        hedging: bool = False,
+        hedge_delay: float | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        # `transport` replaces the pooled network transport, e.g. with a stub in tests.
+        self._transport = transport or httpx.AsyncHTTPTransport(limits=limits)
+        self._global = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._max_per_model = max_concurrency_per_model
+        self._per_model: dict[str, asyncio.Semaphore] = {}
+        self._max_retries = max_retries
+        self._retry_base_delay = retry_base_delay
+        self._retry_max_delay = retry_max_delay
+        self._hedging = hedging
+        self._hedge_delay = hedge_delay
+        self._latencies: deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._stats = TransportStats()
+        self._logger = get_logger("LLM_TRANSPORT", COLORS["BRIGHT_MAGENTA"])
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        # Buffer the body once so it can be replayed for retries and hedges.
+        await request.aread()
+        self._stats.requests += 1
+        model_semaphore = self._model_semaphore(request)
+
+        attempt = 0
+        while True:
+            try:
+                response = await self._send_hedged(request, model_semaphore)
+            except httpx.TransportError as exc:
+                if attempt >= self._max_retries:
+                    raise
+                reason, delay = type(exc).__name__, self._retry_delay(None, attempt)
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self._max_retries:
+                    return response
+                reason, delay = response.status_code, self._retry_delay(response, attempt)
+                await response.aclose()
+            attempt += 1
+            self._stats.retries += 1
+            self._logger.warning(
+                "LLM request failed (%s), retrying in %.2fs (attempt %d/%d)",
+                reason,
+                delay,
+                attempt,
+                self._max_retries,
+            )
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    def stats(self) -> Dict[str, int]:
+        return {f"llm_{name}": value for name, value in asdict(self._stats).items()}
+
+    def _model_semaphore(self, request: httpx.Request) -> asyncio.Semaphore | None:
+        if not self._max_per_model:
+            return None
+        try:
+            model = json.loads(request.content).get("model") or ""
+        except (ValueError, AttributeError):
+            model = ""
+        semaphore = self._per_model.get(model)
+        if semaphore is None:
+            semaphore = self._per_model[model] = asyncio.Semaphore(self._max_per_model)
+        return semaphore
+
+    async def _send(self, request: httpx.Request, permits: _Permits, hedge: bool = False) -> httpx.Response:
+        # Permits are taken inside the task, so a task cancelled before it starts holds nothing.
+        if not hedge:
+            await permits.acquire()
+        elif await permits.try_acquire():
+            self._stats.hedges += 1
+        else:
+            raise _NoHedgeCapacity()
+        self._stats.in_flight += 1
+
+        def release() -> None:
+            self._stats.in_flight -= 1
+            permits.release()
+
+        started = monotonic()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        self._latencies.append(monotonic() - started)
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    async def _send_hedged(
+        self,
+        request: httpx.Request,
+        model_semaphore: asyncio.Semaphore | None,
+    ) -> httpx.Response:
+        primary = asyncio.ensure_future(self._send(request, _Permits(self._global, model_semaphore)))
+
+        delay = self._current_hedge_delay()
+        if delay is None:
+            return await primary
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+        except BaseException:
+            primary.cancel()
+            primary.add_done_callback(_close_abandoned)
+            raise
+        if done:
+            return primary.result()
+
+        # Hedge only with spare capacity; a hedge must never queue behind other callers.
+        hedge_permits = _Permits(self._global, model_semaphore)
+        if not hedge_permits.available():
+            return await primary
+        hedge = asyncio.ensure_future(self._send(request, hedge_permits, hedge=True))
+        return await self._first_response(primary, hedge)
+
+    async def _first_response(self, primary: asyncio.Future, hedge: asyncio.Future) -> httpx.Response:
+        pending = {primary, hedge}
+        winner: asyncio.Future | None = None
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded:
+                    winner = primary if primary in succeeded else succeeded[0]
+                    for task in succeeded:
+                        if task is not winner:
+                            await task.result().aclose()
+        finally:
+            for task in pending:
+                task.cancel()
+                task.add_done_callback(_close_abandoned)
+        if winner is None:
+            raise primary.exception()
+        if winner is hedge:
+            self._stats.hedges_won += 1
+        return winner.result()
+
+    def _current_hedge_delay(self) -> float | None:
+        if not self._hedging:
+            return None
+        if self._hedge_delay is not None:
+            return self._hedge_delay
+        if len(self._latencies) < _MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def _retry_delay(self, response: httpx.Response | None, attempt: int) -> float:
+        retry_after = parse_retry_after(response.headers.get("retry-after")) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self._retry_max_delay)
+        backoff = min(self._retry_base_delay * (2**attempt), self._retry_max_delay)
+        # Full jitter keeps synchronized clients from retrying in lockstep.
+        return random.uniform(0, backoff)
+
+
+def _close_abandoned(task: asyncio.Future) -> None:
+    if task.cancelled() or task.exception() is not None:
+        return
+    asyncio.ensure_future(task.result().aclose())
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header: delay-seconds or an HTTP-date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+    except (TypeError, ValueError):
+        return None
@@ -1,27 +1,183 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from functools import lru_cache
+from typing import Mapping
 from langchain_core.globals import set_debug
 
 from dotenv import load_dotenv
 
 
+# Call purposes that can be routed to their own model; see `clients.llm.get_chat_llm`.
+LLM_PURPOSES = ("chat", "step_prompt", "validation_error", "summary")
+
+
+@dataclass(frozen=True)
+class LLMRoute:
+    model: str
+    temperature: float | None = None
+
+
 @dataclass(frozen=True)
 class Settings:
     openai_model_name: str
     openai_temperature: float
     debug: bool
+    # LangChain's global debug mode prints every prompt and response synchronously; opt-in only.
+    langchain_debug: bool = False
+    log_level: str = "WARNING"
+    log_format: str = "text"
+    log_levels: Mapping[str, str] = field(default_factory=dict)
+    log_sample_rates: Mapping[str, float] = field(default_factory=dict)
+    single_pass_turns: bool = False
+    structured_output: bool = False
+    conversation_store_backend: str = "memory"
+    conversation_store_path: str = "conversations.sqlite3"
+    # SQLite writers wait this long for another process's lock before failing.
+    conversation_store_busy_timeout_ms: int = 250
+    session_ttl_seconds: float | None = 3600.0
+    max_sessions: int | None = 10000
+    session_sweep_interval_seconds: float = 60.0
+    history_token_budget: int | None = 2000
+    response_cache_enabled: bool = False
+    response_cache_max_entries: int = 1024
+    response_cache_ttl_seconds: float = 3600.0
+    response_cache_path: str | None = None
+    # Rows kept in the SQLite tier; the least recently used ones are deleted beyond this.
+    response_cache_disk_max_entries: int = 10000
+    llm_timeout_seconds: float = 60.0
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry_seconds: float = 30.0
+    llm_max_concurrency: int | None = 64
+    llm_max_concurrency_per_model: int | None = None
+    llm_max_retries: int = 3
+    llm_retry_base_delay_seconds: float = 0.5
+    llm_hedging: bool = False
+    llm_hedge_delay_seconds: float | None = None
+    llm_routes: Mapping[str, LLMRoute] = field(default_factory=dict)
+    llm_warmup: bool = False
+    llm_warmup_timeout_seconds: float = 10.0
+    business_calendar: str = "default"
+    intent_fast_path: bool = True
+    intent_min_confidence: float = 0.8
+    crm_base_url: str | None = None
+    crm_api_key: str | None = None
+    crm_timeout_seconds: float = 10.0
+    crm_max_connections: int = 10
+    crm_outbox_path: str = "crm_outbox.sqlite3"
+    crm_max_attempts: int = 8
+    crm_retry_base_delay_seconds: float = 1.0
+    crm_retry_max_delay_seconds: float = 300.0
+    crm_poll_interval_seconds: float = 5.0
+    validator_timeout_seconds: float = 10.0
+    validator_max_threads: int = 4
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_number(name: str, default: float | None, cast: type = float) -> float | None:
+    """Read a numeric env var; an empty value or "none" disables the setting."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    value = value.strip().lower()
+    if value in {"", "none", "off"}:
+        return None
+    return cast(value)
+
+
+def _env_mapping(name: str, cast: type = str) -> dict:
+    """Read `NAME=value,OTHER=value` pairs, e.g. LOG_LEVELS="PROMPT=INFO,HISTORY=DEBUG"."""
+    mapping = {}
+    for item in (os.getenv(name) or "").split(","):
+        key, separator, value = item.partition("=")
+        if separator and key.strip():
+            mapping[key.strip()] = cast(value.strip())
+    return mapping
+
+
+def _llm_routes(default_model: str, default_temperature: float | None) -> dict[str, LLMRoute]:
+    """Read `LLM_ROUTE_<PURPOSE>_MODEL` / `_TEMPERATURE`; unset purposes use the default model."""
+    routes = {}
+    for purpose in LLM_PURPOSES:
+        prefix = f"LLM_ROUTE_{purpose.upper()}"
+        model = os.getenv(f"{prefix}_MODEL")
+        temperature = _env_number(f"{prefix}_TEMPERATURE", None)
+        if model or temperature is not None:
+            routes[purpose] = LLMRoute(
+                model=model or default_model,
+                temperature=temperature if temperature is not None else default_temperature,
+            )
+    return routes
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
     load_dotenv()
-    
-    set_debug(True)
-    
+
+    debug = _env_flag("DEBUG")
+    langchain_debug = _env_flag("LANGCHAIN_DEBUG")
+    set_debug(langchain_debug)
+
+    openai_model_name = os.getenv("OPENAI_MODEL_NAME")
+    openai_temperature = os.getenv("OPENAI_TEMPERATURE")
+
     return Settings(
-        openai_model_name=os.getenv("OPENAI_MODEL_NAME"),
-        openai_temperature=os.getenv("OPENAI_TEMPERATURE"),
-        debug=os.getenv("DEBUG"),
+        openai_model_name=openai_model_name,
+        openai_temperature=openai_temperature,
+        debug=debug,
+        langchain_debug=langchain_debug,
+        log_level=os.getenv("LOG_LEVEL") or ("DEBUG" if debug else "WARNING"),
+        log_format=(os.getenv("LOG_FORMAT") or "text").strip().lower(),
+        log_levels=_env_mapping("LOG_LEVELS"),
+        log_sample_rates=_env_mapping("LOG_SAMPLE_RATES", cast=float),
+        single_pass_turns=_env_flag("CHAT_SINGLE_PASS"),
+        structured_output=_env_flag("CHAT_STRUCTURED_OUTPUT"),
+        conversation_store_backend=os.getenv("CONVERSATION_STORE_BACKEND", "memory").strip().lower(),
+        conversation_store_path=os.getenv("CONVERSATION_STORE_PATH", "conversations.sqlite3"),
+        conversation_store_busy_timeout_ms=_env_number("CONVERSATION_STORE_BUSY_TIMEOUT_MS", 250, cast=int),
+        session_ttl_seconds=_env_number("SESSION_TTL_SECONDS", 3600.0),
+        max_sessions=_env_number("MAX_SESSIONS", 10000, cast=int),
+        session_sweep_interval_seconds=_env_number("SESSION_SWEEP_INTERVAL_SECONDS", 60.0) or 60.0,
+        history_token_budget=_env_number("HISTORY_TOKEN_BUDGET", 2000, cast=int),
+        response_cache_enabled=_env_flag("RESPONSE_CACHE"),
+        response_cache_max_entries=_env_number("RESPONSE_CACHE_MAX_ENTRIES", 1024, cast=int) or 1024,
+        response_cache_ttl_seconds=_env_number("RESPONSE_CACHE_TTL_SECONDS", 3600.0) or 3600.0,
+        response_cache_path=os.getenv("RESPONSE_CACHE_PATH") or None,
+        response_cache_disk_max_entries=_env_number("RESPONSE_CACHE_DISK_MAX_ENTRIES", 10000, cast=int) or 10000,
+        llm_timeout_seconds=_env_number("LLM_TIMEOUT_SECONDS", 60.0) or 60.0,
+        llm_max_connections=_env_number("LLM_MAX_CONNECTIONS", 100, cast=int) or 100,
+        llm_max_keepalive_connections=_env_number("LLM_MAX_KEEPALIVE_CONNECTIONS", 20, cast=int) or 20,
+        llm_keepalive_expiry_seconds=_env_number("LLM_KEEPALIVE_EXPIRY_SECONDS", 30.0) or 30.0,
+        llm_max_concurrency=_env_number("LLM_MAX_CONCURRENCY", 64, cast=int),
+        llm_max_concurrency_per_model=_env_number("LLM_MAX_CONCURRENCY_PER_MODEL", None, cast=int),
+        llm_max_retries=_env_number("LLM_MAX_RETRIES", 3, cast=int) or 0,
+        llm_retry_base_delay_seconds=_env_number("LLM_RETRY_BASE_DELAY_SECONDS", 0.5) or 0.5,
+        llm_hedging=_env_flag("LLM_HEDGING"),
+        # Without a fixed delay, hedges fire after the observed p95 time-to-first-byte.
+        llm_hedge_delay_seconds=_env_number("LLM_HEDGE_DELAY_SECONDS", None),
+        llm_routes=_llm_routes(openai_model_name, openai_temperature),
+        llm_warmup=_env_flag("LLM_WARMUP"),
+        llm_warmup_timeout_seconds=_env_number("LLM_WARMUP_TIMEOUT_SECONDS", 10.0) or 10.0,
+        business_calendar=(os.getenv("BUSINESS_CALENDAR") or "default").strip().lower(),
+        intent_fast_path=_env_flag("INTENT_FAST_PATH", default=True),
+        intent_min_confidence=_env_number("INTENT_MIN_CONFIDENCE", 0.8) or 0.8,
+        crm_base_url=os.getenv("CRM_BASE_URL") or None,
+        crm_api_key=os.getenv("CRM_API_KEY") or None,
+        crm_timeout_seconds=_env_number("CRM_TIMEOUT_SECONDS", 10.0) or 10.0,
+        crm_max_connections=_env_number("CRM_MAX_CONNECTIONS", 10, cast=int) or 10,
+        crm_outbox_path=os.getenv("CRM_OUTBOX_PATH", "crm_outbox.sqlite3"),
+        crm_max_attempts=_env_number("CRM_MAX_ATTEMPTS", 8, cast=int) or 1,
+        crm_retry_base_delay_seconds=_env_number("CRM_RETRY_BASE_DELAY_SECONDS", 1.0) or 1.0,
+        crm_retry_max_delay_seconds=_env_number("CRM_RETRY_MAX_DELAY_SECONDS", 300.0) or 300.0,
+        crm_poll_interval_seconds=_env_number("CRM_POLL_INTERVAL_SECONDS", 5.0) or 5.0,
+        validator_timeout_seconds=_env_number("VALIDATOR_TIMEOUT_SECONDS", 10.0) or 10.0,
+        validator_max_threads=_env_number("VALIDATOR_MAX_THREADS", 4, cast=int) or 4,
     )
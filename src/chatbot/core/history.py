@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import math
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from chains.summary import summarize_history
+from core.config import get_settings
+from core.constants import COLORS
+from core.logging import get_logger
+
+Summarizer = Callable[[str | None, List[BaseMessage]], Awaitable[str]]
+TokenCounter = Callable[[BaseMessage], int]
+
+# If the summarizer falls behind, keep at most this multiple of the budget verbatim.
+_HARD_LIMIT_FACTOR = 2
+
+
+def estimate_message_tokens(message: BaseMessage) -> int:
+    """Cheap token estimate (~4 characters per token plus per-message overhead)."""
+    return math.ceil(len(message.text) / 4) + 4
+
+
+@dataclass(slots=True)
+class _SessionHistory:
+    token_counts: List[int] = field(default_factory=list)
+    summary: str | None = None
+    summarized_upto: int = 0
+    pending: asyncio.Task | None = None
+
+
+class HistoryPolicy:
+    """Token-budgeted history window with an asynchronously maintained rolling summary.
+
+    The newest messages that fit into the token budget are kept verbatim. Older
+    messages are folded into a summary by a background task, so building a prompt
+    never waits for the summarizer; until the summary catches up, unsummarized
+    messages stay in the window (up to a hard limit).
+    """
+
+    def __init__(
+        self,
+        summarizer: Summarizer | None = None,
+        token_counter: TokenCounter = estimate_message_tokens,
+        max_sessions: int | None = None,
+    ) -> None:
+        self._summarizer = summarizer
+        self._token_counter = token_counter
+        self._max_sessions = max_sessions
+        self._sessions: OrderedDict[str, _SessionHistory] = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+        self._tokens_total = 0
+        self._tokens_sent = 0
+        self._summaries = 0
+        self._logger = get_logger("HISTORY", COLORS["MAGENTA"])
+
+    def _session(self, session_id: str) -> _SessionHistory:
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = self._sessions[session_id] = _SessionHistory()
+            if self._max_sessions is not None and len(self._sessions) > self._max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return state
+
+    def _count_tokens(self, state: _SessionHistory, messages: List[BaseMessage]) -> List[int]:
+        # History is append-only, so only messages added since the last call are counted.
+        counts = state.token_counts
+        counts.extend(self._token_counter(message) for message in messages[len(counts):])
+        return counts
+
+    @staticmethod
+    def _window_start(counts: List[int], budget: int, messages: List[BaseMessage]) -> int:
+        used = 0
+        start = len(counts)
+        while start > 0 and used + counts[start - 1] <= budget:
+            start -= 1
+            used += counts[start]
+        # Start the window on a user turn so it never opens with a dangling answer.
+        while start < len(messages) and not isinstance(messages[start], HumanMessage):
+            start += 1
+        return start
+
+    def window(self, session_id: str, messages: List[BaseMessage], token_budget: int | None) -> List[BaseMessage]:
+        """Return the messages to send as prompt history for `session_id`."""
+        if token_budget is None:
+            return messages
+
+        state = self._session(session_id)
+        if len(messages) < len(state.token_counts):
+            # The store dropped the session (idle TTL or session cap) and it started over:
+            # the old summary and counts describe a conversation that no longer exists.
+            state = self._sessions[session_id] = _SessionHistory()
+        counts = self._count_tokens(state, messages)
+        cut = self._window_start(counts, token_budget, messages)
+        hard_cut = self._window_start(counts, token_budget * _HARD_LIMIT_FACTOR, messages)
+        start = max(min(state.summarized_upto, cut), hard_cut)
+
+        if cut > state.summarized_upto:
+            self._schedule_summary(session_id, state, messages, cut)
+
+        window = messages[start:]
+        if state.summary and start > 0:
+            window = [SystemMessage(content=f"Summary of the earlier conversation:\n{state.summary}"), *window]
+
+        total = sum(counts)
+        self._tokens_total += total
+        self._tokens_sent += total - sum(counts[:start])
+        return window
+
+    def _schedule_summary(self, session_id: str, state: _SessionHistory, messages: List[BaseMessage], cut: int) -> None:
+        if self._summarizer is None or (state.pending is not None and not state.pending.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        summarizer = self._summarizer
+        previous_summary = state.summary
+        start = state.summarized_upto
+        to_fold = messages[start:cut]
+
+        async def summarize() -> None:
+            try:
+                summary = await summarizer(previous_summary, to_fold)
+            except Exception as exc:
+                self._logger.error("Failed to summarize history for %s: %s", session_id, exc)
+                return
+            if state.summarized_upto == start:
+                state.summary = summary
+                state.summarized_upto = cut
+                self._summaries += 1
+
+        task = loop.create_task(summarize())
+        state.pending = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "history_tokens_total": self._tokens_total,
+            "history_tokens_sent": self._tokens_sent,
+            "history_tokens_saved": self._tokens_total - self._tokens_sent,
+            "history_summaries": self._summaries,
+        }
+
+
+_policy: HistoryPolicy | None = None
+
+
+def get_history_policy() -> HistoryPolicy:
+    global _policy
+    if _policy is None:
+        _policy = HistoryPolicy(summarizer=summarize_history, max_sessions=get_settings().max_sessions)
+    return _policy
@@ -1,11 +1,25 @@
 from __future__ import annotations
 
+import atexit
+import copy
+import json
 import logging
-from functools import lru_cache
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict
 
 from core.config import get_settings
 from core.constants import COLORS
 
+# Records are dropped (and counted) rather than blocking the caller when the writer falls behind.
+_QUEUE_SIZE = 10000
+
+_EXCEPTION_FORMATTER = logging.Formatter()
+
 
 def color_text(text: str, color: str | None = None) -> str:
     """Apply color to the given text if a color is provided."""
@@ -21,24 +35,123 @@ class ColorFormatter(logging.Formatter):
 
     def format(self, record: logging.LogRecord) -> str:
         base = super().format(record)
-        return color_text(base, self.color)
+        return color_text(base, getattr(record, "color", None) or self.color)
 
 
-@lru_cache(maxsize=8)
-def get_logger(name: str = "chatbot.tools", color: str | None = None) -> logging.Logger:
-    """Get a logger with a custom color formatter."""
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _AsyncQueueHandler(QueueHandler):
+    """Hands records to the background writer; only the message itself is rendered on the caller's thread."""
+
+    def __init__(self, log_queue: queue.Queue, color: str | None, sample_rate: float) -> None:
+        super().__init__(log_queue)
+        self.color = color
+        self.sample_rate = sample_rate
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Like the stdlib QueueHandler, render the message now: arguments may be mutated (or be
+        # unsafe to read from another thread) by the time the writer gets to them. Only records
+        # that passed the level and sampling checks get here.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _EXCEPTION_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        record.color = self.color
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Verbose debug events can be sampled per logger.
+        if record.levelno <= logging.DEBUG and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            self.dropped += 1
+
+
+_queue: queue.Queue = queue.Queue(maxsize=_QUEUE_SIZE)
+_listener: QueueListener | None = None
+_loggers: Dict[str, logging.Logger] = {}
+_lock = threading.Lock()
+
+
+def _start_listener() -> None:
+    global _listener
     settings = get_settings()
+    handler = logging.StreamHandler(sys.stderr)
+    if settings.log_format == "json":
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(ColorFormatter("\n[%(name)s]\n%(message)s\n"))
+    _listener = QueueListener(_queue, handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def _parse_level(value: str | None, default: int) -> int:
+    if not value:
+        return default
+    level = logging.getLevelName(value.strip().upper())
+    return level if isinstance(level, int) else default
+
+
+def get_logger(name: str = "chatbot.tools", color: str | None = None) -> logging.Logger:
+    """Get a logger writing through the shared background queue (configured once per name)."""
+    logger = _loggers.get(name)
+    if logger is not None:
+        return logger
+
+    with _lock:
+        logger = _loggers.get(name)
+        if logger is not None:
+            return logger
+
+        settings = get_settings()
+        if _listener is None:
+            _start_listener()
 
-    logger = logging.getLogger(name)
-    logger.handlers.clear()
-    logger.propagate = False
+        logger = logging.getLogger(name)
+        logger.handlers.clear()
+        logger.propagate = False
+        logger.addHandler(_AsyncQueueHandler(_queue, color, settings.log_sample_rates.get(name, 1.0)))
+        logger.setLevel(_parse_level(settings.log_levels.get(name) or settings.log_level, logging.WARNING))
 
-    handler = logging.StreamHandler()
-    formatter = ColorFormatter("\n[%(name)s]\n%(message)s\n", color)
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+        _loggers[name] = logger
+        return logger
 
-    logger.setLevel(logging.DEBUG if settings.debug else logging.CRITICAL + 1)
-    logger.disabled = not settings.debug
 
-    return logger
+def get_logging_stats() -> Dict[str, int]:
+    dropped = sum(
+        handler.dropped
+        for logger in _loggers.values()
+        for handler in logger.handlers
+        if isinstance(handler, _AsyncQueueHandler)
+    )
+    return {"log_queue_size": _queue.qsize(), "log_records_dropped": dropped}
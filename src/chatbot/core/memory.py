@@ -1,105 +1,178 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Literal
-from dataclasses import dataclass
+import asyncio
+import contextvars
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, contextmanager
+from functools import lru_cache, partial
+from typing import Any, Dict, List, Protocol, TypeVar
+from dataclasses import dataclass, field, fields, make_dataclass
 
 from langchain_core.messages import BaseMessage
+from core.config import get_settings
 from core.logging import get_logger
-from core.constants import COLORS, WorkTypes
+from core.constants import COLORS
 
+T = TypeVar("T")
 
-@dataclass
-class ProjectWorkflowState:
-    budget: float | None = None
-    description: str | None = None
-    step_index: int = 0
 
+@dataclass(slots=True)
+class WorkflowState:
+    """State of a workflow without value fields (e.g. "none"); registered workflows extend it."""
 
-@dataclass
-class BriefWorkflowState:
-    work_types: List[WorkTypes] | None = None
-    name: str | None = None
-    description: str | None = None
     step_index: int = 0
 
 
-class ConversationStore:
-    def __init__(self) -> None:
-        self._sessions: Dict[str, List[BaseMessage]] = {}
-        self._active_workflows: Dict[str, Literal["none", "brief", "project"]] = {}
-        self._default_workflow: Literal["none", "brief", "project"] = "none"
-        self._current_session_id: str | None = None
-        self._workflows: Dict[str, Any] = {}
-        self._logger = get_logger("WORKFLOW_STATE", COLORS["CYAN"])
+# Slotted state record per workflow, created from its step keys when the workflow is registered.
+_workflow_state_types: Dict[str, type] = {}
 
-    def read(self, session_id: str) -> List[BaseMessage]:
-        return self._sessions.get(session_id, []).copy()
 
-    def append(self, session_id: str, *messages: BaseMessage) -> None:
-        self._sessions.setdefault(session_id, []).extend(messages)
+def register_workflow_state(workflow: str, keys: Iterable[str]) -> type:
+    """Create the slotted state record of `workflow`: one field per step key, plus `step_index`."""
+    value_fields = [(key, Any, field(default=None)) for key in dict.fromkeys(keys) if key != "step_index"]
+    state_type = make_dataclass(
+        f"{workflow.title().replace('_', '')}WorkflowState",
+        value_fields,
+        bases=(WorkflowState,),
+        slots=True,
+    )
+    _workflow_state_types[workflow] = state_type
+    return state_type
 
-    def get_active_workflow(self, session_id: str) -> Literal["none", "brief", "project"]:
-        return self._active_workflows.get(session_id, self._default_workflow)
 
-    def set_active_workflow(self, session_id: str, workflow: Literal["none", "brief", "project"]) -> None:
-        self._active_workflows[session_id] = workflow
-        if workflow == "project":
-            self._initialize_project_workflow(session_id)
-        elif workflow == "brief":
-            self._initialize_brief_workflow(session_id)
-        else:
-            self.set_workflow_step_index(session_id, 0)
+def workflow_state_type(workflow: str) -> type:
+    return _workflow_state_types.get(workflow, WorkflowState)
 
-    def set_current_session(self, session_id: str) -> None:
-        self._current_session_id = session_id
-        if session_id not in self._active_workflows:
-            self.set_active_workflow(session_id, self._default_workflow)
 
-    def get_current_session(self) -> str | None:
-        return self._current_session_id
+def workflow_state_keys(workflow: str) -> frozenset[str]:
+    return frozenset(state_field.name for state_field in fields(workflow_state_type(workflow)))
 
-    def _initialize_project_workflow(self, session_id: str) -> None:
-        self._workflows["project"] = ProjectWorkflowState()
-        self._logger.debug(repr(self._workflows))
 
-    def _initialize_brief_workflow(self, session_id: str) -> None:
-        self._workflows["brief"] = BriefWorkflowState()
-        self._logger.debug(repr(self._workflows))
+class ConversationStore(Protocol):
+    """Storage backend for conversation history and per-session workflow state."""
 
-    def set_workflow_value(self, session_id: str, workflow: str, key: str, value: Any) -> None:
-        if workflow == "project":
-            self._set_project_workflow_value(key, value)
-        elif workflow == "brief":
-            self._set_brief_workflow_value(key, value)
+    # True when calls block on disk or locks; `run_store_io` then runs them off the event loop.
+    blocking_io: bool
+
+    def transaction(self) -> AbstractContextManager[Any]:
+        """Group several writes into one commit."""
+        ...
+
+    def read(self, session_id: str) -> List[BaseMessage]: ...
+
+    def append(self, session_id: str, *messages: BaseMessage) -> None: ...
+
+    def get_active_workflow(self, session_id: str) -> str: ...
+
+    def set_active_workflow(self, session_id: str, workflow: str) -> None: ...
+
+    def ensure_session(self, session_id: str) -> None: ...
+
+    def set_workflow_value(self, session_id: str, workflow: str, key: str, value: Any) -> None: ...
+
+    def get_workflow_value(self, session_id: str, workflow: str, key: str) -> Any | None: ...
+
+    def get_workflow_step_index(self, session_id: str) -> int: ...
+
+    def set_workflow_step_index(self, session_id: str, index: int) -> None: ...
+
+    def advance_workflow_step(self, session_id: str) -> None: ...
+
+    def evict_idle(self) -> int:
+        """Drop sessions idle for longer than the configured TTL and return how many were evicted."""
+        ...
+
+    def stats(self) -> Dict[str, int]: ...
+
+
+@dataclass(slots=True)
+class SessionRecord:
+    messages: List[BaseMessage] = field(default_factory=list)
+    active_workflow: str = "none"
+    # Workflow name -> its slotted state record (see `register_workflow_state`).
+    workflows: Dict[str, WorkflowState] = field(default_factory=dict)
+    last_access: float = 0.0
+
+
+class InMemoryConversationStore:
+    blocking_io = False
+
+    def __init__(self, session_ttl_seconds: float | None = None, max_sessions: int | None = None) -> None:
+        # Ordered by last access, so the least recently used session is always first.
+        self._records: OrderedDict[str, SessionRecord] = OrderedDict()
+        self._default_workflow: str = "none"
+        self._session_ttl_seconds = session_ttl_seconds
+        self._max_sessions = max_sessions
+        self._evictions = 0
+        self._logger = get_logger("WORKFLOW_STATE", COLORS["CYAN"])
+
+    def _record(self, session_id: str) -> SessionRecord:
+        record = self._records.get(session_id)
+        if record is None:
+            record = SessionRecord(active_workflow=self._default_workflow)
+            self._records[session_id] = record
+            self._enforce_session_cap()
         else:
-            self._workflows.setdefault(workflow, {})[key] = value
-        self._logger.debug(repr(self._workflows))
+            self._records.move_to_end(session_id)
+        record.last_access = time.monotonic()
+        return record
+
+    def _enforce_session_cap(self) -> None:
+        if self._max_sessions is None:
+            return
+        while len(self._records) > self._max_sessions:
+            self._records.popitem(last=False)
+            self._evictions += 1
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        # Dict updates need no commit; callers on the event loop are not interleaved.
+        yield
+
+    def read(self, session_id: str) -> List[BaseMessage]:
+        return self._record(session_id).messages.copy()
+
+    def append(self, session_id: str, *messages: BaseMessage) -> None:
+        self._record(session_id).messages.extend(messages)
 
-    def _set_project_workflow_value(self, key: str, value: Any) -> None:
-        state = self._workflows.get("project", ProjectWorkflowState())
-        if hasattr(state, key):
-            setattr(state, key, value)
-        self._workflows["project"] = state
+    def get_active_workflow(self, session_id: str) -> str:
+        record = self._records.get(session_id)
+        return record.active_workflow if record is not None else self._default_workflow
 
-    def _set_brief_workflow_value(self, key: str, value: Any) -> None:
-        state = self._workflows.get("brief", BriefWorkflowState())
-        if hasattr(state, key):
-            setattr(state, key, value)
-        self._workflows["brief"] = state
+    def set_active_workflow(self, session_id: str, workflow: str) -> None:
+        record = self._record(session_id)
+        record.active_workflow = workflow
+        # Entering a workflow always starts it from scratch.
+        record.workflows[workflow] = workflow_state_type(workflow)()
+        self._logger.debug("%s: %r", session_id, record.workflows)
+
+    def ensure_session(self, session_id: str) -> None:
+        if session_id not in self._records:
+            self.set_active_workflow(session_id, self._default_workflow)
+
+    def set_workflow_value(self, session_id: str, workflow: str, key: str, value: Any) -> None:
+        if key not in workflow_state_keys(workflow):
+            self._logger.warning("Ignoring unknown field %r for workflow %r (session %s)", key, workflow, session_id)
+            return
+        record = self._record(session_id)
+        state = record.workflows.get(workflow)
+        if state is None:
+            state = record.workflows[workflow] = workflow_state_type(workflow)()
+        setattr(state, key, value)
+        self._logger.debug("%s: %r", session_id, record.workflows)
 
     def get_workflow_value(self, session_id: str, workflow: str, key: str) -> Any | None:
-        if workflow == "project":
-            state = self._workflows.get("project")
-            return getattr(state, key, None) if isinstance(state, ProjectWorkflowState) else None
-        if workflow == "brief":
-            state = self._workflows.get("brief")
-            return getattr(state, key, None) if isinstance(state, BriefWorkflowState) else None
-        return self._workflows.get(workflow, {}).get(key)
+        record = self._records.get(session_id)
+        state = record.workflows.get(workflow) if record is not None else None
+        return getattr(state, key, None) if state is not None else None
 
     def get_workflow_step_index(self, session_id: str) -> int:
         workflow = self.get_active_workflow(session_id)
         index = self.get_workflow_value(session_id, workflow, "step_index")
-        return self._safe_int(index, default=0)
+        return safe_int(index, default=0)
 
     def set_workflow_step_index(self, session_id: str, index: int) -> None:
         workflow = self.get_active_workflow(session_id)
@@ -109,19 +182,89 @@ class ConversationStore:
         current = self.get_workflow_step_index(session_id)
         self.set_workflow_step_index(session_id, current + 1)
 
-    @staticmethod
-    def _safe_int(value: Any, default: int = 0) -> int:
-        try:
-            return int(value)
-        except (TypeError, ValueError):
-            return default
+    def evict_idle(self) -> int:
+        if self._session_ttl_seconds is None:
+            return 0
+        deadline = time.monotonic() - self._session_ttl_seconds
+        evicted = 0
+        while self._records:
+            session_id, record = next(iter(self._records.items()))
+            if record.last_access > deadline:
+                break
+            del self._records[session_id]
+            evicted += 1
+        self._evictions += evicted
+        return evicted
+
+    def stats(self) -> Dict[str, int]:
+        return {"live_sessions": len(self._records), "evicted_sessions": self._evictions}
+
+
+def safe_int(value: Any, default: int = 0) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
 
 
 _store: ConversationStore | None = None
 
 
+def _create_conversation_store() -> ConversationStore:
+    settings = get_settings()
+    if settings.conversation_store_backend == "sqlite":
+        # Imported lazily so the default in-memory backend never touches sqlite.
+        from core.sqlite_memory import SQLiteConversationStore
+
+        return SQLiteConversationStore(
+            settings.conversation_store_path,
+            busy_timeout_ms=settings.conversation_store_busy_timeout_ms,
+            session_ttl_seconds=settings.session_ttl_seconds,
+            max_sessions=settings.max_sessions,
+        )
+    if settings.conversation_store_backend != "memory":
+        raise ValueError(f"Unknown conversation store backend: {settings.conversation_store_backend!r}")
+    return InMemoryConversationStore(
+        session_ttl_seconds=settings.session_ttl_seconds,
+        max_sessions=settings.max_sessions,
+    )
+
+
 def get_conversation_store() -> ConversationStore:
     global _store
     if _store is None:
-        _store = ConversationStore()
+        _store = _create_conversation_store()
     return _store
+
+
+@lru_cache(maxsize=1)
+def _store_executor() -> ThreadPoolExecutor:
+    # A single thread: the SQLite store serializes its calls on one connection anyway.
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="conversation-store")
+
+
+async def run_store_io(call: Callable[..., T], *args: Any) -> T:
+    """Run a store call off the event loop when the backend blocks on I/O, inline otherwise."""
+    if not get_conversation_store().blocking_io:
+        return call(*args)
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(_store_executor(), partial(context.run, call, *args))
+
+
+def save_step_value(store: ConversationStore, session_id: str, workflow: str, key: str | None, value: Any) -> None:
+    """Store an accepted step value and move to the next step in a single commit."""
+    with store.transaction():
+        if key is not None:
+            store.set_workflow_value(session_id, workflow, key, value)
+        store.advance_workflow_step(session_id)
+
+
+async def sweep_idle_sessions(interval_seconds: float) -> None:
+    """Periodically evict idle sessions from the conversation store until cancelled."""
+    logger = get_logger("WORKFLOW_STATE", COLORS["CYAN"])
+    while True:
+        await asyncio.sleep(interval_seconds)
+        store = get_conversation_store()
+        evicted = await run_store_io(store.evict_idle)
+        if evicted:
+            logger.debug("Evicted %d idle sessions: %r", evicted, store.stats())
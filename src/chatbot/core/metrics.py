@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Tuple
+
+# Latency buckets in seconds, from sub-millisecond local work up to slow LLM calls.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Mapping[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        key = _label_key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_format_labels(key)} {_format_number(value)}" for key, value in self._values.items())
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._buckets = tuple(sorted(buckets))
+        # Per label set: [non-cumulative bucket counts..., +Inf count], sum
+        self._series: Dict[LabelKey, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = _label_key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self._buckets) + 1), [0.0])
+        counts, total = series
+        counts[bisect_left(self._buckets, value)] += 1
+        total[0] += value
+
+    @contextmanager
+    def time(self, **labels: object) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self._buckets, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, (('le', _format_number(bound)),))} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{self.name}_bucket{_format_labels(key, (('le', '+Inf'),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_number(total[0])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+TURN_SECONDS = Histogram("chat_turn_seconds", "Duration of a whole chat turn.")
+PREPARE_PROMPT_SECONDS = Histogram("chat_prepare_prompt_seconds", "Time spent building prompt messages.")
+GENERATE_SECONDS = Histogram("chat_generate_seconds", "Duration of one graph run, by LLM purpose.")
+GRAPH_NODE_SECONDS = Histogram("chat_graph_node_seconds", "Duration of chat graph nodes.")
+PARSE_SECONDS = Histogram("chat_parse_seconds", "Time spent parsing the final LLM answer.")
+VALIDATOR_SECONDS = Histogram("chat_validator_seconds", "Duration of workflow step validators.")
+STORE_SECONDS = Histogram("chat_store_seconds", "Duration of conversation store operations.")
+LLM_CALLS_PER_TURN = Histogram("chat_llm_calls_per_turn", "LLM calls made during one chat turn.", COUNT_BUCKETS)
+
+TURNS = Counter("chat_turns_total", "Chat turns handled, by outcome.")
+LLM_CALLS = Counter("llm_calls_total", "LLM calls, by model.")
+LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens from usage metadata, by kind.")
+PARSER_FALLBACKS = Counter("chat_parser_fallbacks_total", "Final answers that did not parse as ChatLLMResult.")
+VALIDATION_FAILURES = Counter("chat_validation_failures_total", "Rejected step values, by workflow and step.")
+
+_METRICS: List[Counter | Histogram] = [
+    TURN_SECONDS,
+    PREPARE_PROMPT_SECONDS,
+    GENERATE_SECONDS,
+    GRAPH_NODE_SECONDS,
+    PARSE_SECONDS,
+    VALIDATOR_SECONDS,
+    STORE_SECONDS,
+    LLM_CALLS_PER_TURN,
+    TURNS,
+    LLM_CALLS,
+    LLM_TOKENS,
+    PARSER_FALLBACKS,
+    VALIDATION_FAILURES,
+]
+
+# Callables returning point-in-time values (cache sizes, live sessions, ...) exported as gauges.
+_gauge_collectors: List[Callable[[], Mapping[str, float]]] = []
+
+_turn_llm_calls: ContextVar[List[int] | None] = ContextVar("turn_llm_calls", default=None)
+
+
+def register_gauges(collector: Callable[[], Mapping[str, float]]) -> None:
+    _gauge_collectors.append(collector)
+
+
+@contextmanager
+def turn_scope() -> Iterator[None]:
+    """Time a chat turn and count the LLM calls made while it runs."""
+    calls = [0]
+    token = _turn_llm_calls.set(calls)
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        _turn_llm_calls.reset(token)
+        TURN_SECONDS.observe(time.perf_counter() - started)
+        LLM_CALLS_PER_TURN.observe(calls[0])
+        TURNS.inc(outcome=outcome)
+
+
+def count_llm_call(model: str | None) -> None:
+    LLM_CALLS.inc(model=model or "")
+    calls = _turn_llm_calls.get()
+    if calls is not None:
+        calls[0] += 1
+
+
+def render_metrics() -> str:
+    """Render every metric in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    for collector in _gauge_collectors:
+        for name, value in collector().items():
+            if isinstance(value, (int, float)):
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {_format_number(value)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable
+
+from langchain_core.messages import BaseMessage
+
+from core.config import get_settings
+
+# Timestamps are reduced to their date so the per-request datetime does not defeat the cache.
+# Everything else stays exact: cached answers carry extracted values copied from the user's text.
+_TIMESTAMP_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2})T[\d:.]+(?:Z|[+-]\d{2}:\d{2})?")
+
+_DISK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS response_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_response_cache_expires ON response_cache (expires_at);
+CREATE INDEX IF NOT EXISTS idx_response_cache_last_used ON response_cache (last_used);
+"""
+
+
+def _normalize_text(text: str) -> str:
+    return _TIMESTAMP_PATTERN.sub(r"\1", text)
+
+
+def response_cache_key(system_prompt: str, messages: Iterable[BaseMessage], model: str | None = None) -> str:
+    """Hash the rendered prompt with timestamps reduced to dates; all other text must match exactly."""
+    payload = [("model", model or ""), ("system", _normalize_text(system_prompt))]
+    payload.extend((message.type, _normalize_text(message.text)) for message in messages)
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Exact-match cache of final LLM answers: an in-memory LRU with TTL plus an optional SQLite tier.
+
+    The SQLite tier runs on its own thread, so lookups that miss memory do not block the event loop.
+    Entries keep the expiry they were written with in both tiers.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        path: str | None = None,
+        disk_max_entries: int = 10000,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._disk_max_entries = disk_max_entries
+        self._entries: OrderedDict[str, tuple[float, Dict[str, Any]]] = OrderedDict()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        if path:
+            self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(response_cache)")}
+            if columns and "last_used" not in columns:
+                # Written by an older version; it is only a cache, so start over.
+                self._connection.execute("DROP TABLE response_cache")
+            self._connection.executescript(_DISK_SCHEMA)
+            self._connection.execute("DELETE FROM response_cache WHERE expires_at < ?", (time.time(),))
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="response-cache")
+
+    async def get(self, key: str) -> Dict[str, Any] | None:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return value
+            del self._entries[key]
+            self._evictions += 1
+
+        row = await self._run_disk(self._disk_get, key, now) if self._connection is not None else None
+        if row is None:
+            self._misses += 1
+            return None
+        value, expires_at = row
+        self._disk_hits += 1
+        self._remember(key, value, expires_at)
+        return value
+
+    async def put(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        expires_at = now + self._ttl_seconds
+        self._remember(key, value, expires_at)
+        if self._connection is not None:
+            await self._run_disk(self._disk_put, key, json.dumps(value), expires_at, now)
+
+    async def _run_disk(self, call: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call, *args)
+
+    def _remember(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _disk_get(self, key: str, now: float) -> tuple[Dict[str, Any], float] | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM response_cache WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute("UPDATE response_cache SET last_used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0]), row[1]
+
+    def _disk_put(self, key: str, value: str, expires_at: float, now: float) -> None:
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO response_cache (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                    (key, value, expires_at, now),
+                )
+                # Least recently used rows beyond the cap go first.
+                self._connection.execute(
+                    "DELETE FROM response_cache WHERE key IN "
+                    "(SELECT key FROM response_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self._disk_max_entries,),
+                )
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "response_cache_hits": self._hits,
+            "response_cache_disk_hits": self._disk_hits,
+            "response_cache_misses": self._misses,
+            "response_cache_evictions": self._evictions,
+            "response_cache_entries": len(self._entries),
+        }
+
+
+_cache: ResponseCache | None = None
+
+
+def get_response_cache() -> ResponseCache | None:
+    """Return the shared response cache, or None when it is disabled."""
+    global _cache
+    settings = get_settings()
+    if not settings.response_cache_enabled:
+        return None
+    if _cache is None:
+        _cache = ResponseCache(
+            max_entries=settings.response_cache_max_entries,
+            ttl_seconds=settings.response_cache_ttl_seconds,
+            path=settings.response_cache_path,
+            disk_max_entries=settings.response_cache_disk_max_entries,
+        )
+    return _cache
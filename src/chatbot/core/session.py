@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Dict
+
+_current_session_id: ContextVar[str | None] = ContextVar("current_session_id", default=None)
+
+
+def get_current_session_id() -> str | None:
+    """Return the session bound to the running request, if any."""
+    return _current_session_id.get()
+
+
+@contextmanager
+def bind_session(session_id: str) -> Iterator[None]:
+    token = _current_session_id.set(session_id)
+    try:
+        yield
+    finally:
+        _current_session_id.reset(token)
+
+
+class SessionLocks:
+    """Per-session asyncio locks that are dropped once no turn holds or awaits them.
+
+    The locks only order turns within one process. With several workers sharing the SQLite
+    conversation store, two turns of the same session that land on different workers still
+    run concurrently; route a session to a single worker (sticky sessions) to keep them ordered.
+    """
+
+    def __init__(self) -> None:
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._users: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def hold(self, session_id: str) -> AsyncIterator[None]:
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        self._users[session_id] = self._users.get(session_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._users[session_id] -= 1
+            if self._users[session_id] == 0:
+                del self._users[session_id]
+                del self._locks[session_id]
+
+
+_session_locks = SessionLocks()
+
+
+@asynccontextmanager
+async def session_scope(session_id: str) -> AsyncIterator[None]:
+    """Order turns of the same session in this process and bind it as the current session for the duration."""
+    async with _session_locks.hold(session_id):
+        with bind_session(session_id):
+            yield
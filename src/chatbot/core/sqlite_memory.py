@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+from core.constants import COLORS
+from core.logging import get_logger
+from core.memory import safe_int, workflow_state_keys
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id, id);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    active_workflow TEXT NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_last_access ON sessions (last_access);
+
+CREATE TABLE IF NOT EXISTS workflow_values (
+    session_id TEXT NOT NULL,
+    workflow TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (session_id, workflow, key)
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteConversationStore:
+    """Durable conversation store backed by a single SQLite file in WAL mode.
+
+    Messages are append-only rows indexed by session, so several worker processes
+    can share one database file on the same host. Calls block on disk and on other
+    processes' write locks, so async callers go through `run_store_io`.
+    """
+
+    blocking_io = True
+
+    def __init__(
+        self,
+        path: str,
+        busy_timeout_ms: int = 250,
+        session_ttl_seconds: float | None = None,
+        max_sessions: int | None = None,
+    ) -> None:
+        self._default_workflow: str = "none"
+        self._session_ttl_seconds = session_ttl_seconds
+        self._max_sessions = max_sessions
+        self._evictions = 0
+        self._logger = get_logger("WORKFLOW_STATE", COLORS["CYAN"])
+        self._lock = threading.RLock()
+        self._depth = 0
+
+        # Autocommit mode; transactions are opened explicitly in `transaction()`.
+        self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        self._connection.executescript(_SCHEMA)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Group writes into one commit; nested calls join the outermost transaction."""
+        with self._lock:
+            if self._depth == 0:
+                self._connection.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self._connection
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._connection.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self._connection.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def read(self, session_id: str) -> List[BaseMessage]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT payload FROM messages WHERE session_id = ? ORDER BY id",
+                (session_id,),
+            ).fetchall()
+        return messages_from_dict([json.loads(payload) for (payload,) in rows])
+
+    def append(self, session_id: str, *messages: BaseMessage) -> None:
+        if not messages:
+            return
+        rows = [(session_id, json.dumps(message_to_dict(message))) for message in messages]
+        with self.transaction() as connection:
+            connection.executemany("INSERT INTO messages (session_id, payload) VALUES (?, ?)", rows)
+            self._upsert_session(connection, session_id)
+
+    def get_active_workflow(self, session_id: str) -> str:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT active_workflow FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        return row[0] if row else self._default_workflow
+
+    def set_active_workflow(self, session_id: str, workflow: str) -> None:
+        with self.transaction() as connection:
+            connection.execute(
+                "INSERT INTO sessions (session_id, active_workflow, last_access) VALUES (?, ?, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET "
+                "active_workflow = excluded.active_workflow, last_access = excluded.last_access",
+                (session_id, workflow, time.time()),
+            )
+            # Entering a workflow always starts it from scratch.
+            connection.execute(
+                "DELETE FROM workflow_values WHERE session_id = ? AND workflow = ?",
+                (session_id, workflow),
+            )
+            self.set_workflow_step_index(session_id, 0)
+
+    def ensure_session(self, session_id: str) -> None:
+        with self.transaction() as connection:
+            if not self._touch(connection, session_id):
+                self.set_active_workflow(session_id, self._default_workflow)
+                self._enforce_session_cap(connection)
+
+    @staticmethod
+    def _touch(connection: sqlite3.Connection, session_id: str) -> bool:
+        cursor = connection.execute(
+            "UPDATE sessions SET last_access = ? WHERE session_id = ?",
+            (time.time(), session_id),
+        )
+        return cursor.rowcount > 0
+
+    def _upsert_session(self, connection: sqlite3.Connection, session_id: str) -> None:
+        # The session may have been evicted (cap or idle TTL) while its turn was running; recreate
+        # its row so the rows written now stay owned by a session and are evicted with it later.
+        connection.execute(
+            "INSERT INTO sessions (session_id, active_workflow, last_access) VALUES (?, ?, ?) "
+            "ON CONFLICT (session_id) DO UPDATE SET last_access = excluded.last_access",
+            (session_id, self._default_workflow, time.time()),
+        )
+
+    def set_workflow_value(self, session_id: str, workflow: str, key: str, value: Any) -> None:
+        # Same fields as the in-memory store's slotted records.
+        if key not in workflow_state_keys(workflow):
+            self._logger.warning("Ignoring unknown field %r for workflow %r (session %s)", key, workflow, session_id)
+            return
+        with self.transaction() as connection:
+            connection.execute(
+                "INSERT INTO workflow_values (session_id, workflow, key, value) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (session_id, workflow, key) DO UPDATE SET value = excluded.value",
+                (session_id, workflow, key, json.dumps(value)),
+            )
+            self._upsert_session(connection, session_id)
+        self._logger.debug("%s.%s = %r (session %s)", workflow, key, value, session_id)
+
+    def get_workflow_value(self, session_id: str, workflow: str, key: str) -> Any | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM workflow_values WHERE session_id = ? AND workflow = ? AND key = ?",
+                (session_id, workflow, key),
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def get_workflow_step_index(self, session_id: str) -> int:
+        workflow = self.get_active_workflow(session_id)
+        index = self.get_workflow_value(session_id, workflow, "step_index")
+        return safe_int(index, default=0)
+
+    def set_workflow_step_index(self, session_id: str, index: int) -> None:
+        workflow = self.get_active_workflow(session_id)
+        self.set_workflow_value(session_id, workflow, "step_index", max(0, index))
+
+    def advance_workflow_step(self, session_id: str) -> None:
+        with self.transaction():
+            current = self.get_workflow_step_index(session_id)
+            self.set_workflow_step_index(session_id, current + 1)
+
+    def evict_idle(self) -> int:
+        if self._session_ttl_seconds is None:
+            return 0
+        with self.transaction() as connection:
+            rows = connection.execute(
+                "SELECT session_id FROM sessions WHERE last_access < ?",
+                (time.time() - self._session_ttl_seconds,),
+            ).fetchall()
+            return self._delete_sessions(connection, [session_id for (session_id,) in rows])
+
+    def _enforce_session_cap(self, connection: sqlite3.Connection) -> None:
+        if self._max_sessions is None:
+            return
+        rows = connection.execute(
+            "SELECT session_id FROM sessions ORDER BY last_access DESC LIMIT -1 OFFSET ?",
+            (self._max_sessions,),
+        ).fetchall()
+        self._delete_sessions(connection, [session_id for (session_id,) in rows])
+
+    def _delete_sessions(self, connection: sqlite3.Connection, session_ids: List[str]) -> int:
+        params = [(session_id,) for session_id in session_ids]
+        connection.executemany("DELETE FROM messages WHERE session_id = ?", params)
+        connection.executemany("DELETE FROM workflow_values WHERE session_id = ?", params)
+        connection.executemany("DELETE FROM sessions WHERE session_id = ?", params)
+        self._evictions += len(session_ids)
+        return len(session_ids)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (live_sessions,) = self._connection.execute("SELECT COUNT(*) FROM sessions").fetchone()
+        return {"live_sessions": live_sessions, "evicted_sessions": self._evictions}
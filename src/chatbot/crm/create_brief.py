@@ -1,14 +1,16 @@
 from __future__ import annotations
 
+from typing import Any, Mapping
+
 from core.logging import get_logger
 from core.constants import COLORS
+from crm.outbox import enqueue_crm_record
+
 
-def create_brief():
-    """Creates a brief."""
+def create_brief(session_id: str, values: Mapping[str, Any]) -> dict[str, str]:
+    """Queue the brief for creation in the CRM; `record_id` is the outbox idempotency key."""
     logger = get_logger(name="CREATE_BRIEF", color=COLORS.get("GREEN", "default"))
-    
-    logger.debug("Creating a new brief.")
-    
-    return {
-        record_id: "brief_12345",
-    }
+
+    key = enqueue_crm_record("brief", session_id, values)
+    logger.debug("Queued brief %s for session %s.", key, session_id)
+    return {"record_id": key}
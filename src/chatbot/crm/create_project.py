@@ -1,12 +1,19 @@
 from __future__ import annotations
 
+from typing import Any, Mapping
+
 from core.logging import get_logger
 from core.constants import COLORS
+from crm.outbox import enqueue_crm_record
+
 
-def create_project() -> bool:
-    """Creates a project and logs the process."""
+def create_project(session_id: str, values: Mapping[str, Any]) -> dict[str, str]:
+    """Queue the project for creation in the CRM; `record_id` is the outbox idempotency key.
+
+    The write is delivered by the outbox worker, so the confirmation turn does not wait for the CRM.
+    """
     logger = get_logger(name="CREATE_PROJECT", color=COLORS.get("GREEN", "default"))
-    
-    logger.debug("Creating a new project.")
-    
-    return True
+
+    key = enqueue_crm_record("project", session_id, values)
+    logger.debug("Queued project %s for session %s.", key, session_id)
+    return {"record_id": key}
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+from clients.crm import CRMError, get_crm_client
+from core.config import get_settings
+from core.constants import COLORS
+from core.logging import get_logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS crm_outbox (
+    idempotency_key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    record_id TEXT,
+    created_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_crm_outbox_due ON crm_outbox (status, next_attempt_at);
+"""
+
+_BATCH_SIZE = 50
+
+
+def idempotency_key(session_id: str, workflow: str, values: Mapping[str, Any]) -> str:
+    """Stable key for one submission: the same session submitting the same values maps to one CRM record."""
+    payload = json.dumps([session_id, workflow, values], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class OutboxEntry:
+    idempotency_key: str
+    kind: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+class CRMOutbox:
+    """Durable queue of CRM writes in SQLite; rows stay pending until the CRM accepts them."""
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def enqueue(self, kind: str, key: str, payload: Mapping[str, Any]) -> bool:
+        """Queue a record; returns False when the same key was queued before."""
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO crm_outbox (idempotency_key, kind, payload, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, kind, json.dumps(dict(payload), default=str), time.time(), time.time()),
+            )
+        return cursor.rowcount > 0
+
+    def due(self, limit: int = _BATCH_SIZE) -> List[OutboxEntry]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT idempotency_key, kind, payload, attempts FROM crm_outbox "
+                "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (time.time(), limit),
+            ).fetchall()
+        return [OutboxEntry(key, kind, json.loads(payload), attempts) for key, kind, payload, attempts in rows]
+
+    def seconds_until_next(self) -> float | None:
+        """Time until the earliest pending entry is due, or None when nothing is pending."""
+        with self._lock:
+            (next_attempt_at,) = self._connection.execute(
+                "SELECT MIN(next_attempt_at) FROM crm_outbox WHERE status = 'pending'"
+            ).fetchone()
+        return None if next_attempt_at is None else max(0.0, next_attempt_at - time.time())
+
+    def mark_sent(self, key: str, record_id: str | None) -> None:
+        self._update(key, "status = 'sent', attempts = attempts + 1, record_id = ?, last_error = NULL", record_id)
+
+    def mark_retry(self, key: str, error: str, delay: float) -> None:
+        self._update(key, "attempts = attempts + 1, last_error = ?, next_attempt_at = ?", error, time.time() + delay)
+
+    def mark_failed(self, key: str, error: str) -> None:
+        self._update(key, "status = 'failed', attempts = attempts + 1, last_error = ?", error)
+
+    def _update(self, key: str, assignments: str, *values: Any) -> None:
+        with self._lock:
+            self._connection.execute(
+                f"UPDATE crm_outbox SET {assignments} WHERE idempotency_key = ?",
+                (*values, key),
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connection.execute("SELECT status, COUNT(*) FROM crm_outbox GROUP BY status").fetchall()
+        counts = dict(rows)
+        return {f"crm_outbox_{status}": counts.get(status, 0) for status in ("pending", "sent", "failed")}
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+_outbox: Optional[CRMOutbox] = None
+_outbox_lock = threading.Lock()
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_wakeup: Optional[asyncio.Event] = None
+
+
+def get_crm_outbox() -> CRMOutbox:
+    global _outbox
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                _outbox = CRMOutbox(get_settings().crm_outbox_path)
+    return _outbox
+
+
+def set_crm_outbox(outbox: CRMOutbox | None) -> None:
+    """Use `outbox` instead of the one at CRM_OUTBOX_PATH (benchmarks, tests); None restores the default."""
+    global _outbox
+    with _outbox_lock:
+        _outbox = outbox
+
+
+def enqueue_crm_record(kind: str, session_id: str, values: Mapping[str, Any]) -> str:
+    """Persist a CRM write and wake the worker; returns the idempotency key.
+
+    Only a local SQLite insert happens here, so callers on the request path never wait for the CRM.
+    """
+    key = idempotency_key(session_id, kind, values)
+    if get_crm_outbox().enqueue(kind, key, values):
+        _notify_worker()
+    return key
+
+
+def _notify_worker() -> None:
+    # Validators may run on a tool thread, so the event is set through the worker's loop.
+    loop, wakeup = _worker_loop, _wakeup
+    if loop is not None and wakeup is not None and not loop.is_closed():
+        loop.call_soon_threadsafe(wakeup.set)
+
+
+def _backoff(attempt: int, retry_after: float | None = None) -> float:
+    settings = get_settings()
+    if retry_after is not None:
+        return min(retry_after, settings.crm_retry_max_delay_seconds)
+    # Full jitter, as in the LLM transport.
+    ceiling = min(settings.crm_retry_max_delay_seconds, settings.crm_retry_base_delay_seconds * 2 ** (attempt - 1))
+    return random.uniform(0, ceiling)
+
+
+async def drain_crm_outbox() -> int:
+    """Send every due entry once; returns how many were delivered."""
+    client = get_crm_client()
+    if client is None:
+        return 0
+    settings = get_settings()
+    logger = get_logger("CRM_OUTBOX", COLORS["GREEN"])
+    outbox = get_crm_outbox()
+    delivered = 0
+    for entry in outbox.due():
+        attempt = entry.attempts + 1
+        try:
+            try:
+                record_id = await client.create_record(entry.kind, entry.payload, entry.idempotency_key)
+            except CRMError as exc:
+                error, retryable, retry_after = str(exc), exc.retryable, exc.retry_after
+            except Exception as exc:
+                # Unexpected client errors (decoding, redirects, ...) are retried like transient ones.
+                logger.exception("CRM %s %s attempt %d raised", entry.kind, entry.idempotency_key, attempt)
+                error, retryable, retry_after = repr(exc), True, None
+            else:
+                outbox.mark_sent(entry.idempotency_key, record_id)
+                logger.debug("CRM %s %s created as %s", entry.kind, entry.idempotency_key, record_id)
+                delivered += 1
+                continue
+
+            if not retryable or attempt >= settings.crm_max_attempts:
+                logger.error("CRM %s %s failed after %d attempt(s): %s", entry.kind, entry.idempotency_key, attempt, error)
+                outbox.mark_failed(entry.idempotency_key, error)
+            else:
+                logger.warning("CRM %s %s attempt %d failed: %s", entry.kind, entry.idempotency_key, attempt, error)
+                outbox.mark_retry(entry.idempotency_key, error, _backoff(attempt, retry_after))
+        except Exception:
+            # Outbox bookkeeping failed (e.g. a locked database); the entry stays pending for the next pass.
+            logger.exception("CRM outbox update for %s failed", entry.idempotency_key)
+    return delivered
+
+
+async def run_crm_outbox_worker(poll_interval_seconds: float) -> None:
+    """Deliver queued CRM writes until cancelled, including entries left over from earlier runs."""
+    global _worker_loop, _wakeup
+    if get_crm_client() is None:
+        get_logger("CRM_OUTBOX", COLORS["GREEN"]).warning("CRM_BASE_URL is not set; CRM writes stay in the outbox.")
+        return
+
+    _worker_loop, _wakeup = asyncio.get_running_loop(), asyncio.Event()
+    outbox = get_crm_outbox()
+    try:
+        while True:
+            _wakeup.clear()
+            try:
+                await drain_crm_outbox()
+                wait = outbox.seconds_until_next()
+            except Exception:
+                # Keep delivering for the rest of the process; the next pass retries whatever is pending.
+                get_logger("CRM_OUTBOX", COLORS["GREEN"]).exception("CRM outbox pass failed")
+                wait = None
+            timeout = poll_interval_seconds if wait is None else min(wait, poll_interval_seconds)
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(_wakeup.wait(), timeout)
+    finally:
+        _worker_loop, _wakeup = None, None
+
+
+__all__ = [
+    "CRMOutbox",
+    "OutboxEntry",
+    "drain_crm_outbox",
+    "enqueue_crm_record",
+    "get_crm_outbox",
+    "idempotency_key",
+    "run_crm_outbox_worker",
+    "set_crm_outbox",
+]
@@ -9,7 +9,16 @@ class ChatRequest(BaseModel):
     timezone: str
     user_mail: str
     message_files: str
+    language: str = "en"
 
 
 class ChatResponse(BaseModel):
     answer: str
+
+
+class ChatTurnResult(BaseModel):
+    answer: str
+    validator_value: str | float | bool | None = None
+    workflow: str
+    step_index: int
+    workflow_changed: bool = False
@@ -1,19 +1,55 @@
 from __future__ import annotations
 
-from typing import Literal
+from typing import Annotated, Any, Dict, Literal
 
-from pydantic import BaseModel
+from pydantic import AfterValidator, BaseModel, Field, GetJsonSchemaHandler
+from pydantic_core import CoreSchema
 
 
 class RelativeDateInput(BaseModel):
     current_datetime: str
     timezone: str
     offset_days: int
-    day_type: Literal["calendar", "business"] = "calendar"
+    # Required (no defaults) so the schema stays valid for strict function calling.
+    day_type: Literal["calendar", "business"] = Field(description='"calendar" unless the user asks for business days.')
+    calendar: str = Field(
+        description='Business calendar for day_type "business": "default" (weekends only), "us", "uk" or "de".',
+    )
+
+
+def _registered_workflows() -> list[str]:
+    # Imported lazily: the workflows package builds the chat graph from tools using these schemas.
+    from workflows.registry import WORKFLOWS
+
+    return list(WORKFLOWS)
+
+
+def _check_registered(value: str) -> str:
+    workflows = _registered_workflows()
+    if value not in workflows:
+        raise ValueError(f"Unknown workflow {value!r}; expected one of: {', '.join(workflows)}")
+    return value
+
+
+class _RegisteredWorkflowEnum:
+    """Lists the registered workflows as the JSON schema enum each time a tool schema is built."""
+
+    def __get_pydantic_json_schema__(self, core_schema: CoreSchema, handler: GetJsonSchemaHandler) -> Dict[str, Any]:
+        schema = handler(core_schema)
+        schema["enum"] = _registered_workflows()
+        return schema
+
+
+# Annotated metadata (unlike Field extras) survives the subset model LangChain builds for tool calls.
+_RegisteredWorkflowName = Annotated[str, AfterValidator(_check_registered), _RegisteredWorkflowEnum()]
 
 
 class SetActiveWorkflowInput(BaseModel):
-    workflow: Literal["none", "brief", "project"]
+    workflow: _RegisteredWorkflowName
+
+
+class SubmitWorkflowStepValueInput(BaseModel):
+    value: str | float | bool
 
 
-__all__ = ["RelativeDateInput", "SetActiveWorkflowInput"]
+__all__ = ["RelativeDateInput", "SetActiveWorkflowInput", "SubmitWorkflowStepValueInput"]
@@ -1,130 +1,414 @@
 from __future__ import annotations
 
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
 from typing import Any
 
 from langchain_core.exceptions import OutputParserException
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
 
-from chains.chat import CHAT_PARSER, CHAT_PROMPT, ChatLLMResult
-from core.memory import get_conversation_store
-from schemas.chat import ChatRequest, ChatResponse
-from utils.datetime import now_iso_in_timezone
+from chains.chat import (
+    CHAT_PROMPT,
+    ChatAnswerStreamParser,
+    ChatLLMResult,
+    parse_chat_result,
+    render_resolved_dates,
+)
+from clients.llm import LLMPurpose, record_llm_usage, resolve_llm_route
+from core.config import get_settings
+from core.history import get_history_policy
+from core.memory import get_conversation_store, run_store_io, save_step_value
+from core.metrics import (
+    GENERATE_SECONDS,
+    PARSE_SECONDS,
+    PARSER_FALLBACKS,
+    PREPARE_PROMPT_SECONDS,
+    STORE_SECONDS,
+    VALIDATION_FAILURES,
+    VALIDATOR_SECONDS,
+    turn_scope,
+)
+from core.response_cache import get_response_cache, response_cache_key
+from core.session import session_scope
+from schemas.chat import ChatRequest, ChatResponse, ChatTurnResult
+from tools.workflow import submit_workflow_step_value_tool
+from utils.business_days import get_calendar_or_default
+from utils.date_expressions import resolve_date_expressions
+from utils.datetime import now_iso_in_timezone, parse_datetime
 from workflows import (
+    IntentMatch,
+    StepView,
     get_chat_graph,
-    get_workflow_instruction,
-    get_workflow_step_instruction,
-    get_workflow_step_field,
-    get_workflow_step_validator,
+    load_step,
+    match_intent,
+    may_switch_workflow,
+    step_at,
+    step_state,
 )
 
 
+TokenCallback = Callable[[str], Awaitable[None]]
+
+# While a step value is pending, only short commands may switch workflows locally: longer answers
+# (e.g. a brief description) often mention a workflow name without asking to switch.
+_INTENT_MAX_WORDS_DURING_STEP = 6
+_STEP_PROMPT_QUERY = "Proceed to the next workflow step and prompt the user accordingly."
+
+
 async def handle_chat(chat_request: ChatRequest) -> ChatResponse:
+    turn = await run_chat_turn(chat_request)
+    return ChatResponse(answer=turn.answer)
+
+
+async def stream_chat(chat_request: ChatRequest) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """Run a chat turn and yield `("token", ...)` events followed by a single `("final", ...)` event."""
+    queue: asyncio.Queue[tuple[str, dict[str, Any]] | None] = asyncio.Queue()
+
+    async def on_token(text: str) -> None:
+        await queue.put(("token", {"text": text}))
+
+    async def run_turn() -> None:
+        try:
+            turn = await run_chat_turn(chat_request, on_token=on_token)
+            await queue.put(("final", turn.model_dump()))
+        finally:
+            await queue.put(None)
+
+    task = asyncio.create_task(run_turn())
+    try:
+        while (event := await queue.get()) is not None:
+            yield event
+        await task
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+async def run_chat_turn(chat_request: ChatRequest, on_token: TokenCallback | None = None) -> ChatTurnResult:
+    async with session_scope(chat_request.session_id):
+        with turn_scope():
+            return await _run_chat_turn(chat_request, on_token)
+
+
+async def _run_chat_turn(chat_request: ChatRequest, on_token: TokenCallback | None) -> ChatTurnResult:
     store = get_conversation_store()
     session_id = chat_request.session_id
-    store.set_current_session(session_id)
+    with STORE_SECONDS.time(op="ensure_session"):
+        await run_store_io(store.ensure_session, session_id)
 
-    previous_workflow = store.get_active_workflow(session_id)
-    prompt_messages = await prepare_prompt_messages(store, session_id, chat_request)
-    llm_result = await generate_response(prompt_messages)
-    current_workflow = store.get_active_workflow(session_id)
+    # The only store read of the step this turn; later positions are derived from the graph state.
+    previous_step = await load_step(session_id)
+    intent = _match_intent_locally(previous_step, chat_request.query)
+    if intent is not None:
+        return await _enter_workflow(store, chat_request, intent, on_token)
 
-    validator = get_workflow_step_validator(current_workflow)
-    workflow_changed = previous_workflow != current_workflow
-    should_validate = not workflow_changed and validator is not None
+    # With a step validator pending, the first answer may be replaced by a follow-up or an error reply,
+    # so only stream it when it is guaranteed to be the final one.
+    expects_validation = previous_step.validator is not None
+    single_pass = expects_validation and get_settings().single_pass_turns
+
+    local_value = _extract_step_value_locally(previous_step, chat_request.query)
+    extracted_locally = local_value is not None
+    prompt_messages = None
+    if extracted_locally:
+        # The step value was parsed deterministically, so skip the extraction call (and its prompt) entirely.
+        llm_result, result_messages = ChatLLMResult(answer="", validator_value=local_value), []
+        current_step = previous_step
+    else:
+        prompt_messages = await prepare_prompt_messages(store, previous_step, chat_request)
+        llm_result, result_messages, current_step = await _invoke_graph(
+            prompt_messages,
+            previous_step,
+            on_token=None if expects_validation else on_token,
+            single_pass=single_pass,
+        )
+    answer_streamed = not expects_validation
+
+    workflow_changed = previous_step.workflow_name != current_step.workflow_name
+    # In single-pass mode the model validates through the step tool; if it skipped the tool,
+    # fall back to the multi-call path below.
+    validated_in_graph = single_pass and _tool_was_called(result_messages, submit_workflow_step_value_tool.name)
+    should_validate = not workflow_changed and current_step.validator is not None and not validated_in_graph
 
     if should_validate:
         validation_input = llm_result.validator_value
         if validation_input is None:
             # LLM did not extract a structured value; fall back to raw user input.
             validation_input = chat_request.query
-        is_valid, error_msg = await validate_workflow_step(store, session_id, validation_input)
+        is_valid, error_msg = await validate_workflow_step(store, current_step, validation_input)
+        if is_valid:
+            current_step = current_step.advanced()
+            if llm_result.field_values:
+                current_step, validation_input, is_valid, error_msg = await _apply_field_values(
+                    store, current_step, llm_result.field_value_map()
+                )
     else:
         is_valid, error_msg = True, None
 
     if not is_valid:
-        answer_text = await respond_with_validation_error(prompt_messages, error_msg)
+        answer_text = current_step.validation_error_reply(error_msg, validation_input, chat_request.language)
+        if answer_text is None:
+            if prompt_messages is None or current_step.step_index != previous_step.step_index:
+                # Locally extracted values have no prompt yet, and a later field given ahead of time
+                # is explained from that step's prompt.
+                prompt_messages = await prepare_prompt_messages(store, current_step, chat_request)
+            answer_text = await respond_with_validation_error(prompt_messages, current_step, error_msg, on_token=on_token)
+            answer_streamed = True
     else:
         # After successful validation, refresh prompt for the next step (if any) so the LLM follows the new instruction.
-        next_step_instruction = get_workflow_step_instruction(current_workflow)
-        if should_validate and next_step_instruction:
+        next_step = current_step
+        if should_validate and (next_step.instruction or extracted_locally):
             followup_messages = await prepare_prompt_messages(
                 store,
-                session_id,
+                next_step,
                 chat_request,
-                query_override="Proceed to the next workflow step and prompt the user accordingly.",
+                query_override=_STEP_PROMPT_QUERY,
+            )
+            followup_result = await generate_response(
+                followup_messages,
+                next_step,
+                on_token=on_token,
+                purpose="step_prompt",
             )
-            followup_result = await generate_response(followup_messages)
             answer_text = followup_result.answer
+            answer_streamed = True
         else:
             answer_text = llm_result.answer
 
-    store.append(
-        session_id,
-        HumanMessage(content=chat_request.query),
-        AIMessage(content=answer_text),
+    if on_token is not None and not answer_streamed:
+        await on_token(answer_text)
+
+    return await _finish_turn(store, chat_request, current_step, answer_text, llm_result.validator_value, workflow_changed)
+
+
+async def _enter_workflow(
+    store,
+    chat_request: ChatRequest,
+    intent: IntentMatch,
+    on_token: TokenCallback | None,
+) -> ChatTurnResult:
+    """Switch to the matched workflow directly and ask for its first step in a single LLM call."""
+    with STORE_SECONDS.time(op="set_active_workflow"):
+        await run_store_io(store.set_active_workflow, chat_request.session_id, intent.workflow)
+    step = step_at(chat_request.session_id, intent.workflow, 0)
+    prompt_messages = await prepare_prompt_messages(store, step, chat_request, query_override=_STEP_PROMPT_QUERY)
+    result = await generate_response(prompt_messages, step, on_token=on_token, purpose="step_prompt")
+    return await _finish_turn(store, chat_request, step, result.answer, None, workflow_changed=True)
+
+
+async def _finish_turn(
+    store,
+    chat_request: ChatRequest,
+    final_step: StepView,
+    answer_text: str,
+    validator_value: Any,
+    workflow_changed: bool,
+) -> ChatTurnResult:
+    with STORE_SECONDS.time(op="append"):
+        await run_store_io(
+            store.append,
+            chat_request.session_id,
+            HumanMessage(content=chat_request.query),
+            AIMessage(content=answer_text),
+        )
+
+    return ChatTurnResult(
+        answer=answer_text,
+        validator_value=validator_value,
+        workflow=final_step.workflow_name,
+        step_index=final_step.step_index,
+        workflow_changed=workflow_changed,
     )
 
-    return ChatResponse(answer=answer_text)
+
+def _match_intent_locally(step: StepView, query: str) -> IntentMatch | None:
+    """Return a confident workflow switch found without the LLM, or None to let the model decide."""
+    if not get_settings().intent_fast_path:
+        return None
+    if step.validator is not None and len(query.split()) > _INTENT_MAX_WORDS_DURING_STEP:
+        return None
+    return match_intent(query, step.workflow_name)
 
 
-async def validate_workflow_step(store, session_id: str, value: Any) -> tuple[bool, str | None]:
-    active_workflow = store.get_active_workflow(session_id)
-    validator = get_workflow_step_validator(active_workflow)
+def _extract_step_value_locally(step: StepView, query: str) -> Any | None:
+    """Return the step value parsed from the raw query, or None when the LLM must extract it."""
+    if step.extractor is None or may_switch_workflow(query):
+        return None
+    return step.extractor(query)
 
-    if validator is not None:
-        is_valid, error_msg = validator(value)
+
+async def validate_workflow_step(store, step: StepView, value: Any) -> tuple[bool, str | None]:
+    if step.validator is not None:
+        with VALIDATOR_SECONDS.time(workflow=step.workflow_name, step=step.step_index):
+            is_valid, error_msg, value = await step.validate(value)
         if not is_valid:
+            VALIDATION_FAILURES.inc(workflow=step.workflow_name, step=step.step_index)
             return False, error_msg or "Input is not valid for this step."
-        store.advance_workflow_step(session_id)
+        with STORE_SECONDS.time(op="advance_workflow_step"):
+            await run_store_io(save_step_value, store, step.session_id, step.workflow_name, step.key, value)
 
     return True, None
 
 
+async def _apply_field_values(
+    store,
+    step: StepView,
+    field_values: dict[str, Any],
+) -> tuple[StepView, Any, bool, str | None]:
+    """Validate values for later steps in order, advancing past each accepted one.
+
+    Stops at the first step without a value; returns that step, plus the rejected value and error
+    when a value failed validation.
+    """
+    while step.step is not None and step.step.extract_ahead and step.validator is not None:
+        value = field_values.get(step.key) if step.key is not None else None
+        if value is None:
+            break
+        is_valid, error_msg = await validate_workflow_step(store, step, value)
+        if not is_valid:
+            return step, value, False, error_msg
+        step = step.advanced()
+    return step, None, True, None
+
+
 async def prepare_prompt_messages(
     store,
-    session_id: str,
+    step: StepView,
     chat_request: ChatRequest,
     query_override: str | None = None,
 ) -> list:
-    session_history = store.read(session_id)
-    active_workflow = store.get_active_workflow(session_id)
-
-    workflow_instruction = get_workflow_instruction(active_workflow)
-    workflow_step_instruction = get_workflow_step_instruction(active_workflow)
-    step_field_name, step_field_type = get_workflow_step_field(active_workflow)
-
-    current_datetime, normalized_timezone = now_iso_in_timezone(chat_request.timezone)
-    query_text = query_override if query_override is not None else chat_request.query
-
-    return CHAT_PROMPT.format_messages(
-        query=query_text,
-        history=session_history,
-        format_instructions=CHAT_PARSER.get_format_instructions(),
-        current_datetime=current_datetime,
-        timezone=normalized_timezone,
-        active_workflow=active_workflow,
-        workflow_instruction=workflow_instruction,
-        workflow_step_instruction=workflow_step_instruction,
-        workflow_step_field=step_field_name or "none",
-        workflow_step_field_type=step_field_type or "unknown",
-    )
+    with PREPARE_PROMPT_SECONDS.time():
+        with STORE_SECONDS.time(op="read"):
+            messages = await run_store_io(store.read, step.session_id)
+        session_history = get_history_policy().window(
+            step.session_id,
+            messages,
+            step.workflow.history_token_budget,
+        )
+
+        current_datetime, normalized_timezone = now_iso_in_timezone(chat_request.timezone)
+        query_text = query_override if query_override is not None else chat_request.query
+        # Dates come from the user's own words, also when a follow-up prompt replaces the query.
+        resolved_dates = resolve_date_expressions(
+            chat_request.query,
+            parse_datetime(current_datetime, normalized_timezone),
+            get_calendar_or_default(get_settings().business_calendar).name,
+        )
+
+        return CHAT_PROMPT.format_messages(
+            system_prompt=step.system_prompt,
+            history=session_history,
+            current_datetime=current_datetime,
+            timezone=normalized_timezone,
+            resolved_dates=render_resolved_dates(resolved_dates),
+            query=query_text,
+        )
+
 
+async def generate_response(
+    prompt_messages: list,
+    step: StepView,
+    on_token: TokenCallback | None = None,
+    purpose: LLMPurpose = "chat",
+) -> ChatLLMResult:
+    structured, _, _ = await _invoke_graph(prompt_messages, step, on_token=on_token, purpose=purpose)
+    return structured
 
-async def generate_response(prompt_messages: list) -> ChatLLMResult:
-    graph = get_chat_graph()
-    result_state = await graph.ainvoke({"messages": prompt_messages})
+
+def _graph_input(prompt_messages: list, step: StepView) -> dict[str, Any]:
+    # The system block travels in the state so the agent node can swap it without touching the history.
+    system_message, *messages = prompt_messages
+    return {**step_state(step), "system_prompt": system_message.content, "messages": messages}
+
+
+async def _invoke_graph(
+    prompt_messages: list,
+    step: StepView,
+    on_token: TokenCallback | None = None,
+    single_pass: bool = False,
+    purpose: LLMPurpose = "chat",
+) -> tuple[ChatLLMResult, list[BaseMessage], StepView]:
+    """Run the chat graph; also returns the step the session is on afterwards (tools may have moved it)."""
+    graph_input = _graph_input(prompt_messages, step)
+    # Single-pass turns always go through a tool call, so they never produce a cacheable answer.
+    cache = None if single_pass else get_response_cache()
+    if cache is not None:
+        cache_key = response_cache_key(
+            graph_input["system_prompt"],
+            graph_input["messages"],
+            model=resolve_llm_route(purpose).model,
+        )
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            structured = ChatLLMResult.model_validate(cached)
+            if on_token is not None:
+                await on_token(structured.answer)
+            return structured, graph_input["messages"], step
+
+    graph = get_chat_graph(single_pass=single_pass, purpose=purpose)
+    with GENERATE_SECONDS.time(purpose=purpose):
+        if on_token is None:
+            result_state = await graph.ainvoke(graph_input)
+            streamed = False
+        else:
+            result_state, streamed = await _stream_agent_answer(graph, graph_input, on_token)
+    new_messages = result_state["messages"][len(graph_input["messages"]):]
+    record_llm_usage(new_messages)
     final_message = result_state["messages"][-1]
 
     try:
-        structured = await CHAT_PARSER.ainvoke(final_message)
-        return structured
+        with PARSE_SECONDS.time():
+            structured = parse_chat_result(final_message)
     except OutputParserException:
+        PARSER_FALLBACKS.inc()
         content = final_message.content
         answer = content if isinstance(content, str) else str(content)
-        return ChatLLMResult(answer=answer, validator_value=None)
+        structured = ChatLLMResult(answer=answer, validator_value=None)
+    else:
+        # Tool calls have side effects (workflow switches, step values) that a replayed answer would skip.
+        if cache is not None and not any(isinstance(message, ToolMessage) for message in new_messages):
+            await cache.put(cache_key, structured.model_dump())
+
+    if on_token is not None and not streamed:
+        # The model did not answer in the expected JSON shape; deliver the fallback text in one piece.
+        await on_token(structured.answer)
+    return structured, result_state["messages"], step_at(step.session_id, result_state["workflow"], result_state["step_index"])
+
+
+def _tool_was_called(messages: list[BaseMessage], tool_name: str) -> bool:
+    return any(isinstance(message, ToolMessage) and message.name == tool_name for message in messages)
+
+
+async def _stream_agent_answer(
+    graph,
+    graph_input: dict[str, Any],
+    on_token: TokenCallback,
+) -> tuple[dict[str, Any], bool]:
+    """Run the graph, forwarding `answer` tokens produced by the `agent` node to `on_token`."""
+    parsers: dict[str, ChatAnswerStreamParser] = {}
+    result_state: dict[str, Any] = graph_input
+    streamed = False
+
+    async for event in graph.astream_events(graph_input, version="v2"):
+        kind = event["event"]
+        if kind == "on_chat_model_stream" and event["metadata"].get("langgraph_node") == "agent":
+            parser = parsers.setdefault(event["run_id"], ChatAnswerStreamParser())
+            delta = parser.feed(event["data"]["chunk"].text)
+            if delta:
+                streamed = True
+                await on_token(delta)
+        elif kind == "on_chain_end" and not event["parent_ids"]:
+            result_state = event["data"]["output"]
+
+    return result_state, streamed
 
 
-async def respond_with_validation_error(prompt_messages: list, error_msg: str | None) -> str:
+async def respond_with_validation_error(
+    prompt_messages: list,
+    step: StepView,
+    error_msg: str | None,
+    on_token: TokenCallback | None = None,
+) -> str:
     error_text = error_msg or "Input is not valid for this step."
     messages = prompt_messages + [
         HumanMessage(
@@ -134,5 +418,5 @@ async def respond_with_validation_error(prompt_messages: list, error_msg: str |
             )
         )
     ]
-    structured = await generate_response(messages)
+    structured = await generate_response(messages, step, on_token=on_token, purpose="validation_error")
     return structured.answer
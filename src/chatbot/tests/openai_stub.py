@@ -0,0 +1,77 @@
+"""In-process stand-in for the OpenAI chat completions API, served through `httpx.MockTransport`."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List
+
+import httpx
+
+
+def tool_call(name: str, arguments: Dict[str, Any], call_id: str = "call_1") -> Dict[str, Any]:
+    return {"tool_calls": [{"id": call_id, "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}}]}
+
+
+def answer(payload: Dict[str, Any] | str) -> Dict[str, Any]:
+    return {"content": payload if isinstance(payload, str) else json.dumps(payload)}
+
+
+class OpenAIStub:
+    """Replies to chat completion requests in order; handles plain and streamed (SSE) requests."""
+
+    def __init__(self, *replies: Dict[str, Any]) -> None:
+        self.replies: List[Dict[str, Any]] = list(replies)
+        self.requests: List[Dict[str, Any]] = []
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self._handle)
+
+    def chat_model(self, **kwargs: Any):
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(
+            model="stub-model",
+            api_key="sk-test",
+            base_url="http://openai.test/v1",
+            http_async_client=httpx.AsyncClient(transport=self.transport()),
+            max_retries=0,
+            **kwargs,
+        )
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append(body)
+        reply = self.replies.pop(0) if self.replies else answer("")
+        finish_reason = "tool_calls" if "tool_calls" in reply else "stop"
+        if body.get("stream"):
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/event-stream"},
+                content=self._stream(reply, finish_reason).encode(),
+            )
+        message = {"role": "assistant", "content": reply.get("content"), **({"tool_calls": reply["tool_calls"]} if "tool_calls" in reply else {})}
+        return httpx.Response(200, json=self._completion("chat.completion", {"message": message, "finish_reason": finish_reason, "logprobs": None}))
+
+    def _stream(self, reply: Dict[str, Any], finish_reason: str) -> str:
+        deltas: List[Dict[str, Any]] = []
+        if "tool_calls" in reply:
+            deltas.append({"role": "assistant", "tool_calls": [{"index": index, **call} for index, call in enumerate(reply["tool_calls"])]})
+        else:
+            content = reply["content"]
+            deltas.append({"role": "assistant", "content": ""})
+            # Small pieces, so answers arrive split inside JSON strings and escapes.
+            deltas.extend({"content": content[start:start + 7]} for start in range(0, len(content), 7))
+        chunks = [self._completion("chat.completion.chunk", {"delta": delta, "finish_reason": None}) for delta in deltas]
+        chunks.append(self._completion("chat.completion.chunk", {"delta": {}, "finish_reason": finish_reason}))
+        return "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+
+    @staticmethod
+    def _completion(kind: str, choice: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": "chatcmpl-stub",
+            "object": kind,
+            "created": 0,
+            "model": "stub-model",
+            "choices": [{"index": 0, **choice}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2} if kind == "chat.completion" else None,
+        }
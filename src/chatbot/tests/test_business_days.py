@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+import random
+import unittest
+from datetime import date, timedelta
+
+from utils.business_days import CALENDAR_DIR, BusinessCalendar, get_calendar
+
+
+def _naive_is_business_day(day: date, weekmask: str, holidays: set[date]) -> bool:
+    return weekmask[day.weekday()] == "1" and day not in holidays
+
+
+def _naive_offset(start: date, days: int, weekmask: str, holidays: set[date]) -> date:
+    step = 1 if days > 0 else -1
+    day, remaining = start, abs(days)
+    while remaining:
+        day += timedelta(days=step)
+        if _naive_is_business_day(day, weekmask, holidays):
+            remaining -= 1
+    return day
+
+
+def _naive_count(start: date, end: date, weekmask: str, holidays: set[date]) -> int:
+    if end < start:
+        return -_naive_count(end, start, weekmask, holidays)
+    return sum(
+        _naive_is_business_day(start + timedelta(days=index), weekmask, holidays)
+        for index in range((end - start).days)
+    )
+
+
+class BusinessCalendarTest(unittest.TestCase):
+    """The O(log H) arithmetic must agree with stepping one day at a time."""
+
+    def _calendars(self) -> list[tuple[BusinessCalendar, set[date]]]:
+        holidays = {date(2026, 12, 24), date(2026, 12, 25), date(2026, 12, 26), date(2027, 1, 1), date(2026, 10, 18)}
+        calendars = [
+            (BusinessCalendar("plain"), set()),
+            (BusinessCalendar("custom", holidays), holidays),
+            # Sunday to Thursday, with holidays on both working and weekend days.
+            (BusinessCalendar("sun-thu", holidays, weekmask="1111001"), holidays),
+        ]
+        for path in sorted(CALENDAR_DIR.glob("*.json")):
+            data = json.loads(path.read_text(encoding="utf-8"))
+            calendars.append((get_calendar(path.stem), {date.fromisoformat(day) for day in data["holidays"]}))
+        return calendars
+
+    def test_offset_matches_naive_stepping(self) -> None:
+        rng = random.Random(20)
+        for calendar, holidays in self._calendars():
+            for _ in range(300):
+                start = date(2025, 1, 1) + timedelta(days=rng.randrange(800))
+                days = rng.randint(-40, 40)
+                with self.subTest(calendar=calendar.name, start=start, days=days):
+                    self.assertEqual(calendar.offset(start, days), _naive_offset(start, days, calendar.weekmask, holidays))
+
+    def test_count_matches_naive_stepping(self) -> None:
+        rng = random.Random(21)
+        for calendar, holidays in self._calendars():
+            for _ in range(300):
+                start = date(2025, 1, 1) + timedelta(days=rng.randrange(800))
+                end = start + timedelta(days=rng.randint(-60, 60))
+                with self.subTest(calendar=calendar.name, start=start, end=end):
+                    self.assertEqual(calendar.count(start, end), _naive_count(start, end, calendar.weekmask, holidays))
+
+    def test_offset_and_count_are_inverse(self) -> None:
+        calendar = get_calendar("de")
+        start = date(2026, 12, 23)
+        for days in range(1, 30):
+            target = calendar.offset(start, days)
+            self.assertTrue(calendar.is_business_day(target))
+            # [start + 1, target] holds exactly `days` business days.
+            self.assertEqual(calendar.count(start + timedelta(days=1), target + timedelta(days=1)), days)
+
+    def test_large_offsets(self) -> None:
+        calendar = BusinessCalendar("plain")
+        start = date(2026, 10, 16)
+        self.assertEqual(calendar.offset(start, 5 * 52 * 10), start + timedelta(weeks=52 * 10))
+
+    def test_batch_offsets_broadcast_a_scalar(self) -> None:
+        calendar = BusinessCalendar("plain")
+        starts = [date(2026, 10, 16), date(2026, 10, 17)]
+        self.assertEqual(calendar.offset_many(starts, 1), [date(2026, 10, 19)] * 2)
+        with self.assertRaises(ValueError):
+            calendar.offset_many(starts, [1])
+
+    def test_invalid_weekmask_is_rejected(self) -> None:
+        for weekmask in ("0000000", "11111", "1111102"):
+            with self.subTest(weekmask=weekmask), self.assertRaises(ValueError):
+                BusinessCalendar("bad", weekmask=weekmask)
+
+
+if __name__ == "__main__":
+    unittest.main()
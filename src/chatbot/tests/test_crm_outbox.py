@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from clients.crm import CRMClient, CRMError, close_crm_client
+from core.config import get_settings
+from crm import outbox as crm_outbox
+from crm.outbox import CRMOutbox, drain_crm_outbox, enqueue_crm_record, run_crm_outbox_worker, set_crm_outbox
+
+
+class _StubCRM(BaseHTTPRequestHandler):
+    """Local CRM stand-in: answers with the queued status codes, then 201 with a record id per key."""
+
+    statuses: list[int] = []
+    requests: list[tuple[str, str | None, dict]] = []
+    records: dict[str, str] = {}
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        key = self.headers.get("Idempotency-Key")
+        self.requests.append((self.path, key, body))
+        status = self.statuses.pop(0) if self.statuses else 201
+        payload = b"{}"
+        if status == 201:
+            record_id = self.records.setdefault(key, f"rec-{len(self.records) + 1}")
+            payload = json.dumps({"id": record_id}).encode()
+        self.send_response(status)
+        if status == 503:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class CRMClientTest(unittest.IsolatedAsyncioTestCase):
+    async def _error(self, status: int, headers: dict[str, str] | None = None) -> CRMError:
+        transport = httpx.MockTransport(lambda request: httpx.Response(status, headers=headers))
+        async with httpx.AsyncClient(base_url="http://crm.test", transport=transport) as http:
+            with self.assertRaises(CRMError) as caught:
+                await CRMClient(http).create_record("project", {}, "key")
+        return caught.exception
+
+    async def test_retries_the_same_statuses_as_the_llm_transport(self) -> None:
+        for status, retryable in ((408, True), (429, True), (503, True), (501, False), (505, False), (422, False)):
+            with self.subTest(status=status):
+                self.assertIs((await self._error(status)).retryable, retryable)
+
+    async def test_retry_after_accepts_seconds_and_http_dates(self) -> None:
+        self.assertEqual((await self._error(429, {"Retry-After": "7"})).retry_after, 7.0)
+        in_a_minute = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+        self.assertAlmostEqual((await self._error(503, {"Retry-After": in_a_minute})).retry_after, 60, delta=2)
+
+
+class CRMOutboxTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubCRM)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        _StubCRM.statuses, _StubCRM.requests, _StubCRM.records = [], [], {}
+        self._environ = dict(os.environ)
+        os.environ.update(
+            CRM_BASE_URL=f"http://127.0.0.1:{self.server.server_address[1]}",
+            CRM_RETRY_BASE_DELAY_SECONDS="0.001",
+            CRM_MAX_ATTEMPTS="3",
+        )
+        get_settings.cache_clear()
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._directory.name, "outbox.sqlite3")
+        self.outbox = CRMOutbox(self.path)
+        set_crm_outbox(self.outbox)
+
+    async def asyncTearDown(self) -> None:
+        await close_crm_client()
+
+    def tearDown(self) -> None:
+        set_crm_outbox(None)
+        self.outbox.close()
+        self._directory.cleanup()
+        os.environ.clear()
+        os.environ.update(self._environ)
+        get_settings.cache_clear()
+
+    async def _drain_until_settled(self) -> None:
+        for _ in range(20):
+            await drain_crm_outbox()
+            if self.outbox.stats()["crm_outbox_pending"] == 0:
+                return
+            await asyncio.sleep(0.01)
+
+    async def test_delivers_with_idempotency_key_after_transient_failure(self) -> None:
+        _StubCRM.statuses = [503]
+        key = enqueue_crm_record("project", "s1", {"budget": 800.0, "description": "Website redesign"})
+
+        await self._drain_until_settled()
+
+        self.assertEqual(self.outbox.stats(), {"crm_outbox_pending": 0, "crm_outbox_sent": 1, "crm_outbox_failed": 0})
+        self.assertEqual([(path, sent_key) for path, sent_key, _ in _StubCRM.requests], [("/projects", key)] * 2)
+        self.assertEqual(_StubCRM.requests[-1][2], {"budget": 800.0, "description": "Website redesign"})
+
+    async def test_same_submission_is_queued_once(self) -> None:
+        first = enqueue_crm_record("project", "s1", {"budget": 800.0})
+        second = enqueue_crm_record("project", "s1", {"budget": 800.0})
+        other = enqueue_crm_record("project", "s2", {"budget": 800.0})
+
+        await self._drain_until_settled()
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(len(_StubCRM.requests), 2)
+
+    async def test_permanent_error_marks_entry_failed(self) -> None:
+        _StubCRM.statuses = [422]
+        enqueue_crm_record("brief", "s1", {"description": "Flyers"})
+
+        await self._drain_until_settled()
+
+        self.assertEqual(self.outbox.stats()["crm_outbox_failed"], 1)
+        self.assertEqual(len(_StubCRM.requests), 1)
+
+    async def test_gives_up_after_max_attempts(self) -> None:
+        _StubCRM.statuses = [500, 500, 500, 500]
+        enqueue_crm_record("project", "s1", {"budget": 1.0})
+
+        await self._drain_until_settled()
+
+        self.assertEqual(self.outbox.stats()["crm_outbox_failed"], 1)
+        self.assertEqual(len(_StubCRM.requests), 3)
+
+    async def test_pending_entries_survive_a_restart(self) -> None:
+        # Queued without a worker, as if the process stopped before delivering.
+        key = enqueue_crm_record("project", "s1", {"budget": 5.0})
+        self.outbox.close()
+        self.outbox = CRMOutbox(self.path)
+        set_crm_outbox(self.outbox)
+
+        await self._drain_until_settled()
+
+        self.assertEqual(self.outbox.stats()["crm_outbox_sent"], 1)
+        self.assertEqual(_StubCRM.requests[0][1], key)
+
+    async def test_worker_survives_unexpected_errors(self) -> None:
+        original = crm_outbox.get_crm_client
+        client = original()
+        calls = 0
+
+        class _FlakyClient:
+            async def create_record(self, *args):
+                nonlocal calls
+                calls += 1
+                if calls == 1:
+                    raise RuntimeError("unexpected")
+                return await client.create_record(*args)
+
+        crm_outbox.get_crm_client = lambda: _FlakyClient()
+        self.addCleanup(setattr, crm_outbox, "get_crm_client", original)
+
+        worker = asyncio.create_task(run_crm_outbox_worker(0.01))
+        try:
+            await asyncio.sleep(0.05)
+            # Enqueued while the worker waits, from another thread like a validator would.
+            await asyncio.to_thread(enqueue_crm_record, "project", "s1", {"budget": 2.0})
+            for _ in range(100):
+                if self.outbox.stats()["crm_outbox_sent"]:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            worker.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await worker
+
+        self.assertEqual(self.outbox.stats()["crm_outbox_sent"], 1)
+        self.assertEqual(calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import unittest
+from datetime import date, datetime
+
+from utils.business_days import get_calendar_or_default
+from utils.date_expressions import resolve_date_expressions
+
+# A Friday.
+_NOW = datetime(2026, 10, 16, 9, 30)
+
+
+def _resolve(text: str, now: datetime = _NOW, calendar: str | None = None) -> dict[str, date]:
+    return {resolved.expression.lower(): resolved.value for resolved in resolve_date_expressions(text, now, calendar)}
+
+
+class ResolveDateExpressionsTest(unittest.TestCase):
+    def test_fixed_offsets(self) -> None:
+        self.assertEqual(
+            _resolve("today, tomorrow, yesterday or the day after tomorrow"),
+            {
+                "today": date(2026, 10, 16),
+                "tomorrow": date(2026, 10, 17),
+                "yesterday": date(2026, 10, 15),
+                "the day after tomorrow": date(2026, 10, 18),
+            },
+        )
+
+    def test_counted_offsets(self) -> None:
+        self.assertEqual(_resolve("in 3 days")["in 3 days"], date(2026, 10, 19))
+        self.assertEqual(_resolve("in two weeks")["in two weeks"], date(2026, 10, 30))
+        self.assertEqual(_resolve("in 1 month")["in 1 month"], date(2026, 11, 16))
+        self.assertEqual(_resolve("5 days from now")["5 days from now"], date(2026, 10, 21))
+
+    def test_business_days_skip_the_weekend(self) -> None:
+        self.assertEqual(_resolve("in 1 business day")["in 1 business day"], date(2026, 10, 19))
+        self.assertEqual(_resolve("in 2 working days")["in 2 working days"], date(2026, 10, 20))
+
+    def test_month_offsets_clamp_to_the_last_day(self) -> None:
+        self.assertEqual(_resolve("in 1 month", datetime(2026, 1, 31))["in 1 month"], date(2026, 2, 28))
+
+    def test_this_weekday_said_on_that_day_is_today(self) -> None:
+        self.assertEqual(_resolve("can we do this friday?")["this friday"], date(2026, 10, 16))
+        self.assertEqual(_resolve("next friday")["next friday"], date(2026, 10, 23))
+
+    def test_weekdays_resolve_forward(self) -> None:
+        self.assertEqual(_resolve("this monday")["this monday"], date(2026, 10, 19))
+        self.assertEqual(_resolve("let's meet on wednesday")["on wednesday"], date(2026, 10, 21))
+        self.assertEqual(_resolve("please deliver it by tuesday")["by tuesday"], date(2026, 10, 20))
+
+    def test_past_tense_on_weekday_resolves_backwards(self) -> None:
+        self.assertEqual(_resolve("We met on Monday.")["on monday"], date(2026, 10, 12))
+        self.assertEqual(_resolve("I called them on friday")["on friday"], date(2026, 10, 9))
+
+    def test_past_tense_only_applies_to_its_own_sentence(self) -> None:
+        resolved = _resolve("We met yesterday. Let's continue on Monday.")
+        self.assertEqual(resolved["on monday"], date(2026, 10, 19))
+
+    def test_week_and_month_ends(self) -> None:
+        resolved = _resolve("next week or the end of the month, at the latest end of the week")
+        self.assertEqual(resolved["next week"], date(2026, 10, 19))
+        self.assertEqual(resolved["the end of the month"], date(2026, 10, 31))
+        self.assertEqual(resolved["end of the week"], date(2026, 10, 16))
+
+    def test_repeated_expressions_are_reported_once(self) -> None:
+        self.assertEqual(len(resolve_date_expressions("tomorrow? yes, Tomorrow", _NOW)), 1)
+
+
+class ConfiguredCalendarTest(unittest.TestCase):
+    def test_unknown_calendar_falls_back_to_default(self) -> None:
+        with self.assertLogs("BUSINESS_CALENDAR", level="WARNING"):
+            calendar = get_calendar_or_default("no-such-calendar")
+        self.assertEqual(calendar.name, "default")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import unittest
+
+from benchmarks.fake_llm import FakeChatModel
+from workflows import _build_chat_graph
+
+
+class FakeChatModelBindingTest(unittest.TestCase):
+    def test_records_bound_tools_and_options(self) -> None:
+        model = FakeChatModel()
+        _build_chat_graph(model, single_pass=True)
+
+        self.assertEqual(model.bound_tools, ["set_active_workflow", "relative_date", "submit_workflow_step_value"])
+        self.assertEqual(model.bind_options, {})
+        model.bind_tools([], tool_choice="auto")
+        self.assertEqual(model.bind_options, {"tool_choice": "auto"})
+
+    def test_rejects_options_it_cannot_honour(self) -> None:
+        # Benchmarks with CHAT_STRUCTURED_OUTPUT would otherwise measure the plain-JSON path.
+        with self.assertRaisesRegex(ValueError, "response_format, strict"):
+            _build_chat_graph(FakeChatModel(), structured_output=True)
+        for options in ({"strict": True}, {"tool_choice": "required"}, {"parallel_tool_calls": False}):
+            with self.subTest(options=options), self.assertRaises(ValueError):
+                FakeChatModel().bind_tools([], **options)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+import unittest
+
+import core.memory as memory
+from core.config import get_settings
+from services.chat import _apply_field_values
+from workflows import step_at
+
+_DESCRIPTION = "Redesign of the company website"
+
+
+class ApplyFieldValuesTest(unittest.IsolatedAsyncioTestCase):
+    """Values for later steps given ahead of time, e.g. "budget 800, it's a website redesign"."""
+
+    def setUp(self) -> None:
+        self._environ = dict(os.environ)
+        os.environ["CONVERSATION_STORE_BACKEND"] = "memory"
+        get_settings.cache_clear()
+        memory._store = None
+        self.store = memory.get_conversation_store()
+        self.store.ensure_session("s1")
+
+    def tearDown(self) -> None:
+        memory._store = None
+        os.environ.clear()
+        os.environ.update(self._environ)
+        get_settings.cache_clear()
+
+    def _start(self, workflow: str, step_index: int = 0):
+        self.store.set_active_workflow("s1", workflow)
+        for _ in range(step_index):
+            self.store.advance_workflow_step("s1")
+        return step_at("s1", workflow, step_index)
+
+    async def test_several_fields_are_accepted_in_one_turn(self) -> None:
+        step = self._start("brief")
+
+        step, rejected, is_valid, error = await _apply_field_values(
+            self.store, step, {"description": _DESCRIPTION, "x": "Two hundred printed flyers"}
+        )
+
+        self.assertEqual((rejected, is_valid, error), (None, True, None))
+        self.assertEqual(step.step_index, 2)
+        self.assertEqual(self.store.get_workflow_step_index("s1"), 2)
+        self.assertEqual(self.store.get_workflow_value("s1", "brief", "x"), "Two hundred printed flyers")
+
+    async def test_later_field_failing_validation_stops_there(self) -> None:
+        step = self._start("brief")
+
+        step, rejected, is_valid, error = await _apply_field_values(
+            self.store, step, {"description": _DESCRIPTION, "x": "too short"}
+        )
+
+        self.assertFalse(is_valid)
+        self.assertEqual(rejected, "too short")
+        self.assertIn("20 characters", error)
+        self.assertEqual(step.step_index, 1)
+        self.assertEqual(self.store.get_workflow_step_index("s1"), 1)
+        self.assertEqual(self.store.get_workflow_value("s1", "brief", "description"), _DESCRIPTION)
+        self.assertIsNone(self.store.get_workflow_value("s1", "brief", "x"))
+
+    async def test_partial_accept_stops_at_a_step_that_is_not_extracted_ahead(self) -> None:
+        # Budget was just accepted; the confirmation step must be answered on its own turn.
+        step = self._start("project", step_index=1)
+
+        step, _, is_valid, _ = await _apply_field_values(
+            self.store, step, {"description": _DESCRIPTION, "confirm": True}
+        )
+
+        self.assertTrue(is_valid)
+        self.assertEqual(step.step_index, 2)
+        self.assertEqual(step.key, "confirm")
+        self.assertEqual(self.store.get_workflow_step_index("s1"), 2)
+        self.assertIsNone(self.store.get_workflow_value("s1", "project", "confirm"))
+
+    async def test_missing_value_keeps_the_step(self) -> None:
+        step = self._start("brief")
+
+        step, _, is_valid, _ = await _apply_field_values(self.store, step, {"x": "Two hundred printed flyers"})
+
+        self.assertTrue(is_valid)
+        self.assertEqual(step.step_index, 0)
+        self.assertEqual(self.store.get_workflow_step_index("s1"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
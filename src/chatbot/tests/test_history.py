@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from core.history import HistoryPolicy
+
+
+def _conversation(turns: int, prefix: str = "turn") -> list[BaseMessage]:
+    messages: list[BaseMessage] = []
+    for index in range(turns):
+        messages += [HumanMessage(content=f"{prefix} {index} " + "x" * 36), AIMessage(content="ok " + "y" * 36)]
+    return messages
+
+
+class HistoryPolicyTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        async def summarizer(previous: str | None, messages: list[BaseMessage]) -> str:
+            return f"summary of {len(messages)} messages"
+
+        self.policy = HistoryPolicy(summarizer=summarizer)
+
+    async def _settle(self) -> None:
+        await asyncio.gather(*self.policy._tasks)
+
+    async def test_old_messages_are_folded_into_a_summary(self) -> None:
+        messages = _conversation(10)
+        self.policy.window("s1", messages, token_budget=60)
+        await self._settle()
+
+        window = self.policy.window("s1", messages, token_budget=60)
+        self.assertIsInstance(window[0], SystemMessage)
+        self.assertIn("summary of", window[0].text)
+        self.assertLess(len(window), len(messages))
+
+    async def test_restarted_session_drops_the_old_summary(self) -> None:
+        self.policy.window("s1", _conversation(10), token_budget=60)
+        await self._settle()
+
+        # The store evicted the session and the same id started a new conversation.
+        fresh = _conversation(4, prefix="fresh")
+        self.policy.window("s1", fresh[:2], token_budget=60)
+        window = self.policy.window("s1", fresh, token_budget=60)
+
+        self.assertNotIsInstance(window[0], SystemMessage)
+        self.assertEqual(window, fresh[-len(window):])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import os
+import unittest
+from unittest import mock
+
+import core.memory as memory
+import services.chat as chat
+from benchmarks.fake_llm import FakeChatModel, install_fake_llm
+from core.config import get_settings
+from schemas.chat import ChatRequest
+from workflows import WORKFLOWS, match_intent, may_switch_workflow, set_intent_classifier
+from workflows.registry import DEFAULT_WORKFLOW
+
+
+def _request(query: str) -> ChatRequest:
+    return ChatRequest(query=query, session_id="intents", timezone="UTC", user_mail="", message_files="")
+
+
+class WorkflowSwitchWordsTest(unittest.TestCase):
+    def test_every_registered_workflow_name_may_switch(self) -> None:
+        for name in WORKFLOWS:
+            if name != DEFAULT_WORKFLOW:
+                with self.subTest(workflow=name):
+                    self.assertTrue(may_switch_workflow(f"actually, the {name} please"))
+
+    def test_plain_step_values_do_not(self) -> None:
+        for query in ("800", "my budget is 1200 euros", "a redesign of the landing page"):
+            with self.subTest(query=query):
+                self.assertFalse(may_switch_workflow(query))
+
+
+class MatchIntentTest(unittest.TestCase):
+    def tearDown(self) -> None:
+        set_intent_classifier(None)
+
+    def test_requests_switch_workflows(self) -> None:
+        cases = {
+            "Please create a project": "project",
+            "Hi, please create a project": "project",
+            "I'd like to start a new project": "project",
+            "we need to set up a project": "project",
+            "Create a brief for me": "brief",
+            "can you write a brief?": "brief",
+            "Hello! Let's make a new brief": "brief",
+            "cancel this project": DEFAULT_WORKFLOW,
+            "stop": DEFAULT_WORKFLOW,
+        }
+        for query, workflow in cases.items():
+            with self.subTest(query=query):
+                match = match_intent(query)
+                self.assertEqual((match.workflow, match.source) if match else None, (workflow, "pattern"))
+
+    def test_questions_and_mentions_do_not(self) -> None:
+        for query in (
+            "how do I create a project in jira",
+            "how do I create a project in jira?",
+            "should I create a project or a brief?",
+            "Is there a new project template?",
+            "what is a brief",
+            "I created a project yesterday",
+            "don't create a project",
+            "My description: we will create a project site",
+            "please cancel the order I placed yesterday",
+        ):
+            with self.subTest(query=query):
+                self.assertIsNone(match_intent(query))
+
+    def test_questions_are_left_to_the_classifier(self) -> None:
+        queries = []
+        set_intent_classifier(lambda query: queries.append(query) or ("project", 0.99))
+
+        match = match_intent("how do I create a project in jira")
+
+        self.assertEqual(queries, ["how do I create a project in jira"])
+        self.assertEqual((match.workflow, match.source), ("project", "classifier"))
+
+
+class LocalExtractionTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self._environ = dict(os.environ)
+        os.environ.update(CONVERSATION_STORE_BACKEND="memory", RESPONSE_CACHE="0")
+        get_settings.cache_clear()
+        memory._store = None
+        install_fake_llm(FakeChatModel(latency=0))
+
+    def tearDown(self) -> None:
+        memory._store = None
+        os.environ.clear()
+        os.environ.update(self._environ)
+        get_settings.cache_clear()
+
+    async def test_locally_extracted_value_skips_the_turn_prompt(self) -> None:
+        await chat.handle_chat(_request("Please create a project"))
+        prepare = mock.AsyncMock(wraps=chat.prepare_prompt_messages)
+        with mock.patch.object(chat, "prepare_prompt_messages", prepare):
+            await chat.handle_chat(_request("800"))
+
+        store = memory.get_conversation_store()
+        self.assertEqual(store.get_workflow_value("intents", "project", "budget"), 800.0)
+        # Only the follow-up prompt for the next step is built.
+        self.assertEqual([call.kwargs.get("query_override") for call in prepare.await_args_list], [chat._STEP_PROMPT_QUERY])
+
+
+if __name__ == "__main__":
+    unittest.main()
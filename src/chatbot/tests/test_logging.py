@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import logging
+import queue
+import unittest
+
+from core.logging import JSONFormatter, _AsyncQueueHandler
+
+
+class AsyncQueueHandlerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.queue: queue.Queue = queue.Queue()
+        self.logger = logging.getLogger("tests.async_queue")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.handler = _AsyncQueueHandler(self.queue, None, 1.0)
+        self.logger.addHandler(self.handler)
+        self.addCleanup(self.logger.removeHandler, self.handler)
+
+    def test_message_is_rendered_when_queued(self) -> None:
+        state = {"step": 1}
+        self.logger.warning("state %r", state)
+        state["step"] = 2
+
+        record = self.queue.get_nowait()
+        self.assertEqual(record.getMessage(), "state {'step': 1}")
+        self.assertIsNone(record.args)
+
+    def test_exception_is_rendered_when_queued(self) -> None:
+        try:
+            raise ValueError("broken")
+        except ValueError:
+            self.logger.exception("failed")
+
+        record = self.queue.get_nowait()
+        self.assertIsNone(record.exc_info)
+        self.assertIn("ValueError: broken", record.exc_text)
+        self.assertIn("ValueError: broken", JSONFormatter().format(record))
+
+    def test_sampled_out_records_are_not_queued(self) -> None:
+        self.handler.sample_rate = 0.0
+        self.logger.debug("noisy %s", "event")
+        self.logger.info("kept")
+
+        self.assertEqual(self.queue.get_nowait().getMessage(), "kept")
+        self.assertTrue(self.queue.empty())
+
+
+if __name__ == "__main__":
+    unittest.main()
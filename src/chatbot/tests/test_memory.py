@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import unittest
+
+import workflows
+from core.memory import InMemoryConversationStore, workflow_state_type
+
+
+class WorkflowStateRecordTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.store = InMemoryConversationStore()
+        self.store.ensure_session("a")
+
+    def test_registered_workflows_get_slotted_records(self) -> None:
+        for name, workflow in workflows.WORKFLOWS.items():
+            state = workflow_state_type(name)()
+            self.assertFalse(hasattr(state, "__dict__"), name)
+            self.assertEqual(state.step_index, 0)
+            for step in workflow.steps:
+                if step.key is not None:
+                    self.assertIsNone(getattr(state, step.key))
+
+    def test_values_round_trip_and_unknown_keys_are_dropped(self) -> None:
+        self.store.set_active_workflow("a", "project")
+        self.store.set_workflow_value("a", "project", "budget", 800.0)
+        self.store.set_workflow_value("a", "project", "not_a_step", "x")
+
+        self.assertEqual(self.store.get_workflow_value("a", "project", "budget"), 800.0)
+        self.assertIsNone(self.store.get_workflow_value("a", "project", "not_a_step"))
+        self.assertIsInstance(self.store._records["a"].workflows["project"], workflow_state_type("project"))
+
+    def test_entering_a_workflow_resets_its_record(self) -> None:
+        self.store.set_active_workflow("a", "project")
+        self.store.set_workflow_value("a", "project", "budget", 800.0)
+        self.store.advance_workflow_step("a")
+        self.store.set_active_workflow("a", "project")
+
+        self.assertIsNone(self.store.get_workflow_value("a", "project", "budget"))
+        self.assertEqual(self.store.get_workflow_step_index("a"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import unittest
+
+import workflows.registry as registry
+from workflows import WORKFLOWS, get_workflow, precompile_system_prompts, step_at
+
+
+class PrecompiledSystemPromptsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        registry._render_system_prompt.cache_clear()
+
+    def test_every_step_is_rendered_up_front(self) -> None:
+        expected = sum(len(workflow.steps) + 1 for workflow in WORKFLOWS.values())
+
+        self.assertEqual(precompile_system_prompts(), expected)
+        self.assertEqual(registry._render_system_prompt.cache_info().currsize, expected)
+
+    def test_turns_reuse_the_precompiled_prompts(self) -> None:
+        precompile_system_prompts()
+        misses = registry._render_system_prompt.cache_info().misses
+
+        for name, workflow in WORKFLOWS.items():
+            for step_index in range(len(workflow.steps) + 3):
+                step_at("s1", name, step_index).system_prompt
+
+        self.assertEqual(registry._render_system_prompt.cache_info().misses, misses)
+
+    def test_prompt_carries_the_step_and_later_fields(self) -> None:
+        project = get_workflow("project")
+        prompt = project.system_prompt(0)
+
+        self.assertIn(project.instruction, prompt)
+        self.assertIn(project.steps[0].instruction, prompt)
+        # The description may be given ahead of time; the confirmation may not.
+        self.assertIn("description (string)", prompt)
+        self.assertNotIn("confirm (", prompt)
+        self.assertEqual(project.system_prompt(99), project.system_prompt(len(project.steps)))
+
+
+class ErrorTemplateTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.step = get_workflow("brief").steps[0]
+
+    def test_language_falls_back_to_base_then_default(self) -> None:
+        english = self.step.validation_error_reply("Too short.", "flyers", "en")
+        self.assertTrue(english.startswith("Too short. Please add specifications"))
+        self.assertTrue(self.step.validation_error_reply("Zu kurz", "flyers", "de-AT").startswith("Zu kurz. Bitte"))
+        self.assertEqual(self.step.validation_error_reply("Too short.", "flyers", "fr"), english)
+
+    def test_steps_without_templates_defer_to_the_model(self) -> None:
+        self.assertIsNone(get_workflow("brief").steps[1].validation_error_reply("Too short", "x", "en"))
+
+    def test_unknown_slots_fail_at_registration(self) -> None:
+        with self.assertRaises(ValueError):
+            registry._compile_step(0, {"key": "name", "error_templates": {"en": "{error} ({user})"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import core.response_cache as response_cache
+from core.response_cache import ResponseCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+class ResponseCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "cache.sqlite3")
+        self.clock = _Clock()
+        patcher = mock.patch.object(response_cache, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _cache(self, **kwargs) -> ResponseCache:
+        cache = ResponseCache(**{"max_entries": 8, "ttl_seconds": 10.0, "path": self.path, **kwargs})
+        self.addCleanup(cache._connection.close)
+        return cache
+
+    async def test_hit_and_miss(self) -> None:
+        cache = ResponseCache(max_entries=8, ttl_seconds=10.0)
+        self.assertIsNone(await cache.get("a"))
+        await cache.put("a", {"answer": "hi"})
+
+        self.assertEqual(await cache.get("a"), {"answer": "hi"})
+        self.assertEqual(cache.stats()["response_cache_hits"], 1)
+        self.assertEqual(cache.stats()["response_cache_misses"], 1)
+
+    async def test_entries_expire(self) -> None:
+        cache = self._cache()
+        await cache.put("a", {"answer": "hi"})
+        self.clock.now += 11
+
+        self.assertIsNone(await cache.get("a"))
+        self.assertEqual(cache.stats()["response_cache_evictions"], 1)
+
+    async def test_disk_hit_keeps_the_original_expiry(self) -> None:
+        await self._cache().put("a", {"answer": "hi"})
+
+        restarted = self._cache()
+        self.clock.now += 8
+        self.assertEqual(await restarted.get("a"), {"answer": "hi"})
+        self.assertEqual(restarted.stats()["response_cache_disk_hits"], 1)
+        # Promoted to memory, but still due ten seconds after it was written.
+        self.clock.now += 3
+        self.assertIsNone(await restarted.get("a"))
+
+    async def test_disk_rows_are_capped_least_recently_used_first(self) -> None:
+        cache = self._cache(disk_max_entries=2)
+        for key in ("a", "b"):
+            await cache.put(key, {"answer": key})
+            self.clock.now += 1
+        restarted = self._cache(disk_max_entries=2)
+        await restarted.get("a")
+        self.clock.now += 1
+        await restarted.put("c", {"answer": "c"})
+
+        keys = {row[0] for row in restarted._connection.execute("SELECT key FROM response_cache")}
+        self.assertEqual(keys, {"a", "c"})
+
+    async def test_disk_tier_stays_off_the_event_loop(self) -> None:
+        cache = self._cache()
+        loop_thread = threading.current_thread()
+        threads = []
+        for name in ("_disk_get", "_disk_put"):
+            method = getattr(cache, name)
+
+            def record(*args, method=method):
+                threads.append(threading.current_thread())
+                return method(*args)
+
+            setattr(cache, name, record)
+
+        await cache.put("a", {"answer": "hi"})
+        await cache.get("b")
+
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(loop_thread, threads)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from langchain_core.messages import HumanMessage
+
+import core.memory as memory
+from benchmarks.fake_llm import FakeChatModel, install_fake_llm
+from core.config import get_settings
+from schemas.chat import ChatRequest
+from services.chat import handle_chat
+
+_LLM_LATENCY_SECONDS = 0.01
+
+
+def _request(session_id: str, query: str) -> ChatRequest:
+    return ChatRequest(query=query, session_id=session_id, timezone="UTC", user_mail="", message_files="")
+
+
+async def _run_project_session(index: int) -> None:
+    session_id = f"session-{index}"
+    await handle_chat(_request(session_id, "Please create a project"))
+    await handle_chat(_request(session_id, str(index)))
+    await handle_chat(_request(session_id, f"Project number {index}: a complete redesign of the website"))
+
+
+class ConcurrentSessionsTest(unittest.IsolatedAsyncioTestCase):
+    """Many sessions at once against the fake model; each must keep only its own workflow state."""
+
+    backend = "memory"
+
+    def setUp(self) -> None:
+        self._environ = dict(os.environ)
+        self._directory = tempfile.TemporaryDirectory()
+        os.environ.update(
+            CONVERSATION_STORE_BACKEND=self.backend,
+            CONVERSATION_STORE_PATH=os.path.join(self._directory.name, "conversations.sqlite3"),
+            RESPONSE_CACHE="0",
+        )
+        get_settings.cache_clear()
+        memory._store = None
+        self.model = FakeChatModel(latency=_LLM_LATENCY_SECONDS)
+        install_fake_llm(self.model)
+
+    def tearDown(self) -> None:
+        close = getattr(memory._store, "close", None)
+        if close is not None:
+            close()
+        memory._store = None
+        self._directory.cleanup()
+        os.environ.clear()
+        os.environ.update(self._environ)
+        get_settings.cache_clear()
+
+    async def test_sessions_keep_their_own_state(self) -> None:
+        sessions = 100
+        await asyncio.gather(*(_run_project_session(index) for index in range(1, sessions + 1)))
+
+        store = memory.get_conversation_store()
+        for index in range(1, sessions + 1):
+            session_id = f"session-{index}"
+            with self.subTest(session=session_id):
+                self.assertEqual(store.get_active_workflow(session_id), "project")
+                self.assertEqual(store.get_workflow_step_index(session_id), 2)
+                self.assertEqual(store.get_workflow_value(session_id, "project", "budget"), float(index))
+                self.assertIn(f"Project number {index}:", store.get_workflow_value(session_id, "project", "description"))
+
+    async def test_turns_of_one_session_run_in_order(self) -> None:
+        queries = [f"message {index}" for index in range(5)]
+        await asyncio.gather(*(handle_chat(_request("ordered", query)) for query in queries))
+
+        history = memory.get_conversation_store().read("ordered")
+        human = [message.text for message in history if isinstance(message, HumanMessage)]
+        self.assertEqual(human, queries)
+
+    async def test_throughput_scales_with_concurrent_sessions(self) -> None:
+        await _run_project_session(0)  # warm up compiled graphs
+        # A realistic model latency, so turns spend most of their time waiting on the LLM.
+        self.model.latency = 0.2
+        started = time.perf_counter()
+        await _run_project_session(-1)
+        single = time.perf_counter() - started
+
+        sessions = 40
+        started = time.perf_counter()
+        await asyncio.gather(*(_run_project_session(index) for index in range(1, sessions + 1)))
+        concurrent = time.perf_counter() - started
+
+        # Serialized sessions would take `sessions * single`; overlapping LLM waits must win by a wide margin.
+        self.assertLess(concurrent, sessions * single / 4)
+
+
+class ConcurrentSQLiteSessionsTest(ConcurrentSessionsTest):
+    backend = "sqlite"
+
+    async def test_store_calls_stay_off_the_event_loop(self) -> None:
+        store = memory.get_conversation_store()
+        loop_thread = threading.current_thread()
+        on_loop: list[str] = []
+
+        def record(name: str):
+            method = getattr(store, name)
+
+            def wrapper(*args, **kwargs):
+                if threading.current_thread() is loop_thread:
+                    on_loop.append(name)
+                return method(*args, **kwargs)
+
+            return wrapper
+
+        for name in ("read", "append", "ensure_session", "get_active_workflow", "get_workflow_value", "set_workflow_value", "set_active_workflow"):
+            setattr(store, name, record(name))
+
+        await _run_project_session(1)
+
+        self.assertEqual(on_loop, [])
+        self.assertEqual(store.get_workflow_value("session-1", "project", "budget"), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import os
+import unittest
+
+import clients.llm as llm_module
+import core.memory as memory
+import workflows
+from core.config import LLM_PURPOSES, get_settings
+from schemas.chat import ChatRequest
+from services.chat import handle_chat
+from tests.openai_stub import OpenAIStub, answer, tool_call
+
+
+def _request(query: str) -> ChatRequest:
+    return ChatRequest(query=query, session_id="s1", timezone="UTC", user_mail="", message_files="")
+
+
+class SinglePassTurnTest(unittest.IsolatedAsyncioTestCase):
+    """CHAT_SINGLE_PASS: the model validates the step value through a tool and asks for the next step itself."""
+
+    def setUp(self) -> None:
+        self._environ = dict(os.environ)
+        os.environ.update(CONVERSATION_STORE_BACKEND="memory", CHAT_SINGLE_PASS="1", RESPONSE_CACHE="0")
+        get_settings.cache_clear()
+        memory._store = None
+        store = memory.get_conversation_store()
+        store.ensure_session("s1")
+        store.set_active_workflow("s1", "project")
+        self.store = store
+
+    def tearDown(self) -> None:
+        llm_module._llms.clear()
+        workflows._get_route_graph.cache_clear()
+        memory._store = None
+        os.environ.clear()
+        os.environ.update(self._environ)
+        get_settings.cache_clear()
+
+    def _install(self, *replies) -> OpenAIStub:
+        stub = OpenAIStub(*replies)
+        model = stub.chat_model()
+        for purpose in LLM_PURPOSES:
+            llm_module._llms[llm_module.resolve_llm_route(purpose)] = model
+        workflows._get_route_graph.cache_clear()
+        return stub
+
+    async def test_value_and_next_step_prompt_in_one_graph_run(self) -> None:
+        stub = self._install(
+            tool_call("submit_workflow_step_value", {"value": 800}),
+            answer({"answer": "Thanks! Please describe the project.", "validator_value": None}),
+        )
+
+        response = await handle_chat(_request("eight hundred euros"))
+
+        self.assertEqual(response.answer, "Thanks! Please describe the project.")
+        self.assertEqual(len(stub.requests), 2)
+        tool_names = {tool["function"]["name"] for tool in stub.requests[0]["tools"]}
+        self.assertIn("submit_workflow_step_value", tool_names)
+        # The second call already sees the accepted value and the next step instruction.
+        self.assertIn("Value accepted", stub.requests[1]["messages"][-1]["content"])
+        self.assertEqual(self.store.get_workflow_step_index("s1"), 1)
+        self.assertEqual(self.store.get_workflow_value("s1", "project", "budget"), 800.0)
+
+    async def test_rejected_value_is_explained_without_advancing(self) -> None:
+        stub = self._install(
+            tool_call("submit_workflow_step_value", {"value": 5000}),
+            answer({"answer": "That is above the limit. What is the budget?", "validator_value": None}),
+        )
+
+        response = await handle_chat(_request("five thousand"))
+
+        self.assertEqual(response.answer, "That is above the limit. What is the budget?")
+        self.assertEqual(len(stub.requests), 2)
+        self.assertIn("failed validation", stub.requests[1]["messages"][-1]["content"])
+        self.assertEqual(self.store.get_workflow_step_index("s1"), 0)
+
+    async def test_skipped_tool_falls_back_to_validation_and_follow_up(self) -> None:
+        stub = self._install(
+            answer({"answer": "Noted.", "validator_value": 800}),
+            answer({"answer": "Please describe the project.", "validator_value": None}),
+        )
+
+        response = await handle_chat(_request("eight hundred euros"))
+
+        self.assertEqual(response.answer, "Please describe the project.")
+        self.assertEqual(len(stub.requests), 2)
+        self.assertEqual(self.store.get_workflow_step_index("s1"), 1)
+        self.assertEqual(self.store.get_workflow_value("s1", "project", "budget"), 800.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
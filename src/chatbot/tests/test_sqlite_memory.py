@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+import workflows  # noqa: F401  (registers the workflow state records)
+from core.sqlite_memory import SQLiteConversationStore
+
+_ORPHAN_QUERIES = (
+    "SELECT COUNT(*) FROM messages WHERE session_id NOT IN (SELECT session_id FROM sessions)",
+    "SELECT COUNT(*) FROM workflow_values WHERE session_id NOT IN (SELECT session_id FROM sessions)",
+)
+
+
+class SQLiteConversationStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = SQLiteConversationStore(os.path.join(directory.name, "conversations.sqlite3"), max_sessions=1)
+        self.addCleanup(self.store.close)
+
+    def _orphans(self) -> list[int]:
+        return [self.store._connection.execute(query).fetchone()[0] for query in _ORPHAN_QUERIES]
+
+    def test_step_value_and_advance_share_a_transaction(self) -> None:
+        self.store.ensure_session("a")
+        self.store.set_active_workflow("a", "project")
+        with self.store.transaction():
+            self.store.set_workflow_value("a", "project", "budget", 800.0)
+            self.store.advance_workflow_step("a")
+
+        self.assertEqual(self.store.get_workflow_value("a", "project", "budget"), 800.0)
+        self.assertEqual(self.store.get_workflow_step_index("a"), 1)
+
+    def test_writes_after_mid_turn_eviction_leave_no_orphans(self) -> None:
+        self.store.ensure_session("a")
+        # Another session arrives while "a" is waiting on the LLM and pushes it over the cap.
+        self.store.ensure_session("b")
+        self.assertEqual(self.store.stats()["live_sessions"], 1)
+
+        self.store.set_workflow_value("a", "project", "budget", 500.0)
+        self.store.append("a", HumanMessage(content="500"), AIMessage(content="Thanks."))
+        self.assertEqual(self._orphans(), [0, 0])
+
+        # The recreated session is evicted as a whole again.
+        self.store.ensure_session("c")
+        self.store.ensure_session("d")
+        self.assertEqual(self._orphans(), [0, 0])
+        self.assertEqual(self.store.read("a"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+import unittest
+
+from chains.chat import ChatAnswerStreamParser
+
+# Quotes, backslashes, control characters, a BMP character and a surrogate pair (when ASCII-escaped).
+_ANSWER = 'Say "hi" \\ to Zoë:\n\tline 2 / done 😀'
+
+
+def _feed(chunks: list[str]) -> tuple[str, ChatAnswerStreamParser]:
+    parser = ChatAnswerStreamParser()
+    return "".join(parser.feed(chunk) for chunk in chunks), parser
+
+
+class ChatAnswerStreamParserTest(unittest.TestCase):
+    def _payloads(self) -> list[str]:
+        result = {"answer": _ANSWER, "validator_value": "x \"quoted\""}
+        return [
+            json.dumps(result),
+            json.dumps(result, ensure_ascii=False),
+            # The answer need not come first, and the key may be spaced out.
+            '{"validator_value": "\\"answer\\": no", "answer" :  ' + json.dumps(_ANSWER) + "}",
+        ]
+
+    def test_every_split_point(self) -> None:
+        for payload in self._payloads():
+            for split in range(len(payload) + 1):
+                with self.subTest(payload=payload, split=split):
+                    text, parser = _feed([payload[:split], payload[split:]])
+                    self.assertEqual(text, _ANSWER)
+                    self.assertTrue(parser.done)
+
+    def test_one_character_chunks(self) -> None:
+        for payload in self._payloads():
+            with self.subTest(payload=payload):
+                text, parser = _feed(list(payload))
+                self.assertEqual(text, _ANSWER)
+                self.assertTrue(parser.done)
+
+    def test_escapes_are_held_back_until_complete(self) -> None:
+        parser = ChatAnswerStreamParser()
+        self.assertEqual(parser.feed('{"answer": "a\\'), "a")
+        self.assertEqual(parser.feed("u00"), "")
+        self.assertEqual(parser.feed("e9\\ud83d"), "é")
+        self.assertEqual(parser.feed("\\ude00"), "😀")
+        self.assertEqual(parser.feed('", "validator_value": "ignored"}'), "")
+        self.assertTrue(parser.done)
+
+    def test_nothing_before_the_answer_key(self) -> None:
+        parser = ChatAnswerStreamParser()
+        self.assertEqual(parser.feed('{"validator_value": 800, "ans'), "")
+        self.assertEqual(parser.feed('wer": "ok"}'), "ok")
+        self.assertEqual(parser.feed("more"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import unittest
+from typing import Any, Dict, List
+
+from langchain_core.messages import HumanMessage
+
+import core.memory as memory
+from chains.chat import ChatLLMResult, parse_chat_result
+from core.session import bind_session
+from services.chat import _stream_agent_answer
+from tests.openai_stub import OpenAIStub, answer, tool_call
+from workflows import _build_chat_graph, resolve_step, step_state
+
+_FINAL = {"answer": "What is the \"budget\"?", "validator_value": None, "field_values": None}
+
+
+def _strict_problems(schema: Any, path: str = "$") -> List[str]:
+    """Rules OpenAI applies to strict schemas: closed objects, every property required, no defaults."""
+    problems: List[str] = []
+    if isinstance(schema, dict):
+        if "default" in schema:
+            problems.append(f"{path}: default")
+        if schema.get("type") == "object":
+            if schema.get("additionalProperties") is not False:
+                problems.append(f"{path}: additionalProperties")
+            if set(schema.get("required", ())) != set(schema.get("properties", {})):
+                problems.append(f"{path}: required")
+        for key, value in schema.items():
+            problems += _strict_problems(value, f"{path}.{key}")
+    elif isinstance(schema, list):
+        for index, value in enumerate(schema):
+            problems += _strict_problems(value, f"{path}[{index}]")
+    return problems
+
+
+class StructuredOutputGraphTest(unittest.IsolatedAsyncioTestCase):
+    """CHAT_STRUCTURED_OUTPUT graphs against a stub OpenAI API: a tool call, then a parsed final answer."""
+
+    def setUp(self) -> None:
+        memory._store = None
+        self.addCleanup(setattr, memory, "_store", None)
+        self.stub = OpenAIStub(tool_call("set_active_workflow", {"workflow": "project"}), answer(_FINAL))
+        self.graph = _build_chat_graph(self.stub.chat_model(), single_pass=True, structured_output=True)
+        memory.get_conversation_store().ensure_session("s1")
+
+    def _input(self) -> Dict[str, Any]:
+        return {**step_state(resolve_step("s1")), "messages": [HumanMessage(content="Let's set up a project")]}
+
+    def _check_requests(self) -> None:
+        self.assertEqual(len(self.stub.requests), 2)
+        request = self.stub.requests[0]
+        self.assertEqual(request["response_format"]["type"], "json_schema")
+        self.assertEqual(_strict_problems(request["response_format"]["json_schema"]["schema"]), [])
+        for tool in request["tools"]:
+            with self.subTest(tool=tool["function"]["name"]):
+                self.assertTrue(tool["function"]["strict"])
+                self.assertEqual(_strict_problems(tool["function"]["parameters"]), [])
+
+    async def test_invoke_runs_tools_and_parses_the_answer(self) -> None:
+        with bind_session("s1"):
+            state = await self.graph.ainvoke(self._input())
+
+        self._check_requests()
+        self.assertEqual(memory.get_conversation_store().get_active_workflow("s1"), "project")
+        self.assertEqual(parse_chat_result(state["messages"][-1]), ChatLLMResult(**_FINAL))
+
+    async def test_stream_runs_tools_and_streams_the_answer(self) -> None:
+        tokens: List[str] = []
+
+        async def on_token(text: str) -> None:
+            tokens.append(text)
+
+        with bind_session("s1"):
+            state, streamed = await _stream_agent_answer(self.graph, self._input(), on_token)
+
+        self._check_requests()
+        self.assertTrue(streamed)
+        self.assertEqual("".join(tokens), _FINAL["answer"])
+        self.assertEqual(parse_chat_result(state["messages"][-1]), ChatLLMResult(**_FINAL))
+
+
+if __name__ == "__main__":
+    unittest.main()
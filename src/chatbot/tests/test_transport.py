@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from clients.transport import ResilientTransport, parse_retry_after
+
+_MAX_CONCURRENCY = 4
+
+
+class ResilientTransportTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.calls = 0
+        self.cancelled = 0
+
+    def _client(self, handler, **options) -> tuple[httpx.AsyncClient, ResilientTransport]:
+        options.setdefault("retry_base_delay", 0.001)
+        transport = ResilientTransport(
+            limits=httpx.Limits(),
+            max_concurrency=_MAX_CONCURRENCY,
+            max_concurrency_per_model=2,
+            transport=httpx.MockTransport(handler),
+            **options,
+        )
+        client = httpx.AsyncClient(transport=transport, base_url="http://llm.test")
+        self.addAsyncCleanup(client.aclose)
+        return client, transport
+
+    async def _post(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.post("/v1/chat/completions", content=json.dumps({"model": "m"}))
+
+    def _assert_permits_released(self, transport: ResilientTransport) -> None:
+        self.assertEqual(transport.stats()["llm_in_flight"], 0)
+        self.assertEqual(transport._global._value, _MAX_CONCURRENCY)
+        self.assertTrue(all(semaphore._value == 2 for semaphore in transport._per_model.values()))
+
+    def _statuses(self, *statuses: int, headers: dict | None = None):
+        async def handler(request: httpx.Request) -> httpx.Response:
+            status = statuses[min(self.calls, len(statuses) - 1)]
+            self.calls += 1
+            return httpx.Response(status, headers=headers if status != 200 else None, json={})
+
+        return handler
+
+    async def test_retries_throttling_and_server_errors(self) -> None:
+        client, transport = self._client(self._statuses(429, 500, 503, 200))
+
+        response = await self._post(client)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.calls, 4)
+        self.assertEqual(transport.stats()["llm_retries"], 3)
+        self._assert_permits_released(transport)
+
+    async def test_gives_up_after_max_retries(self) -> None:
+        client, transport = self._client(self._statuses(502), max_retries=2)
+
+        response = await self._post(client)
+
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(self.calls, 3)
+        self._assert_permits_released(transport)
+
+    async def test_client_errors_are_not_retried(self) -> None:
+        client, transport = self._client(self._statuses(400))
+
+        response = await self._post(client)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(transport.stats()["llm_retries"], 0)
+
+    async def test_waits_for_retry_after(self) -> None:
+        client, _ = self._client(self._statuses(429, 200, headers={"Retry-After": "0.2"}))
+
+        started = time.perf_counter()
+        response = await self._post(client)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(time.perf_counter() - started, 0.2)
+
+    def test_parses_retry_after_values(self) -> None:
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertEqual(parse_retry_after("-1"), 0.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        in_a_minute = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+        self.assertAlmostEqual(parse_retry_after(in_a_minute), 60, delta=2)
+
+    async def test_retries_transport_errors(self) -> None:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            self.calls += 1
+            if self.calls == 1:
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(200, json={})
+
+        client, transport = self._client(handler)
+
+        response = await self._post(client)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(transport.stats()["llm_retries"], 1)
+        self._assert_permits_released(transport)
+
+    async def test_hedge_wins_and_slow_request_is_cancelled(self) -> None:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            self.calls += 1
+            if self.calls == 1:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    self.cancelled += 1
+                    raise
+            return httpx.Response(200, json={"call": self.calls})
+
+        client, transport = self._client(handler, hedging=True, hedge_delay=0.05)
+
+        started = time.perf_counter()
+        response = await self._post(client)
+        await asyncio.sleep(0)
+
+        self.assertEqual(response.json(), {"call": 2})
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertEqual(self.cancelled, 1)
+        stats = transport.stats()
+        self.assertEqual((stats["llm_hedges"], stats["llm_hedges_won"]), (1, 1))
+        self._assert_permits_released(transport)
+
+    async def test_no_hedge_without_spare_capacity(self) -> None:
+        release = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            self.calls += 1
+            await release.wait()
+            return httpx.Response(200, json={})
+
+        client, transport = self._client(handler, hedging=True, hedge_delay=0.01)
+
+        # Two requests fill the per-model limit, so neither may start a hedge.
+        requests = [asyncio.ensure_future(self._post(client)) for _ in range(2)]
+        await asyncio.sleep(0.1)
+        release.set()
+        await asyncio.gather(*requests)
+
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(transport.stats()["llm_hedges"], 0)
+        self._assert_permits_released(transport)
+
+    async def test_permits_are_released_after_errors(self) -> None:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            raise RuntimeError("broken stub")
+
+        client, transport = self._client(handler)
+
+        for _ in range(_MAX_CONCURRENCY + 1):
+            with self.assertRaises(RuntimeError):
+                await self._post(client)
+
+        self._assert_permits_released(transport)
+
+    async def test_permits_are_released_on_cancellation(self) -> None:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(5)
+            return httpx.Response(200, json={})
+
+        client, transport = self._client(handler, hedging=True, hedge_delay=0.01)
+
+        # More requests than permits: some are cancelled while waiting, others while in flight or hedging.
+        requests = [asyncio.ensure_future(self._post(client)) for _ in range(_MAX_CONCURRENCY * 2)]
+        await asyncio.sleep(0.05)
+        for request in requests:
+            request.cancel()
+        await asyncio.gather(*requests, return_exceptions=True)
+        await asyncio.sleep(0)
+
+        self._assert_permits_released(transport)
+
+    async def test_permits_are_held_until_the_body_is_closed(self) -> None:
+        client, transport = self._client(self._statuses(200))
+
+        async with client.stream("POST", "/v1/chat/completions", content=json.dumps({"model": "m"})) as response:
+            self.assertEqual(transport.stats()["llm_in_flight"], 1)
+            await response.aread()
+
+        self._assert_permits_released(transport)
+
+
+class SharedLLMClientTest(unittest.IsolatedAsyncioTestCase):
+    async def test_threads_share_one_http_client(self) -> None:
+        import clients.llm as llm
+
+        saved = llm._http_client, llm._transport
+        llm._http_client = None
+        barrier = threading.Barrier(8)
+
+        def create() -> httpx.AsyncClient:
+            barrier.wait()
+            return llm.get_llm_http_client()
+
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                clients = list(pool.map(lambda _: create(), range(8)))
+            self.assertEqual(len({id(client) for client in clients}), 1)
+            await clients[0].aclose()
+        finally:
+            llm._http_client, llm._transport = saved
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import unittest
+
+from workflows.project import validate_project_description
+from workflows.registry import VALIDATOR_TIMEOUT_MESSAGE, CompiledStep
+
+
+def _step(validator, **options) -> CompiledStep:
+    return CompiledStep(
+        index=0,
+        key="value",
+        field_type=None,
+        instruction="",
+        validator=validator,
+        extractor=None,
+        **options,
+    )
+
+
+class StepValidationTest(unittest.IsolatedAsyncioTestCase):
+    async def test_two_tuple_result_keeps_the_input(self) -> None:
+        result = await _step(lambda value: (True, None)).validate("raw")
+        self.assertEqual(result, (True, None, "raw"))
+
+    async def test_slow_async_validator_times_out(self) -> None:
+        async def validator(value):
+            await asyncio.sleep(1)
+            return True, None
+
+        result = await _step(validator, validator_timeout=0.05).validate("x")
+        self.assertEqual(result, (False, VALIDATOR_TIMEOUT_MESSAGE, "x"))
+
+    async def test_sync_validator_with_timeout_runs_off_the_loop(self) -> None:
+        def validator(value):
+            time.sleep(0.3)
+            return True, None
+
+        started = time.perf_counter()
+        result = await _step(validator, validator_timeout=0.05).validate("x")
+        self.assertEqual(result, (False, VALIDATOR_TIMEOUT_MESSAGE, "x"))
+        self.assertLess(time.perf_counter() - started, 0.25)
+
+    def test_project_description_always_returns_three_values(self) -> None:
+        self.assertEqual(validate_project_description("short"), (False, "Description must be at least 20 characters long.", None))
+        self.assertEqual(len(validate_project_description(42)), 3)
+        self.assertEqual(validate_project_description("  A complete website redesign  ")[2], "A complete website redesign")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,4 @@
 from tools.datetime import relative_date_tool
-from tools.workflow import set_active_workflow_tool
+from tools.workflow import set_active_workflow_tool, submit_workflow_step_value_tool
 
-__all__ = ["relative_date_tool", "set_active_workflow_tool"]
+__all__ = ["relative_date_tool", "set_active_workflow_tool", "submit_workflow_step_value_tool"]
@@ -14,7 +14,8 @@ def relative_date_tool(
     current_datetime: str, 
     timezone: str, 
     offset_days: int, 
-    day_type: str = "calendar"
+    day_type: str = "calendar",
+    calendar: str = "default",
 ) -> str:
     """
     Calculate a date relative to another date. Invoke this tool only if user wants to get a relative date.
@@ -24,6 +25,7 @@ def relative_date_tool(
         timezone (str): The timezone of the starting date and time.
         offset_days (int): The number of days to offset.
         day_type (str): The type of days to consider ("calendar" or "business").
+        calendar (str): Holiday calendar used for business days ("default" skips weekends only).
 
     Returns:
         str: The calculated date in ISO format with the day of the week.
@@ -31,11 +33,14 @@ def relative_date_tool(
     logger = get_logger("RELATIVE_DATE_TOOL", color=COLORS["GREEN"])
     start = parse_datetime(current_datetime, timezone)
     
-    target = (
-        apply_business_days(start, offset_days) 
-        if day_type == "business" 
-        else start + timedelta(days=offset_days)
-    )
+    try:
+        target = (
+            apply_business_days(start, offset_days, calendar)
+            if day_type == "business"
+            else start + timedelta(days=offset_days)
+        )
+    except ValueError as exc:
+        return str(exc)
     
     result = f"{target.date().isoformat()} ({target.strftime('%A')})"
     logger.debug(result)
@@ -1,32 +1,72 @@
 from __future__ import annotations
 
-from typing import Literal
-
 from langchain_core.tools import tool
 from core.logging import get_logger
-from core.memory import get_conversation_store
-from schemas.tools import SetActiveWorkflowInput
+from core.memory import get_conversation_store, run_store_io, save_step_value
+from core.session import get_current_session_id
+from schemas.tools import SetActiveWorkflowInput, SubmitWorkflowStepValueInput
 from core.constants import COLORS
 
 
 @tool("set_active_workflow", args_schema=SetActiveWorkflowInput)
-def set_active_workflow_tool(workflow: Literal["none", "brief", "project"]) -> str:
+def set_active_workflow_tool(workflow: str) -> str:
     """
     Execute this tool only when user explicitly requests to change the active workflow or say 'create a brief' or 'create a project'.
     If user say "create a brief/project", this tool should be triggered.
     """
     logger = _get_logger()
     store = get_conversation_store()
-    session_id = store.get_current_session()
+    session_id = get_current_session_id()
 
     if not session_id:
         return "No active session; cannot set workflow."
 
     store.set_active_workflow(session_id, workflow)
-    logger.debug(f"Active workflow for current session set to '{workflow}'.")
+    logger.debug("Active workflow for current session set to '%s'.", workflow)
     return f"Active workflow set to '{workflow}' for the current session."
 
 
+@tool("submit_workflow_step_value", args_schema=SubmitWorkflowStepValueInput)
+async def submit_workflow_step_value_tool(value: str | float | bool) -> str:
+    """
+    Execute this tool whenever the user's message contains a value for the current workflow step field.
+    Pass the extracted value. The result either contains the next step instruction to follow in your answer,
+    or a validation error that you must explain to the user before asking for a corrected value.
+    """
+    # Imported lazily: the workflows package builds the chat graph from these tools.
+    from workflows import load_step
+
+    logger = _get_logger()
+    store = get_conversation_store()
+    session_id = get_current_session_id()
+
+    if not session_id:
+        return "No active session; cannot validate workflow step."
+
+    step = await load_step(session_id)
+    if step.validator is None:
+        return "The current workflow step does not expect a value."
+
+    is_valid, error_msg, normalized = await step.validate(value)
+    if not is_valid:
+        error_text = error_msg or "Input is not valid for this step."
+        logger.debug("Workflow step value %r rejected: %s", value, error_text)
+        return (
+            f"The provided input failed validation: {error_text}. "
+            "Explain the issue shortly and guide the user to provide a corrected response."
+        )
+
+    await run_store_io(save_step_value, store, session_id, step.workflow_name, step.key, normalized)
+    logger.debug("Workflow step value %r accepted for '%s'.", value, step.workflow_name)
+    next_step_instruction = step.advanced().instruction
+    if next_step_instruction:
+        return (
+            "Value accepted. Proceed to the next workflow step and prompt the user accordingly:\n"
+            f"{next_step_instruction}"
+        )
+    return "Value accepted. All workflow steps are complete; confirm this to the user."
+
+
 def _get_logger():
     """Helper to initialize the logger."""
     return get_logger("SET_ACTIVE_WORKFLOW_TOOL", COLORS["YELLOW"])
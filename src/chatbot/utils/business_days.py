@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import json
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Sequence
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+
+from core.constants import COLORS
+from core.logging import get_logger
+
+CALENDAR_DIR = Path(__file__).resolve().parent.parent / "data" / "calendars"
+DEFAULT_CALENDAR = "default"
+# Monday..Sunday, as in numpy.busday_offset.
+DEFAULT_WEEKMASK = "1111100"
+
+logger = get_logger("BUSINESS_CALENDAR", COLORS["YELLOW"])
+
+
+class BusinessCalendar:
+    """Business-day arithmetic in O(log H) per offset (H = number of holidays).
+
+    Dates are handled as ordinals. `_weekdays_before(o)` counts working weekdays in
+    [0, o) with week arithmetic; subtracting the holidays before `o` (bisect over a
+    sorted index) gives the business-day count. Offsets invert that count directly,
+    so the cost does not depend on the size of the offset.
+    """
+
+    def __init__(self, name: str, holidays: Iterable[date] = (), weekmask: str = DEFAULT_WEEKMASK) -> None:
+        if len(weekmask) != 7 or set(weekmask) - {"0", "1"} or "1" not in weekmask:
+            raise ValueError(f"Invalid weekmask {weekmask!r}; expected seven 0/1 flags starting on Monday.")
+        self.name = name
+        self.weekmask = weekmask
+        self._workdays = tuple(index for index, flag in enumerate(weekmask) if flag == "1")
+        self._per_week = len(self._workdays)
+        # _prefix[i] = working weekdays among the first i days of a Monday-based week.
+        self._prefix = [0]
+        for flag in weekmask:
+            self._prefix.append(self._prefix[-1] + (flag == "1"))
+
+        # Only holidays on working weekdays shift anything.
+        ordinals = sorted({day.toordinal() for day in holidays if weekmask[day.weekday()] == "1"})
+        self._holidays = ordinals
+        # Business days before each holiday; non-decreasing, used to invert the count.
+        self._holiday_ranks = [self._weekdays_before(ordinal) - index for index, ordinal in enumerate(ordinals)]
+
+    def _weekdays_before(self, ordinal: int) -> int:
+        # Ordinal 1 (0001-01-01) is a Monday.
+        weeks, day = divmod(ordinal - 1, 7)
+        return weeks * self._per_week + self._prefix[day]
+
+    def _nth_weekday(self, index: int) -> int:
+        weeks, position = divmod(index, self._per_week)
+        return weeks * 7 + self._workdays[position] + 1
+
+    def _rank(self, ordinal: int) -> int:
+        """Number of business days strictly before `ordinal`."""
+        return self._weekdays_before(ordinal) - bisect_left(self._holidays, ordinal)
+
+    def _nth_business_day(self, rank: int) -> int:
+        # Every holiday whose rank is <= `rank` lies before the target day.
+        return self._nth_weekday(rank + bisect_right(self._holiday_ranks, rank))
+
+    def is_business_day(self, day: date) -> bool:
+        if self.weekmask[day.weekday()] != "1":
+            return False
+        ordinal = day.toordinal()
+        index = bisect_left(self._holidays, ordinal)
+        return index == len(self._holidays) or self._holidays[index] != ordinal
+
+    def offset(self, start: date, days: int) -> date:
+        """Move `days` business days from `start` (which itself is never counted)."""
+        if days == 0:
+            return start
+        ordinal = start.toordinal()
+        if days > 0:
+            rank = self._rank(ordinal + 1) + days - 1
+        else:
+            rank = self._rank(ordinal) + days
+        return date.fromordinal(self._nth_business_day(rank))
+
+    def offset_many(self, starts: Sequence[date], days: Sequence[int] | int) -> list[date]:
+        """Batch form of `offset`, broadcasting a scalar offset like numpy.busday_offset."""
+        if isinstance(days, int):
+            return [self.offset(start, days) for start in starts]
+        if len(days) != len(starts):
+            raise ValueError("starts and days must have the same length.")
+        return [self.offset(start, offset) for start, offset in zip(starts, days)]
+
+    def count(self, start: date, end: date) -> int:
+        """Business days in [start, end), like numpy.busday_count."""
+        return self._rank(end.toordinal()) - self._rank(start.toordinal())
+
+
+def available_calendars() -> list[str]:
+    names = {path.stem for path in CALENDAR_DIR.glob("*.json")} if CALENDAR_DIR.is_dir() else set()
+    return sorted(names | {DEFAULT_CALENDAR})
+
+
+@lru_cache(maxsize=None)
+def get_calendar(name: str | None = None) -> BusinessCalendar:
+    """Load a named calendar from `data/calendars/<name>.json`; "default" only skips weekends."""
+    name = (name or DEFAULT_CALENDAR).strip().lower()
+    if name == DEFAULT_CALENDAR:
+        return BusinessCalendar(DEFAULT_CALENDAR)
+
+    path = CALENDAR_DIR / f"{name}.json"
+    if not path.is_file():
+        raise ValueError(f"Unknown calendar {name!r}. Available: {', '.join(available_calendars())}.")
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return BusinessCalendar(
+        name,
+        holidays=(date.fromisoformat(day) for day in data.get("holidays", [])),
+        weekmask=data.get("weekmask", DEFAULT_WEEKMASK),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_calendar_or_default(name: str | None = None) -> BusinessCalendar:
+    """Like `get_calendar`, but an unknown or broken calendar falls back to "default" with a warning.
+
+    For configured calendars (BUSINESS_CALENDAR), where a typo should not fail every request.
+    """
+    try:
+        return get_calendar(name)
+    except ValueError as exc:
+        logger.warning("%s Falling back to %r.", exc, DEFAULT_CALENDAR)
+        return get_calendar(DEFAULT_CALENDAR)
+
+
+def business_day_offsets(starts: Sequence[date], days: Sequence[int] | int, calendar: str | None = None) -> list[date]:
+    return get_calendar(calendar).offset_many(starts, days)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import calendar as month_calendar
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from utils.datetime import apply_business_days
+
+_WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+_NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+    "fourteen": 14, "fifteen": 15, "twenty": 20, "thirty": 30,
+}
+_NUMBER = r"(?P<count>\d{1,3}|" + "|".join(sorted(_NUMBER_WORDS, key=len, reverse=True)) + r")"
+_WEEKDAY = r"(?P<weekday>" + "|".join(_WEEKDAYS) + r")"
+
+_EXPRESSIONS = re.compile(
+    r"\b(?:"
+    r"(?P<day_after_tomorrow>(?:the\s+)?day\s+after\s+tomorrow)"
+    r"|(?P<today>today)|(?P<tomorrow>tomorrow)|(?P<yesterday>yesterday)"
+    rf"|(?P<ahead>in\s+{_NUMBER}\s+(?P<business>business\s+|working\s+)?(?P<unit>days?|weeks?|months?))"
+    rf"|(?P<from_now>{_NUMBER.replace('count', 'count2')}\s+(?P<business2>business\s+|working\s+)?"
+    r"(?P<unit2>days?|weeks?|months?)\s+from\s+(?:now|today))"
+    rf"|(?P<relative_weekday>(?P<weekday_prefix>next|this|on|by|until)\s+{_WEEKDAY})"
+    r"|(?P<next_week>next\s+week)"
+    r"|(?P<end_of>(?:the\s+)?end\s+of\s+(?:the\s+|this\s+)?(?P<period>week|month))"
+    r")\b",
+    re.IGNORECASE,
+)
+# Past-tense markers that make "on Monday" refer to the previous Monday ("we met on Monday").
+_PAST_TENSE = re.compile(
+    r"\b(?:was|were|did|didn'?t|had|hadn'?t|went|came|met|sent|spoke|said|told|got|left|called|emailed|"
+    r"talked|started|finished|happened|ago|last)\b",
+    re.IGNORECASE,
+)
+_SENTENCE_END = re.compile(r"[.!?\n]")
+
+
+@dataclass(frozen=True, slots=True)
+class ResolvedDate:
+    expression: str
+    value: date
+
+    def describe(self) -> str:
+        return f'"{self.expression}" = {self.value.isoformat()} ({self.value.strftime("%A")})'
+
+
+def _count(text: str) -> int:
+    text = text.lower()
+    return int(text) if text.isdigit() else _NUMBER_WORDS[text]
+
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, month_calendar.monthrange(year, month)[1]))
+
+
+def _shift(now: datetime, count: int, unit: str, business: bool, calendar: str | None) -> date:
+    unit = unit.lower().rstrip("s")
+    if unit == "month":
+        return _add_months(now.date(), count)
+    if unit == "week":
+        return apply_business_days(now, count * 5, calendar).date() if business else now.date() + timedelta(weeks=count)
+    if business:
+        return apply_business_days(now, count, calendar).date()
+    return now.date() + timedelta(days=count)
+
+
+def _sentence_around(text: str, start: int, end: int) -> str:
+    boundaries = [boundary.end() for boundary in _SENTENCE_END.finditer(text, 0, start)]
+    following = _SENTENCE_END.search(text, end)
+    return text[boundaries[-1] if boundaries else 0:following.start() if following else len(text)]
+
+
+def _resolve(match: re.Match, now: datetime, calendar: str | None) -> date | None:
+    today = now.date()
+    if match.group("day_after_tomorrow"):
+        return today + timedelta(days=2)
+    if match.group("today"):
+        return today
+    if match.group("tomorrow"):
+        return today + timedelta(days=1)
+    if match.group("yesterday"):
+        return today - timedelta(days=1)
+    if match.group("ahead"):
+        return _shift(now, _count(match.group("count")), match.group("unit"), bool(match.group("business")), calendar)
+    if match.group("from_now"):
+        return _shift(now, _count(match.group("count2")), match.group("unit2"), bool(match.group("business2")), calendar)
+    if match.group("relative_weekday"):
+        weekday = _WEEKDAYS.index(match.group("weekday").lower())
+        prefix = match.group("weekday_prefix").lower()
+        if prefix == "this" and weekday == today.weekday():
+            return today
+        if prefix == "on" and _PAST_TENSE.search(_sentence_around(match.string, match.start(), match.end())):
+            # The last occurrence strictly before today ("we met on Monday").
+            return today - timedelta(days=(today.weekday() - weekday - 1) % 7 + 1)
+        # The next occurrence strictly after today ("next Friday" said on a Wednesday is in two days).
+        return today + timedelta(days=(weekday - today.weekday() - 1) % 7 + 1)
+    if match.group("next_week"):
+        return today + timedelta(days=7 - today.weekday())
+    if match.group("end_of"):
+        if match.group("period").lower() == "week":
+            return today + timedelta(days=(4 - today.weekday()) % 7)
+        return today.replace(day=month_calendar.monthrange(today.year, today.month)[1])
+    return None
+
+
+def resolve_date_expressions(text: str, now: datetime, calendar: str | None = None) -> list[ResolvedDate]:
+    """Find common relative date expressions in `text` and resolve them against `now`.
+
+    Anything not covered here (e.g. "the second Tuesday after Easter") is left to the
+    `relative_date` tool.
+    """
+    resolved: list[ResolvedDate] = []
+    seen: set[str] = set()
+    for match in _EXPRESSIONS.finditer(text):
+        expression = " ".join(match.group(0).split())
+        if expression.lower() in seen:
+            continue
+        value = _resolve(match, now, calendar)
+        if value is not None:
+            seen.add(expression.lower())
+            resolved.append(ResolvedDate(expression, value))
+    return resolved
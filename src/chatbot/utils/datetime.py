@@ -2,6 +2,8 @@ from __future__ import annotations
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+from utils.business_days import get_calendar
+
 def resolve_timezone(tz_name: str) -> ZoneInfo:
     try:
         return ZoneInfo(tz_name)
@@ -21,11 +23,7 @@ def parse_datetime(value: str, tz_name: str) -> datetime:
         dt = dt.replace(tzinfo=resolve_timezone(tz_name))
     return dt.astimezone(resolve_timezone(tz_name))
 
-def apply_business_days(start: datetime, offset: int) -> datetime:
-    step = 1 if offset >= 0 else -1
-    current = start
-    for _ in range(abs(offset)):
-        current += timedelta(days=step)
-        while current.weekday() >= 5:
-            current += timedelta(days=step)
-    return current
+def apply_business_days(start: datetime, offset: int, calendar: str | None = None) -> datetime:
+    """Shift `start` by `offset` business days of the named calendar, keeping the time of day."""
+    target = get_calendar(calendar).offset(start.date(), offset)
+    return start + timedelta(days=(target - start.date()).days)
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import re
+
+_NUMBER_PATTERN = re.compile(
+    r"""
+    ^\s*
+    (?:[$€£]\s*)?
+    (?P<number>\d{1,3}(?:[,\s]\d{3})+|\d+)
+    (?P<fraction>\.\d+)?
+    \s*(?:[$€£]|usd|eur|gbp|pln|zł)?
+    \s*\.?\s*$
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+
+def extract_number(text: str) -> float | None:
+    """Parse a message consisting only of a number (optionally with a currency), e.g. "500" or "$1,200.50"."""
+    match = _NUMBER_PATTERN.match(text)
+    if match is None:
+        return None
+    digits = re.sub(r"[,\s]", "", match.group("number"))
+    return float(digits + (match.group("fraction") or ""))
@@ -1,207 +1,131 @@
 from __future__ import annotations
 
+import importlib
+import pkgutil
 from functools import lru_cache
-from collections.abc import Sequence
-from types import ModuleType
-from typing import Any, Dict, Literal
+from typing import Any, Dict
 
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import BaseMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, MessagesState, StateGraph
 from langgraph.prebuilt import ToolNode
 
-from chains.chat import CHAT_PROMPT
-from clients.llm import get_chat_llm
+from chains.chat import CHAT_PROMPT, ChatLLMResult
+from clients.llm import LLMPurpose, get_route_llm, resolve_llm_route
+from core.config import LLMRoute, get_settings
 from core.logging import get_logger
 from core.constants import COLORS
-from core.memory import get_conversation_store
+from core.metrics import GRAPH_NODE_SECONDS, count_llm_call
 from tools.datetime import relative_date_tool
-from tools.workflow import set_active_workflow_tool
-from .base import ValidatorFn
-from . import brief as _brief_workflow
-from . import none as _none_workflow
-from . import project as _project_workflow
+from tools.workflow import set_active_workflow_tool, submit_workflow_step_value_tool
+from .registry import (
+    WORKFLOWS,
+    CompiledStep,
+    CompiledWorkflow,
+    StepView,
+    get_workflow,
+    load_step,
+    precompile_system_prompts,
+    register_workflow,
+    resolve_step,
+    step_at,
+)
+from .intents import IntentClassifier, IntentMatch, match_intent, may_switch_workflow, set_intent_classifier
 
 logger = get_logger("PROMPT", COLORS["BLUE"])
 
-WorkflowName = Literal["none", "brief", "project"]
-_WORKFLOW_MODULES: dict[WorkflowName, ModuleType] = {
-    "brief": _brief_workflow,
-    "project": _project_workflow,
-    "none": _none_workflow,
-}
+_INFRASTRUCTURE_MODULES = {"base", "intents", "registry"}
 
 
-def _get_workflow_module(workflow: WorkflowName) -> ModuleType:
-    return _WORKFLOW_MODULES.get(workflow, _none_workflow)
+def _load_workflow_modules() -> None:
+    """Import every workflow module in this package; each one registers itself on import."""
+    for module_info in pkgutil.iter_modules(__path__):
+        if module_info.name in _INFRASTRUCTURE_MODULES or module_info.name.startswith("_"):
+            continue
+        importlib.import_module(f"{__name__}.{module_info.name}")
 
 
-def _get_workflow_steps(workflow: WorkflowName) -> list[Any]:
-    steps = getattr(_get_workflow_module(workflow), "WORKFLOW_STEPS", [])
-    if isinstance(steps, list):
-        return steps
-    if isinstance(steps, Sequence) and not isinstance(steps, (str, bytes)):
-        return list(steps)
-    return []
+_load_workflow_modules()
 
 
-def get_workflow_instruction(workflow: WorkflowName) -> str:
-    instruction = getattr(_get_workflow_module(workflow), "WORKFLOW_INSTRUCTION", "")
-    return str(instruction).strip()
+class ChatGraphState(MessagesState):
+    """Graph state; `messages` excludes the system block, which the agent node prepends."""
 
+    session_id: str | None
+    workflow: str
+    step_index: int
+    system_prompt: str
 
-def get_workflow_step_instruction(workflow: WorkflowName) -> str:
-    store = get_conversation_store()
-    session_id = store.get_current_session()
-    step_index = 0
-    if session_id is not None:
-        step_index = store.get_workflow_step_index(session_id)
 
-    raw = _get_workflow_steps(workflow)
-    if not raw or step_index < 0 or step_index >= len(raw):
-        return ""
+def step_state(step: StepView) -> Dict[str, Any]:
+    return {
+        "session_id": step.session_id,
+        "workflow": step.workflow_name,
+        "step_index": step.step_index,
+        "system_prompt": step.system_prompt,
+    }
 
-    step: Any = raw[step_index]
-    if hasattr(step, "get"):
-        instruction = step.get("instruction")
-        validator = step.get("validator")
-    else:
-        instruction = getattr(step, "instruction", None)
-        validator = getattr(step, "validator", None)
-
-    if instruction is None:
-        return ""
-
-    base_instruction = str(instruction).strip()
-    validator_text = _get_validator_description(validator)
-    if validator_text:
-        return f"{base_instruction}\n\nVALIDATION RULES:\n{validator_text}"
-
-    return base_instruction
-
-
-def _get_validator_description(validator: Any) -> str:
-    """Extract a human-readable description from a validator.
-
-    - If it's a callable, use its docstring (if present).
-    - If it's a string, return it as-is.
-    """
-    if validator is None:
-        return ""
-    if callable(validator):
-        doc = getattr(validator, "__doc__", None)
-        if isinstance(doc, str):
-            return doc.strip()
-        return ""
-    if isinstance(validator, str):
-        return validator.strip()
-    return ""
-
-
-def get_workflow_step_validator(workflow: WorkflowName) -> ValidatorFn | None:
-    store = get_conversation_store()
-    session_id = store.get_current_session()
-    step_index = 0
-    if session_id is not None:
-        step_index = store.get_workflow_step_index(session_id)
-
-    raw = _get_workflow_steps(workflow)
-    if not raw or step_index < 0 or step_index >= len(raw):
-        return None
-
-    step: Any = raw[step_index]
-    if hasattr(step, "get"):
-        validator = step.get("validator")
-    else:
-        validator = getattr(step, "validator", None)
-
-    if callable(validator):
-        return validator
-    return None
-
-
-def get_workflow_step_field(workflow: WorkflowName) -> tuple[str | None, str | None]:
-    store = get_conversation_store()
-    session_id = store.get_current_session()
-    step_index = 0
-    if session_id is not None:
-        step_index = store.get_workflow_step_index(session_id)
-
-    raw = _get_workflow_steps(workflow)
-    if not raw or step_index < 0 or step_index >= len(raw):
-        return None, None
 
-    step: Any = raw[step_index]
-    if hasattr(step, "get"):
-        field_name = step.get("key")
+def _build_chat_graph(
+    llm: BaseChatModel,
+    single_pass: bool = False,
+    structured_output: bool = False,
+    model_name: str | None = None,
+):
+    # Common relative dates are resolved before the graph runs; the tool covers the rest.
+    tools = [set_active_workflow_tool, relative_date_tool]
+    if single_pass:
+        # Let the model validate the step value and continue with the next step in the same run.
+        tools.append(submit_workflow_step_value_tool)
+    tool_node = ToolNode(tools)
+    if structured_output:
+        # The provider enforces the ChatLLMResult JSON schema on final answers while tools stay available.
+        # The SDK's parse() path only accepts strict function tools, so every tool schema must be strict-compatible.
+        llm_with_tools = llm.bind_tools(tools, response_format=ChatLLMResult, strict=True)
     else:
-        field_name = getattr(step, "key", None)
-
-    if field_name is None:
-        return None, None
+        llm_with_tools = llm.bind_tools(tools)
 
-    name_str = str(field_name)
-    field_type = "number" if workflow == "project" and name_str == "budget" else "string"
-    return name_str, field_type
+    workflow_tool_names = {set_active_workflow_tool.name, submit_workflow_step_value_tool.name}
 
-def _build_chat_graph(llm: BaseChatModel):
-    tools = [set_active_workflow_tool]
-    tool_node = ToolNode(tools)
-    llm_with_tools = llm.bind_tools(tools)
-
-    def _refresh_system_workflow_instruction(messages: list[BaseMessage]) -> None:
-        """Update system message with the latest workflow instruction."""
-        store = get_conversation_store()
-        session_id = store.get_current_session()
-        if session_id is None:
-            return
-
-        active_workflow: WorkflowName = store.get_active_workflow(session_id)
-        workflow_instruction = get_workflow_instruction(active_workflow)
-        workflow_step_instruction = get_workflow_step_instruction(active_workflow)
-
-        marker = "WORKFLOW INSTRUCTION:"
-        step_marker = "WORKFLOW STEP INSTRUCTION:"
-        for message in messages:
-            msg_type = getattr(message, "type", "")
-            if msg_type != "system":
-                continue
-            content = getattr(message, "content", "")
-            if not isinstance(content, str) or marker not in content:
-                continue
-
-            try:
-                prefix, _ = content.split(marker, 1)
-            except ValueError:
-                continue
-
-            new_block = (
-                f"{marker}\n{workflow_instruction}\n\n"
-                f"{step_marker}\n{workflow_step_instruction}"
-            )
-            message.content = f"{prefix}{new_block}"
-            break
-
-    async def call_model(state: MessagesState) -> Dict[str, Any]:
-        messages: list[BaseMessage] = state["messages"]  # type: ignore[assignment]
-        _refresh_system_workflow_instruction(messages)
+    async def call_model(state: ChatGraphState) -> Dict[str, Any]:
+        messages = [SystemMessage(content=state["system_prompt"]), *state["messages"]]
         logger.debug("%s", messages)
-        response = await llm_with_tools.ainvoke(state["messages"])
+        count_llm_call(model_name)
+        with GRAPH_NODE_SECONDS.time(node="agent"):
+            response = await llm_with_tools.ainvoke(messages)
         return {"messages": [response]}
 
-    def should_continue(state: MessagesState) -> str:
+    async def call_tools(state: ChatGraphState, config: RunnableConfig) -> Dict[str, Any]:
+        with GRAPH_NODE_SECONDS.time(node="tools"):
+            return await tool_node.ainvoke(state, config)
+
+    async def sync_step(state: ChatGraphState) -> Dict[str, Any]:
+        """Pick up workflow/step changes made by the tools that just ran."""
+        tool_messages: list[BaseMessage] = []
+        for message in reversed(state["messages"]):
+            if not isinstance(message, ToolMessage):
+                break
+            tool_messages.append(message)
+        if not any(message.name in workflow_tool_names for message in tool_messages):
+            return {}
+        return step_state(await load_step(state["session_id"]))
+
+    def should_continue(state: ChatGraphState) -> str:
         last_message = state["messages"][-1]
         tool_calls = getattr(last_message, "tool_calls", None)
         if tool_calls:
             return "tools"
         return "end"
 
-    workflow = StateGraph(MessagesState)
+    workflow = StateGraph(ChatGraphState)
     workflow.add_node("agent", call_model)
-    workflow.add_node("tools", tool_node)
+    workflow.add_node("tools", call_tools)
+    workflow.add_node("sync_step", sync_step)
 
     workflow.set_entry_point("agent")
-    workflow.add_edge("tools", "agent")
+    workflow.add_edge("tools", "sync_step")
+    workflow.add_edge("sync_step", "agent")
     workflow.add_conditional_edges(
         "agent",
         should_continue,
@@ -211,17 +135,40 @@ def _build_chat_graph(llm: BaseChatModel):
     return workflow.compile()
 
 
-@lru_cache(maxsize=1)
-def get_chat_graph():
-    llm = get_chat_llm()
-    return _build_chat_graph(llm)
+def get_chat_graph(single_pass: bool = False, purpose: LLMPurpose = "chat"):
+    return _get_route_graph(resolve_llm_route(purpose), single_pass)
+
+
+@lru_cache(maxsize=None)
+def _get_route_graph(route: LLMRoute, single_pass: bool):
+    # Compiled once per (model, temperature) route and mode; purposes sharing a route share the graph.
+    llm = get_route_llm(route)
+    return _build_chat_graph(
+        llm,
+        single_pass=single_pass,
+        structured_output=get_settings().structured_output,
+        model_name=route.model,
+    )
 
 
 __all__ = [
+    "ChatGraphState",
     "get_chat_graph",
+    "step_state",
     "CHAT_PROMPT",
-    "get_workflow_instruction",
-    "get_workflow_step_instruction",
-    "get_workflow_step_validator",
-    "get_workflow_step_field",
+    "WORKFLOWS",
+    "CompiledStep",
+    "CompiledWorkflow",
+    "StepView",
+    "get_workflow",
+    "load_step",
+    "IntentClassifier",
+    "IntentMatch",
+    "match_intent",
+    "may_switch_workflow",
+    "precompile_system_prompts",
+    "register_workflow",
+    "resolve_step",
+    "step_at",
+    "set_intent_classifier",
 ]
@@ -1,10 +1,31 @@
 from __future__ import annotations
-from typing import Any, Callable, TypedDict
+from typing import Any, Awaitable, Callable, Mapping, TypedDict, Union
 
-ValidatorFn = Callable[[Any], tuple[bool, str | None]]
+# (is_valid, error) stores the input unchanged; (is_valid, error, normalized) stores the normalized value.
+ValidationResult = Union[tuple[bool, str | None], tuple[bool, str | None, Any]]
+# Plain functions or coroutine functions.
+ValidatorFn = Callable[[Any], Union[ValidationResult, Awaitable[ValidationResult]]]
+ExtractorFn = Callable[[str], Any | None]
 class WorkflowStep(TypedDict, total=False):
     key: str | None
+    # Type hint shown to the model for the captured field; defaults to "string".
+    field_type: str
     instruction: str
     validator: ValidatorFn
+    # Run a blocking (sync) validator in the shared validator thread pool instead of on the event loop.
+    run_in_thread: bool
+    # Seconds before validation is abandoned with VALIDATOR_TIMEOUT_MESSAGE; defaults to VALIDATOR_TIMEOUT_SECONDS.
+    # A sync validator running on the event loop cannot be interrupted, so the default only bounds async
+    # and `run_in_thread` validators; setting it on a sync validator also runs that validator in the pool.
+    # A timed-out thread keeps running in the background until the validator returns.
+    validator_timeout: float
+    # Optional local parser for the raw user message; returns None when the value is not unambiguous.
+    extractor: ExtractorFn
+    # Replies to a failed validation keyed by language ("en", "de", ...), answered without an LLM call.
+    # Slots: {error} (without trailing period), {field}, {value}. Steps without templates let the model phrase the reply.
+    error_templates: Mapping[str, str]
+    # Whether the value may be taken from a message sent during an earlier step (default True).
+    # Disable it for steps such as confirmations that must be answered on their own.
+    extract_ahead: bool
 
-__all__ = ["WorkflowStep", "ValidatorFn"]
+__all__ = ["WorkflowStep", "ValidationResult", "ValidatorFn", "ExtractorFn"]
@@ -1,28 +1,30 @@
 from __future__ import annotations
 
-from core.memory import get_conversation_store
 from .base import WorkflowStep
+from .intents import REQUEST_PREFIX
+from .registry import register_workflow
 
 WORKFLOW_INSTRUCTION = "Follow a structured process to gather inputs for creating a brief."
+INTENT_PATTERNS = [
+    REQUEST_PREFIX + r"(?:create|start|begin|open|write|set\s+up|make)\s+(?:a\s+|an\s+|the\s+|new\s+|another\s+)*brief\b",
+    REQUEST_PREFIX + r"(?:a\s+)?new\s+brief\b",
+]
 
 
-def _set_brief_value(key: str, value: str) -> None:
-    store = get_conversation_store()
-    session_id = store.get_current_session()
-    if session_id is not None:
-        store.set_workflow_value(session_id, "brief", key, value)
-        
-def validate_description(description: str) -> tuple[bool, str | None]:
+def validate_description(description: str) -> tuple[bool, str | None, str | None]:
     if len(description) < 20:
-        return False, "Description must be at least 20 characters long."
-    _set_brief_value("description", description)
-    return True, None
+        return False, "Description must be at least 20 characters long.", None
+    return True, None, description
 
 WORKFLOW_STEPS: list[WorkflowStep] = [
     WorkflowStep(
         key="description",
         instruction="Ask user: 'Please enter a brief description of what needs to be done, including specifications, quantity of items, and any other details that may be required for WAA to execute this brief.'",
         validator=validate_description,
+        error_templates={
+            "en": "{error}. Please add specifications, quantities and any other details needed to execute the brief.",
+            "de": "{error}. Bitte ergänzen Sie Spezifikationen, Mengen und alle weiteren Details für die Umsetzung.",
+        },
     ),
     WorkflowStep(
         key="x",
@@ -30,3 +32,5 @@ WORKFLOW_STEPS: list[WorkflowStep] = [
         validator=validate_description,
     ),
 ]
+
+register_workflow("brief", WORKFLOW_INSTRUCTION, WORKFLOW_STEPS, intent_patterns=INTENT_PATTERNS)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+
+from core.config import get_settings
+from .registry import DEFAULT_WORKFLOW, WORKFLOWS
+
+# Returns (workflow name, confidence in [0, 1]) or None when it has no opinion.
+IntentClassifier = Callable[[str], tuple[str, float] | None]
+
+# Intent patterns start with this, so only requests match: an imperative ("please create ...") or a
+# first-person wish ("I'd like to create ...", "can you create ..."), at the start of a sentence.
+# Questions about a workflow ("how do I create a project in Jira?") are left to the classifier.
+REQUEST_PREFIX = (
+    r"(?:^|[.!?]\s+)\s*(?:(?:ok(?:ay)?|so|hi|hey|hello|great|thanks)\b[\s,!.]*)*(?:please\s+)?"
+    r"(?:(?:(?:i|we)(?:'d|\s+would)\s+like|(?:i|we)\s+(?:want|need)|let\s+me|help\s+me)\s+(?:to\s+)?"
+    r"|let'?s\s+|(?:can|could|would|will)\s+you\s+(?:please\s+)?)?"
+)
+# A negation shortly before a matched phrase ("don't create a project") makes the match unusable.
+_NEGATION = re.compile(r"\b(?:no|not|never|don'?t|do\s+not|doesn'?t|won'?t|without)\b[^.!?]{0,30}$", re.IGNORECASE)
+
+# Words that may ask to leave or switch the current workflow, besides the workflow names themselves.
+_SWITCH_WORDS = ("workflow", "cancel", "stop", "quit", "exit", "restart", "start over")
+
+_classifier: IntentClassifier | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class IntentMatch:
+    workflow: str
+    confidence: float
+    source: str
+
+
+def set_intent_classifier(classifier: IntentClassifier | None) -> None:
+    """Install a cheap classifier consulted when no workflow phrase pattern matches."""
+    global _classifier
+    _classifier = classifier
+
+
+@lru_cache(maxsize=8)
+def _workflow_words(workflow_names: tuple[str, ...], *extra: str) -> str:
+    words = [name for name in workflow_names if name != DEFAULT_WORKFLOW] + list(extra)
+    return "|".join(re.escape(word).replace(r"\ ", r"\s+").replace("_", r"[\s_]") for word in words)
+
+
+@lru_cache(maxsize=8)
+def _switch_pattern(workflow_names: tuple[str, ...]) -> re.Pattern[str]:
+    return re.compile(rf"\b(?:{_workflow_words(workflow_names, *_SWITCH_WORDS)})\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=8)
+def _cancel_pattern(workflow_names: tuple[str, ...]) -> re.Pattern[str]:
+    """Whole-message cancellations ("cancel this project"), which return to the default workflow."""
+    return re.compile(
+        r"^\s*(?:please\s+)?(?:cancel|abort|exit|quit|stop)(?:\s+(?:this|the|my))?"
+        rf"(?:\s+(?:{_workflow_words(workflow_names, 'workflow')}))?\s*[.!]*\s*$",
+        re.IGNORECASE,
+    )
+
+
+def may_switch_workflow(query: str) -> bool:
+    """Whether `query` names a registered workflow or a switch command, so only the model should read it."""
+    return _switch_pattern(tuple(WORKFLOWS)).search(query) is not None
+
+
+def _pattern_matches(query: str) -> set[str]:
+    matched = set()
+    if _cancel_pattern(tuple(WORKFLOWS)).search(query):
+        matched.add(DEFAULT_WORKFLOW)
+    for workflow in WORKFLOWS.values():
+        for pattern in workflow.intent_patterns:
+            match = pattern.search(query)
+            if match is not None and not _NEGATION.search(query, 0, match.start()):
+                matched.add(workflow.name)
+                break
+    return matched
+
+
+def match_intent(query: str, current_workflow: str | None = None) -> IntentMatch | None:
+    """Return the workflow `query` confidently asks to enter, or None to leave the decision to the model."""
+    matched = _pattern_matches(query)
+    if len(matched) == 1:
+        (workflow,) = matched
+        return IntentMatch(workflow, 1.0, "pattern") if workflow != current_workflow else None
+    if matched or _classifier is None:
+        # Several workflows match: ambiguous, let the model decide.
+        return None
+
+    prediction = _classifier(query)
+    if prediction is None:
+        return None
+    workflow, confidence = prediction
+    if workflow not in WORKFLOWS or workflow == current_workflow:
+        return None
+    if confidence < get_settings().intent_min_confidence:
+        return None
+    return IntentMatch(workflow, confidence, "classifier")
+
+
+__all__ = [
+    "REQUEST_PREFIX",
+    "IntentClassifier",
+    "IntentMatch",
+    "match_intent",
+    "may_switch_workflow",
+    "set_intent_classifier",
+]
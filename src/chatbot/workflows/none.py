@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from .base import WorkflowStep
+from .registry import register_workflow
 
 WORKFLOW_INSTRUCTION = "Behave as a conversational agent. Respond to user questions and try to understand the user's intent. Ask questions to determine the action the user wants to perform."
 
@@ -9,3 +10,7 @@ WORKFLOW_STEPS: list[WorkflowStep] = [
         instruction="Respond to user questions and understand the user's intent. Ask clarifying questions to determine the action the user wants to perform."
     )
 ]
+
+# No intent patterns: whole-message cancellations are matched in `workflows.intents`, which knows the
+# names of all registered workflows.
+register_workflow("none", WORKFLOW_INSTRUCTION, WORKFLOW_STEPS)
@@ -1,20 +1,21 @@
 from __future__ import annotations
 
 from core.memory import get_conversation_store
-from .base import ValidatorFn, WorkflowStep
+from core.session import get_current_session_id
+from .base import WorkflowStep
+from .intents import REQUEST_PREFIX
+from .registry import register_workflow
 from crm.create_project import create_project
+from utils.parsing import extract_number
 
 WORKFLOW_INSTRUCTION = "Follow a structured process to gather inputs for creating a project."
+INTENT_PATTERNS = [
+    REQUEST_PREFIX + r"(?:create|start|begin|open|set\s+up|make)\s+(?:a\s+|an\s+|the\s+|new\s+|another\s+)*project\b",
+    REQUEST_PREFIX + r"(?:a\s+)?new\s+project\b",
+]
 
 
-def _set_workflow_value(key: str, subkey: str, value: any) -> None:
-    store = get_conversation_store()
-    session_id = store.get_current_session()
-    if session_id is not None:
-        store.set_workflow_value(session_id, key, subkey, value)
-
-
-def validate_project_budget(budget: float) -> tuple[bool, str | None]:
+def validate_project_budget(budget: float) -> tuple[bool, str | None, float | None]:
     text = str(budget)
     num_str = ""
     for ch in text:
@@ -24,52 +25,71 @@ def validate_project_budget(budget: float) -> tuple[bool, str | None]:
             break
 
     if not num_str:
-        return False, "Budget must be a number."
+        return False, "Budget must be a number.", None
 
     try:
         value = float(num_str)
     except (TypeError, ValueError):
-        return False, "Budget must be a number."
+        return False, "Budget must be a number.", None
 
     if value > 1000:
-        return False, "Amount is too high"
+        return False, "Amount is too high", None
 
-    _set_workflow_value("project", "budget", value)
-    return True, None
+    return True, None, value
 
 
-def validate_project_description(description: str) -> tuple[bool, str | None]:
+def validate_project_description(description: str) -> tuple[bool, str | None, str | None]:
     if not isinstance(description, str):
-        return False, "Description must be a string."
+        return False, "Description must be a string.", None
     if len(description) < 20:
-        return False, "Description must be at least 20 characters long."
+        return False, "Description must be at least 20 characters long.", None
 
-    _set_workflow_value("project", "description", description)
-    return True, None
+    return True, None, description.strip()
 
 
 def validate_project_confirmation(confirmed: bool) -> tuple[bool, str | None]:
     if not confirmed:
         return False, 'What would you like to change? Please provide the updated information.'
     
-    create_project()
+    session_id = get_current_session_id()
+    if session_id is not None:
+        store = get_conversation_store()
+        create_project(
+            session_id,
+            {key: store.get_workflow_value(session_id, "project", key) for key in ("budget", "description")},
+        )
     return True, None
 
 
 WORKFLOW_STEPS: list[WorkflowStep] = [
     WorkflowStep(
         key="budget",
+        field_type="number",
         instruction="Ask user what is project budget",
         validator=validate_project_budget,
+        extractor=extract_number,
+        error_templates={
+            "en": "{error}. Please enter the project budget as a number (at most 1000).",
+            "de": "{error}. Bitte geben Sie das Projektbudget als Zahl an (höchstens 1000).",
+        },
     ),
     WorkflowStep(
-        key="deadline",
+        key="description",
         instruction="Ask user what is project description",
         validator=validate_project_description,
+        error_templates={
+            "en": "{error}. Please describe the project in a bit more detail.",
+            "de": "{error}. Bitte beschreiben Sie das Projekt etwas ausführlicher.",
+        },
     ),
     WorkflowStep(
         key="confirm",
         instruction="Show the project budget and description summary to the user and ask if everything is correct. If the user confirms, finalize the project by calling the 'create_project_tool'.",
         validator=validate_project_confirmation,
+        # Queuing the CRM write touches SQLite; keep it off the event loop.
+        run_in_thread=True,
+        extract_ahead=False,
     ),
 ]
+
+register_workflow("project", WORKFLOW_INSTRUCTION, WORKFLOW_STEPS, intent_patterns=INTENT_PATTERNS)
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import inspect
+import re
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from string import Formatter
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from chains.chat import render_chat_system_prompt
+from core.config import get_settings
+from core.memory import get_conversation_store, register_workflow_state, run_store_io
+from core.session import get_current_session_id
+from .base import ExtractorFn, ValidatorFn, WorkflowStep
+
+DEFAULT_WORKFLOW = "none"
+DEFAULT_LANGUAGE = "en"
+ERROR_TEMPLATE_SLOTS = frozenset({"error", "field", "value"})
+VALIDATOR_TIMEOUT_MESSAGE = "The value could not be checked in time. Please try again."
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledStep:
+    index: int
+    key: str | None
+    field_type: str | None
+    instruction: str
+    validator: ValidatorFn | None
+    extractor: ExtractorFn | None
+    error_templates: Mapping[str, str] | None = None
+    extract_ahead: bool = True
+    run_in_thread: bool = False
+    validator_timeout: float | None = None
+
+    async def validate(self, value: Any) -> tuple[bool, str | None, Any]:
+        """Run the validator under its timeout and return (is_valid, error, value).
+
+        The returned value is the validator's normalized value, or `value` itself for validators
+        that only return (is_valid, error).
+        """
+        if self.validator is None:
+            return True, None, value
+        timeout = self.validator_timeout or get_settings().validator_timeout_seconds
+        try:
+            result = await asyncio.wait_for(self._call_validator(value), timeout)
+        except asyncio.TimeoutError:
+            return False, VALIDATOR_TIMEOUT_MESSAGE, value
+        if len(result) == 3:
+            return result
+        is_valid, error = result
+        return is_valid, error, value
+
+    async def _call_validator(self, value: Any) -> tuple:
+        # Only a validator off the event loop can be timed out; an explicit timeout implies the pool.
+        offload = self.run_in_thread or self.validator_timeout is not None
+        if offload and not inspect.iscoroutinefunction(self.validator):
+            # The context carries the bound session into the worker thread.
+            context = contextvars.copy_context()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_validator_pool(), partial(context.run, self.validator, value))
+        result = self.validator(value)
+        return await result if inspect.isawaitable(result) else result
+
+    def validation_error_reply(self, error: str, value: Any, language: str | None = None) -> str | None:
+        """Render the step's error template for `language`, or None when the step has no templates."""
+        if not self.error_templates:
+            return None
+        template = _pick_template(self.error_templates, language)
+        # Templates supply their own punctuation after {error}.
+        return template.format(
+            error=error.rstrip(" ."),
+            field=self.key or "",
+            value="" if value is None else value,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledWorkflow:
+    name: str
+    instruction: str
+    steps: tuple[CompiledStep, ...]
+    history_token_budget: int | None
+    intent_patterns: tuple[re.Pattern[str], ...] = ()
+
+    def step(self, step_index: int) -> CompiledStep | None:
+        if 0 <= step_index < len(self.steps):
+            return self.steps[step_index]
+        return None
+
+    def later_fields(self, step_index: int) -> tuple[CompiledStep, ...]:
+        """Steps after `step_index` whose value may be captured ahead of time, in order."""
+        return tuple(
+            step
+            for step in self.steps[step_index + 1:]
+            if step.key is not None and step.validator is not None and step.extract_ahead
+        )
+
+    def system_prompt(self, step_index: int) -> str:
+        # Every index past the last step renders the same "no step" prompt.
+        step_index = min(max(step_index, 0), len(self.steps))
+        return _render_system_prompt(self.name, step_index, get_settings().structured_output)
+
+
+@dataclass(frozen=True, slots=True)
+class StepView:
+    """The workflow step a session is on, resolved once and shared for the rest of the turn."""
+
+    session_id: str | None
+    workflow: CompiledWorkflow
+    step_index: int
+    step: CompiledStep | None
+
+    @property
+    def workflow_name(self) -> str:
+        return self.workflow.name
+
+    @property
+    def instruction(self) -> str:
+        return self.step.instruction if self.step is not None else ""
+
+    @property
+    def key(self) -> str | None:
+        return self.step.key if self.step is not None else None
+
+    @property
+    def validator(self) -> ValidatorFn | None:
+        return self.step.validator if self.step is not None else None
+
+    async def validate(self, value: Any) -> tuple[bool, str | None, Any]:
+        if self.step is None:
+            return True, None, value
+        return await self.step.validate(value)
+
+    @property
+    def extractor(self) -> ExtractorFn | None:
+        return self.step.extractor if self.step is not None else None
+
+    @property
+    def system_prompt(self) -> str:
+        return self.workflow.system_prompt(self.step_index)
+
+    def validation_error_reply(self, error: str, value: Any, language: str | None = None) -> str | None:
+        return self.step.validation_error_reply(error, value, language) if self.step is not None else None
+
+    def advanced(self) -> StepView:
+        """The step that follows once this one's value is accepted (what `advance_workflow_step` stores)."""
+        return StepView(self.session_id, self.workflow, self.step_index + 1, self.workflow.step(self.step_index + 1))
+
+
+_workflows: dict[str, CompiledWorkflow] = {}
+WORKFLOWS: Mapping[str, CompiledWorkflow] = MappingProxyType(_workflows)
+
+
+def register_workflow(
+    name: str,
+    instruction: str,
+    steps: Sequence[WorkflowStep],
+    history_token_budget: int | None = None,
+    intent_patterns: Sequence[str] = (),
+) -> CompiledWorkflow:
+    """Compile a workflow definition into immutable steps and make it available by name.
+
+    `intent_patterns` are case-insensitive regular expressions for messages that clearly ask to
+    enter this workflow; they let the chat service switch workflows without a tool call.
+    """
+    if name in _workflows:
+        raise ValueError(f"Workflow {name!r} is already registered.")
+    compiled = CompiledWorkflow(
+        name=name,
+        instruction=str(instruction).strip(),
+        steps=tuple(_compile_step(index, step) for index, step in enumerate(steps)),
+        history_token_budget=(
+            history_token_budget if history_token_budget is not None else get_settings().history_token_budget
+        ),
+        intent_patterns=tuple(re.compile(pattern, re.IGNORECASE) for pattern in intent_patterns),
+    )
+    register_workflow_state(name, [step.key for step in compiled.steps if step.key is not None])
+    _workflows[name] = compiled
+    return compiled
+
+
+def _compile_step(index: int, step: Any) -> CompiledStep:
+    def attr(name: str) -> Any | None:
+        return step.get(name) if hasattr(step, "get") else getattr(step, name, None)
+
+    key = attr("key")
+    validator = attr("validator")
+    extractor = attr("extractor")
+
+    instruction = str(attr("instruction") or "").strip()
+    validator_text = _get_validator_description(validator)
+    if instruction and validator_text:
+        instruction = f"{instruction}\n\nVALIDATION RULES:\n{validator_text}"
+
+    error_templates = attr("error_templates")
+    if error_templates:
+        error_templates = MappingProxyType(
+            {str(language).lower(): _check_error_template(template) for language, template in error_templates.items()}
+        )
+
+    return CompiledStep(
+        index=index,
+        key=str(key) if key is not None else None,
+        field_type=(attr("field_type") or "string") if key is not None else None,
+        instruction=instruction,
+        validator=validator if callable(validator) else None,
+        extractor=extractor if callable(extractor) else None,
+        error_templates=error_templates or None,
+        extract_ahead=attr("extract_ahead") is not False,
+        run_in_thread=bool(attr("run_in_thread")),
+        validator_timeout=attr("validator_timeout"),
+    )
+
+
+def _check_error_template(template: str) -> str:
+    slots = {name for _, name, _, _ in Formatter().parse(template) if name is not None}
+    unknown = slots - ERROR_TEMPLATE_SLOTS
+    if unknown:
+        raise ValueError(f"Unknown slot(s) {sorted(unknown)} in error template {template!r}.")
+    return template
+
+
+def _pick_template(templates: Mapping[str, str], language: str | None) -> str:
+    # Exact tag first ("de-at"), then its base language ("de"), then the default, then any template.
+    language = (language or DEFAULT_LANGUAGE).lower().replace("_", "-")
+    for candidate in (language, language.split("-", 1)[0], DEFAULT_LANGUAGE):
+        if candidate in templates:
+            return templates[candidate]
+    return next(iter(templates.values()))
+
+
+def _get_validator_description(validator: Any) -> str:
+    """Extract a human-readable description from a validator.
+
+    - If it's a callable, use its docstring (if present).
+    - If it's a string, return it as-is.
+    """
+    if validator is None:
+        return ""
+    if callable(validator):
+        doc = getattr(validator, "__doc__", None)
+        if isinstance(doc, str):
+            return doc.strip()
+        return ""
+    if isinstance(validator, str):
+        return validator.strip()
+    return ""
+
+
+@lru_cache(maxsize=1)
+def _validator_pool() -> ThreadPoolExecutor:
+    # Bounded, so blocking validators cannot pile up threads under load.
+    return ThreadPoolExecutor(max_workers=get_settings().validator_max_threads, thread_name_prefix="validator")
+
+
+def get_workflow(name: str) -> CompiledWorkflow:
+    return _workflows.get(name) or _workflows[DEFAULT_WORKFLOW]
+
+
+def resolve_step(session_id: str | None = None) -> StepView:
+    """Resolve the active workflow and step of a session (defaults to the current session)."""
+    if session_id is None:
+        session_id = get_current_session_id()
+    if session_id is None:
+        workflow = get_workflow(DEFAULT_WORKFLOW)
+        return StepView(session_id=None, workflow=workflow, step_index=0, step=workflow.step(0))
+
+    store = get_conversation_store()
+    return step_at(session_id, store.get_active_workflow(session_id), store.get_workflow_step_index(session_id))
+
+
+async def load_step(session_id: str) -> StepView:
+    """`resolve_step` for async callers; the store reads go through `run_store_io`, off the event loop."""
+    return await run_store_io(resolve_step, session_id)
+
+
+def step_at(session_id: str | None, workflow_name: str, step_index: int) -> StepView:
+    """Build the view of a known position without reading the store (e.g. from graph state)."""
+    workflow = get_workflow(workflow_name)
+    return StepView(session_id=session_id, workflow=workflow, step_index=step_index, step=workflow.step(step_index))
+
+
+@lru_cache(maxsize=None)
+def _render_system_prompt(workflow_name: str, step_index: int, structured_output: bool) -> str:
+    workflow = get_workflow(workflow_name)
+    step = workflow.step(step_index)
+    return render_chat_system_prompt(
+        active_workflow=workflow.name,
+        workflow_instruction=workflow.instruction,
+        workflow_step_instruction=step.instruction if step is not None else "",
+        workflow_step_field=step.key if step is not None else None,
+        workflow_step_field_type=step.field_type if step is not None else None,
+        structured_output=structured_output,
+        workflow_later_fields=[(later.key, later.field_type) for later in workflow.later_fields(step_index)],
+    )
+
+
+def precompile_system_prompts() -> int:
+    """Render the system block of every (workflow, step) pair up front; returns how many were built."""
+    count = 0
+    for workflow in _workflows.values():
+        for step_index in range(len(workflow.steps) + 1):
+            workflow.system_prompt(step_index)
+            count += 1
+    return count